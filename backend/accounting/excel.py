@@ -44,8 +44,9 @@ def apply_common_styles(sheet):
     return thin
 
 
-def build_statement_workbook(import_customer, *, date_from=None, date_to=None):
-    ledger = statement_ledger(import_customer, date_from=date_from, date_to=date_to)
+def build_statement_workbook(import_customer, *, date_from=None, date_to=None, ledger=None):
+    if ledger is None:
+        ledger = statement_ledger(import_customer, date_from=date_from, date_to=date_to)
     workbook = Workbook()
     sheet = workbook.active
     sheet.title = "Statement"
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:55
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounting', '0005_reapply_blocklist_entries'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AccountingStatementBundleJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('job_uuid', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('bundle_key', models.CharField(db_index=True, max_length=64)),
+                ('kind', models.CharField(choices=[('pdf', 'PDF statements'), ('excel', 'Excel statements')], default='pdf', max_length=10)),
+                ('style', models.CharField(default='professional', max_length=30)),
+                ('date_from', models.DateField(blank=True, null=True)),
+                ('date_to', models.DateField(blank=True, null=True)),
+                ('customer_ids', models.JSONField(blank=True, default=list)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], db_index=True, default='queued', max_length=20)),
+                ('progress_stage', models.CharField(default='queued', max_length=40)),
+                ('statement_count', models.PositiveIntegerField(default=0)),
+                ('rendered_count', models.PositiveIntegerField(default=0)),
+                ('attempt_count', models.PositiveSmallIntegerField(default=0)),
+                ('lease_owner', models.CharField(blank=True, max_length=128)),
+                ('lease_token', models.CharField(blank=True, max_length=64)),
+                ('lease_expires_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('safe_error_category', models.CharField(blank=True, max_length=64)),
+                ('artifact_ref', models.CharField(blank=True, max_length=500)),
+                ('artifact_sha256', models.CharField(blank=True, max_length=64)),
+                ('artifact_size', models.PositiveBigIntegerField(default=0)),
+                ('artifact_filename', models.CharField(blank=True, max_length=255)),
+                ('queued_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('accounting_import', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statement_bundle_jobs', to='accounting.accountingimport')),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='accounting_statement_bundle_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['created_at', 'pk'],
+                'indexes': [models.Index(fields=['status', 'queued_at'], name='acct_bundle_status_queued_idx'), models.Index(fields=['status', 'lease_expires_at'], name='acct_bundle_status_lease_idx'), models.Index(fields=['bundle_key', 'status'], name='acct_bundle_key_status_idx')],
+                'constraints': [models.UniqueConstraint(condition=models.Q(('status__in', ['queued', 'running'])), fields=('bundle_key',), name='uniq_acct_bundle_active_key')],
+            },
+        ),
+    ]
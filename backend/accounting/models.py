@@ -1,5 +1,8 @@
+import uuid
+
 from django.conf import settings
 from django.db import models
+from django.utils import timezone
 
 
 class AccountingCategory(models.TextChoices):
@@ -216,3 +219,84 @@ class AccountingInvoiceRow(models.Model):
 
     def __str__(self):
         return f"{self.customer_name} {self.bill_number}"
+
+
+class AccountingStatementBundleJob(models.Model):
+    """Durable, leased rendering of one statement ZIP into private storage."""
+
+    KIND_PDF = "pdf"
+    KIND_EXCEL = "excel"
+    KIND_CHOICES = [
+        (KIND_PDF, "PDF statements"),
+        (KIND_EXCEL, "Excel statements"),
+    ]
+
+    STATUS_QUEUED = "queued"
+    STATUS_RUNNING = "running"
+    STATUS_COMPLETED = "completed"
+    STATUS_FAILED = "failed"
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, "Queued"),
+        (STATUS_RUNNING, "Running"),
+        (STATUS_COMPLETED, "Completed"),
+        (STATUS_FAILED, "Failed"),
+    ]
+    ACTIVE_STATUSES = (STATUS_QUEUED, STATUS_RUNNING)
+    TERMINAL_STATUSES = (STATUS_COMPLETED, STATUS_FAILED)
+
+    job_uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    accounting_import = models.ForeignKey(
+        AccountingImport,
+        on_delete=models.CASCADE,
+        related_name="statement_bundle_jobs",
+    )
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="accounting_statement_bundle_jobs",
+    )
+    bundle_key = models.CharField(max_length=64, db_index=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES, default=KIND_PDF)
+    style = models.CharField(max_length=30, default="professional")
+    date_from = models.DateField(null=True, blank=True)
+    date_to = models.DateField(null=True, blank=True)
+    customer_ids = models.JSONField(default=list, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_QUEUED, db_index=True)
+    progress_stage = models.CharField(max_length=40, default="queued")
+    statement_count = models.PositiveIntegerField(default=0)
+    rendered_count = models.PositiveIntegerField(default=0)
+    attempt_count = models.PositiveSmallIntegerField(default=0)
+    lease_owner = models.CharField(max_length=128, blank=True)
+    lease_token = models.CharField(max_length=64, blank=True)
+    lease_expires_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    safe_error_category = models.CharField(max_length=64, blank=True)
+    artifact_ref = models.CharField(max_length=500, blank=True)
+    artifact_sha256 = models.CharField(max_length=64, blank=True)
+    artifact_size = models.PositiveBigIntegerField(default=0)
+    artifact_filename = models.CharField(max_length=255, blank=True)
+    queued_at = models.DateTimeField(default=timezone.now)
+    started_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["created_at", "pk"]
+        indexes = [
+            models.Index(fields=["status", "queued_at"], name="acct_bundle_status_queued_idx"),
+            models.Index(fields=["status", "lease_expires_at"], name="acct_bundle_status_lease_idx"),
+            models.Index(fields=["bundle_key", "status"], name="acct_bundle_key_status_idx"),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["bundle_key"],
+                condition=models.Q(status__in=["queued", "running"]),
+                name="uniq_acct_bundle_active_key",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} for import {self.accounting_import_id} ({self.status})"
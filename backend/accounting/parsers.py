@@ -80,6 +80,15 @@ class ParsedOutstanding:
     skipped_row_count: int
     warnings: list[str]
     parse_meta: dict
+    row_count: int = 0
+
+
+@dataclass
+class OutstandingParseStats:
+    report_date: date | None = None
+    total_input_rows: int = 0
+    parsed_row_count: int = 0
+    skip_reasons: Counter = field(default_factory=Counter)
 
 
 @dataclass
@@ -456,31 +465,40 @@ def validate_row_shape(row, row_number):
         )
 
 
-def parse_csv_rows(data):
+def iter_csv_rows(data):
     text = data.decode("utf-8-sig", errors="replace")
-    rows = []
     try:
         for row_number, row in enumerate(csv.reader(io.StringIO(text)), start=1):
             if row_number > max_import_rows():
                 raise ValidationError(f"File has too many rows. Maximum supported rows: {max_import_rows()}.")
             validate_row_shape(row, row_number)
-            rows.append(row)
+            yield row
     except csv.Error as exc:
         raise ValidationError(f"Invalid CSV file: {exc}") from exc
-    return rows
 
 
-def parse_xlsx_rows(data):
+def parse_csv_rows(data):
+    return list(iter_csv_rows(data))
+
+
+def iter_xlsx_rows(data):
     workbook = load_xlsx_workbook(data)
-    rows = []
-    for sheet in workbook.worksheets:
-        for row in sheet.iter_rows(values_only=True):
-            if len(rows) + 1 > max_import_rows():
-                raise ValidationError(f"File has too many rows. Maximum supported rows: {max_import_rows()}.")
-            cleaned = list(row)
-            validate_row_shape(cleaned, len(rows) + 1)
-            rows.append(cleaned)
-    return rows
+    row_number = 0
+    try:
+        for sheet in workbook.worksheets:
+            for row in sheet.iter_rows(values_only=True):
+                row_number += 1
+                if row_number > max_import_rows():
+                    raise ValidationError(f"File has too many rows. Maximum supported rows: {max_import_rows()}.")
+                cleaned = list(row)
+                validate_row_shape(cleaned, row_number)
+                yield cleaned
+    finally:
+        workbook.close()
+
+
+def parse_xlsx_rows(data):
+    return list(iter_xlsx_rows(data))
 
 
 def load_xlsx_workbook(data):
@@ -490,30 +508,38 @@ def load_xlsx_workbook(data):
         raise ValidationError("Invalid Excel workbook. Please upload a valid .xlsx file.") from exc
 
 
-def parse_outstanding_upload(uploaded_file=None, *, source=None):
-    source = source or read_outstanding_source(uploaded_file)
-    rows = parse_csv_rows(source.data) if source.extension == ".csv" else parse_xlsx_rows(source.data)
-    report_date = None
-    parsed_rows = []
-    warnings = []
-    skip_reasons = Counter()
+def iter_outstanding_rows(source, stats=None):
+    """Yield parsed invoice rows one at a time without materializing the sheet.
+
+    Report date, input row count and skip reasons accumulate on ``stats`` as the
+    generator advances; they are complete once it is exhausted. Iterating the
+    same source again reproduces the same rows.
+    """
 
+    stats = stats if stats is not None else OutstandingParseStats()
+    rows = iter_csv_rows(source.data) if source.extension == ".csv" else iter_xlsx_rows(source.data)
     for row_number, row in enumerate(rows, start=1):
-        if report_date is None:
-            report_date = parse_report_date(row)
-        parsed, reason = parse_invoice_row(row, row_number, report_date)
+        stats.total_input_rows = row_number
+        if stats.report_date is None:
+            stats.report_date = parse_report_date(row)
+        parsed, reason = parse_invoice_row(row, row_number, stats.report_date)
         if parsed:
-            parsed_rows.append(parsed)
+            stats.parsed_row_count += 1
+            yield parsed
         else:
-            skip_reasons[reason or "Skipped row."] += 1
+            stats.skip_reasons[reason or "Skipped row."] += 1
 
-    if not parsed_rows:
+
+def summarize_outstanding(source, stats, rows=None):
+    if not stats.parsed_row_count:
         raise ValidationError("No usable invoice rows were found in this file.")
+    report_date = stats.report_date
+    warnings = []
     if report_date is None:
         report_date = timezone.localdate()
         warnings.append("Report date was not found; upload date was used.")
 
-    for reason, count in skip_reasons.most_common(8):
+    for reason, count in stats.skip_reasons.most_common(8):
         if reason and reason not in {"Skipped non-invoice row.", "No invoice header/data section detected."}:
             warnings.append(f"{count} rows skipped: {reason}")
 
@@ -522,17 +548,25 @@ def parse_outstanding_upload(uploaded_file=None, *, source=None):
         sha256=source.sha256,
         size=source.size,
         report_date=report_date,
-        rows=parsed_rows,
-        skipped_row_count=sum(skip_reasons.values()),
+        rows=rows if rows is not None else [],
+        skipped_row_count=sum(stats.skip_reasons.values()),
         warnings=warnings,
         parse_meta={
             "extension": source.extension,
-            "total_input_rows": len(rows),
-            "skip_reasons": dict(skip_reasons.most_common(20)),
+            "total_input_rows": stats.total_input_rows,
+            "skip_reasons": dict(stats.skip_reasons.most_common(20)),
         },
+        row_count=stats.parsed_row_count,
     )
 
 
+def parse_outstanding_upload(uploaded_file=None, *, source=None):
+    source = source or read_outstanding_source(uploaded_file)
+    stats = OutstandingParseStats()
+    rows = list(iter_outstanding_rows(source, stats))
+    return summarize_outstanding(source, stats, rows)
+
+
 def normalize_category(value):
     text = normalize_customer_name(value)
     return CATEGORY_VALUES.get(text, "unknown")
@@ -278,10 +278,11 @@ def note_block(styles, professional=True):
     return note
 
 
-def build_statement_pdf(import_customer, style="professional", *, date_from=None, date_to=None):
-    config = company_config()
+def build_statement_pdf(import_customer, style="professional", *, date_from=None, date_to=None, config=None, ledger=None):
+    config = config if config is not None else company_config()
     styles = make_styles(config)
-    ledger = statement_ledger(import_customer, date_from=date_from, date_to=date_to)
+    if ledger is None:
+        ledger = statement_ledger(import_customer, date_from=date_from, date_to=date_to)
     buffer = BytesIO()
     document = SimpleDocTemplate(
         buffer,
@@ -17,6 +17,8 @@ ACTION_PERMISSIONS = {
     "update": "edit_accounting_customer",
     "statement_pdf": "download_accounting_statement",
     "statements_zip": "download_accounting_statement",
+    "statement_bundles": "download_accounting_statement",
+    "download": "download_accounting_statement",
 }
 
 
@@ -225,12 +225,23 @@ class AccountingImportCustomerSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError("Invalid category.")
         return value
 
+    def statement_ledger(self, instance):
+        # The detail serializer reads the ledger for several fields; build it once per request.
+        ledgers = self.context.setdefault("statement_ledgers", {})
+        if instance.pk not in ledgers:
+            ledgers[instance.pk] = statement_ledger(
+                instance,
+                date_from=self.context.get("date_from"),
+                date_to=self.context.get("date_to"),
+            )
+        return ledgers[instance.pk]
+
     def to_representation(self, instance):
         data = super().to_representation(instance)
         date_from = self.context.get("date_from")
         date_to = self.context.get("date_to")
         if date_from or date_to:
-            ledger = statement_ledger(instance, date_from=date_from, date_to=date_to)
+            ledger = self.statement_ledger(instance)
             data.update(
                 {
                     "total_outstanding": money_string(ledger["total_outstanding"]),
@@ -257,15 +268,11 @@ class AccountingImportCustomerDetailSerializer(AccountingImportCustomerSerialize
         fields = AccountingImportCustomerSerializer.Meta.fields + ["invoice_rows", "ledger_rows", "statement_period"]
 
     def get_invoice_rows(self, obj):
-        date_from = self.context.get("date_from")
-        date_to = self.context.get("date_to")
-        rows = [line["row"] for line in statement_ledger(obj, date_from=date_from, date_to=date_to)["lines"]]
+        rows = [line["row"] for line in self.statement_ledger(obj)["lines"]]
         return AccountingInvoiceRowSerializer(rows, many=True).data
 
     def get_ledger_rows(self, obj):
-        date_from = self.context.get("date_from")
-        date_to = self.context.get("date_to")
-        lines = statement_ledger(obj, date_from=date_from, date_to=date_to)["lines"]
+        lines = self.statement_ledger(obj)["lines"]
         return [
             {
                 "id": line["row"].id,
@@ -285,7 +292,7 @@ class AccountingImportCustomerDetailSerializer(AccountingImportCustomerSerialize
     def get_statement_period(self, obj):
         date_from = self.context.get("date_from")
         date_to = self.context.get("date_to")
-        ledger = statement_ledger(obj, date_from=date_from, date_to=date_to)
+        ledger = self.statement_ledger(obj)
         period_start = ledger.get("period_start")
         period_end = ledger.get("period_end")
         return {
@@ -1,10 +1,15 @@
-from collections import defaultdict
+from collections import defaultdict, deque
+import copy
 from datetime import date
 from decimal import Decimal
+import json
+import pickle
 import re
+import tempfile
 
 from django.core.exceptions import ValidationError
-from django.db import transaction
+from django.db import connection, models, transaction
+from django.db.models.functions import Lower
 from django.utils import timezone
 
 from .formatting import format_accounting_date
@@ -17,14 +22,23 @@ from .models import (
     AccountingInvoiceRow,
 )
 from .parsers import (
+    OutstandingParseStats,
+    iter_outstanding_rows,
     normalize_customer_name,
     parse_blocklist_upload,
     parse_category_upload,
-    parse_outstanding_upload,
     read_outstanding_source,
+    summarize_outstanding,
 )
 
 
+INVOICE_INSERT_CHUNK_SIZE = 5000
+# Parsed rows beyond this many bytes spill from memory to a temporary file.
+INVOICE_SPOOL_MEMORY_BYTES = 8 * 1024 * 1024
+SUMMARY_WARNING_LIMIT = 25
+STATEMENT_LEDGER_CHUNK_SIZE = 2000
+
+
 def customer_lookup_key(row):
     if row.customer_code:
         return ("code", row.customer_code.strip().lower())
@@ -89,12 +103,101 @@ def blocklist_name_matches(customer_normalized_name, blocklist_normalized_name):
     return " ".join(blocklist_tokens) in " ".join(customer_tokens)
 
 
+class _PhraseAutomaton:
+    """Aho-Corasick automaton reporting whether any phrase occurs in a text."""
+
+    def __init__(self, phrases):
+        self._goto = [{}]
+        self._fail = [0]
+        self._terminal = [False]
+        for phrase in phrases:
+            state = 0
+            for character in phrase:
+                next_state = self._goto[state].get(character)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][character] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._terminal.append(False)
+                state = next_state
+            self._terminal[state] = True
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for character, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and character not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(character, 0)
+                self._terminal[next_state] = self._terminal[next_state] or self._terminal[self._fail[next_state]]
+
+    def __bool__(self):
+        return len(self._goto) > 1
+
+    def search(self, text):
+        state = 0
+        for character in text:
+            while state and character not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(character, 0)
+            if self._terminal[state]:
+                return True
+        return False
+
+
+class BlocklistMatcher:
+    """Compiled form of ``blocklist_name_matches`` over a set of blocklist names.
+
+    Exact names, distinctive single tokens and multi-token phrases are
+    indexed once, so each customer costs one set lookup, one token-set
+    intersection and one automaton pass instead of a scan of the blocklist.
+    """
+
+    def __init__(self, blocklist_normalized_names):
+        self.exact_names = set()
+        self.single_tokens = set()
+        phrases = set()
+        for blocklist_name in blocklist_normalized_names:
+            if not blocklist_name:
+                continue
+            self.exact_names.add(blocklist_name)
+            tokens = _blocklist_match_tokens(blocklist_name)
+            if len(tokens) == 1:
+                token = tokens[0]
+                if len(token) >= 5 and token not in BLOCKLIST_GENERIC_SINGLE_TOKENS:
+                    self.single_tokens.add(token)
+            elif tokens:
+                phrases.add(" ".join(tokens))
+        self.phrases = _PhraseAutomaton(sorted(phrases))
+
+    def matches(self, customer_normalized_name):
+        if not customer_normalized_name:
+            return False
+        if customer_normalized_name in self.exact_names:
+            return True
+        customer_tokens = _normalized_tokens(customer_normalized_name)
+        if not customer_tokens:
+            return False
+        if not self.single_tokens.isdisjoint(customer_tokens):
+            return True
+        return bool(self.phrases) and self.phrases.search(" ".join(customer_tokens))
+
+
+def compile_active_blocklist():
+    return BlocklistMatcher(
+        AccountingBlocklistedCustomer.objects.filter(is_active=True).values_list("normalized_name", flat=True)
+    )
+
+
 def is_name_blocklisted(normalized_name, active_blocklist_names=None):
+    """Check one name against a compiled ``BlocklistMatcher`` or a list of names."""
+
     if active_blocklist_names is None:
-        active_blocklist_names = AccountingBlocklistedCustomer.objects.filter(is_active=True).values_list(
-            "normalized_name",
-            flat=True,
-        )
+        active_blocklist_names = compile_active_blocklist()
+    if isinstance(active_blocklist_names, BlocklistMatcher):
+        return active_blocklist_names.matches(normalized_name)
     return any(blocklist_name_matches(normalized_name, blocklist_name) for blocklist_name in active_blocklist_names)
 
 
@@ -135,6 +238,123 @@ def find_or_create_customer(row, category_map=None, category_code_map=None, acti
     return customer
 
 
+CUSTOMER_PRELOAD_CHUNK_SIZE = 500
+
+
+def _first_customer(candidates, orders):
+    # Mirrors ``.first()`` under ``Meta.ordering = ["name"]``; unsaved customers sort after saved ones.
+    return min(candidates, key=lambda customer: (customer.name, orders[id(customer)])) if candidates else None
+
+
+def _preload_customers(code_keys, normalized_names):
+    by_code = defaultdict(list)
+    by_name = defaultdict(list)
+    # A customer found by both code and name must be one instance, or edits
+    # made through one map would be lost when the other is written back.
+    instances = {}
+    code_keys = sorted(code_keys)
+    for start in range(0, len(code_keys), CUSTOMER_PRELOAD_CHUNK_SIZE):
+        chunk = code_keys[start:start + CUSTOMER_PRELOAD_CHUNK_SIZE]
+        for customer in AccountCustomer.objects.annotate(code_key=Lower("customer_code")).filter(code_key__in=chunk):
+            by_code[customer.code_key].append(instances.setdefault(customer.pk, customer))
+    normalized_names = sorted(normalized_names)
+    for start in range(0, len(normalized_names), CUSTOMER_PRELOAD_CHUNK_SIZE):
+        chunk = normalized_names[start:start + CUSTOMER_PRELOAD_CHUNK_SIZE]
+        for customer in AccountCustomer.objects.filter(normalized_name__in=chunk):
+            by_name[customer.normalized_name].append(instances.setdefault(customer.pk, customer))
+    return by_code, by_name
+
+
+def resolve_import_customers(rows, category_map=None, category_code_map=None, active_blocklist_names=None):
+    """Set-based ``find_or_create_customer`` for one import's group representatives.
+
+    Returns one customer per row, in order. Rows are resolved sequentially against
+    preloaded customers plus the ones created or re-coded by earlier rows, and
+    each returned instance reflects the customer as that row left it, so the
+    result matches calling ``find_or_create_customer`` row by row.
+    """
+
+    if active_blocklist_names is None:
+        active_blocklist_names = compile_active_blocklist()
+    category_map = category_map or {}
+    category_code_map = category_code_map or {}
+    prepared = [
+        (row, normalize_customer_name(row.customer_name), row.customer_code.strip().lower() if row.customer_code else "")
+        for row in rows
+    ]
+    by_code, by_name = _preload_customers(
+        {code_key for row, _name, code_key in prepared if row.customer_code},
+        {normalized_name for _row, normalized_name, _code in prepared if normalized_name},
+    )
+    orders = {
+        id(customer): customer.pk
+        for candidates in [*by_code.values(), *by_name.values()]
+        for customer in candidates
+    }
+    saved_sequence = max(orders.values(), default=0)
+
+    resolved = []
+    created = []
+    changed = {}
+    for row, normalized_name, normalized_code in prepared:
+        is_blocklisted = is_name_blocklisted(normalized_name, active_blocklist_names)
+        customer = None
+        if row.customer_code:
+            customer = _first_customer(by_code.get(normalized_code), orders)
+        if customer is None and normalized_name:
+            name_match = _first_customer(by_name.get(normalized_name), orders)
+            if name_match and (not row.customer_code or not name_match.customer_code):
+                customer = name_match
+
+        mapped_category = category_code_map.get(normalized_code) or category_map.get(normalized_name)
+        if customer is None:
+            customer = AccountCustomer(
+                customer_code=row.customer_code.strip(),
+                name=row.customer_name.strip(),
+                normalized_name=normalized_name,
+                category=mapped_category or AccountingCategory.UNKNOWN,
+                is_ignored=is_blocklisted,
+            )
+            created.append(customer)
+            orders[id(customer)] = saved_sequence + len(created)
+            if customer.customer_code:
+                by_code[normalized_code].append(customer)
+            by_name[normalized_name].append(customer)
+        else:
+            dirty = False
+            if row.customer_code and not customer.customer_code:
+                customer.customer_code = row.customer_code.strip()
+                by_code[normalized_code].append(customer)
+                dirty = True
+            if mapped_category and mapped_category != AccountingCategory.UNKNOWN and customer.category != mapped_category:
+                customer.category = mapped_category
+                dirty = True
+            if is_blocklisted and not customer.is_ignored:
+                customer.is_ignored = True
+                dirty = True
+            if dirty and customer.pk:
+                changed[customer.pk] = customer
+        resolved.append((customer, copy.copy(customer)))
+
+    AccountCustomer.objects.bulk_create(created, batch_size=1000)
+    if changed:
+        now = timezone.now()
+        for customer in changed.values():
+            customer.updated_at = now
+        AccountCustomer.objects.bulk_update(
+            list(changed.values()),
+            ["customer_code", "category", "is_ignored", "updated_at"],
+            batch_size=1000,
+        )
+    for customer, resolved_customer in resolved:
+        resolved_customer.pk = customer.pk
+        resolved_customer.updated_at = customer.updated_at
+        resolved_customer.created_at = customer.created_at
+        resolved_customer._state.adding = False
+        resolved_customer._state.db = customer._state.db
+    return [resolved_customer for _customer, resolved_customer in resolved]
+
+
 def invoice_is_due(row):
     return row.days > 30 or row.bucket_30_60 != 0 or row.bucket_60_90 != 0 or row.bucket_over_90 != 0
 
@@ -146,6 +366,70 @@ def build_summary_status(customer, rows, overdue_amount, max_days):
     return (AccountingImportCustomer.STATUS_DUE if is_due else AccountingImportCustomer.STATUS_NOT_DUE), is_due
 
 
+class ParsedRowSpool:
+    """Parsed invoice rows written once and replayed in order.
+
+    Summaries must exist before their invoice rows are inserted, so the rows
+    are held here between the grouping pass and the insert pass instead of
+    parsing the upload a second time.
+    """
+
+    def __init__(self, max_memory_bytes=INVOICE_SPOOL_MEMORY_BYTES):
+        self._file = tempfile.SpooledTemporaryFile(max_size=max_memory_bytes)
+
+    def close(self):
+        self._file.close()
+
+    def append(self, row):
+        pickle.dump(row, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def __iter__(self):
+        self._file.seek(0)
+        while True:
+            try:
+                yield pickle.load(self._file)
+            except EOFError:
+                return
+
+
+class ImportCustomerGroup:
+    """Running totals for one grouped customer while an import streams its rows."""
+
+    def __init__(self, first):
+        self.first = first
+        self.invoice_count = 0
+        self.bucket_0_30 = Decimal("0.00")
+        self.bucket_30_60 = Decimal("0.00")
+        self.bucket_60_90 = Decimal("0.00")
+        self.bucket_over_90 = Decimal("0.00")
+        self.total = Decimal("0.00")
+        self.max_days = 0
+        self.first_due_row = None
+        self.warnings = []
+
+    def add(self, row):
+        self.invoice_count += 1
+        self.bucket_0_30 += row.bucket_0_30
+        self.bucket_30_60 += row.bucket_30_60
+        self.bucket_60_90 += row.bucket_60_90
+        self.bucket_over_90 += row.bucket_over_90
+        self.total += row.total
+        self.max_days = max(self.max_days, row.days)
+        if self.first_due_row is None and invoice_is_due(row):
+            self.first_due_row = row
+        if len(self.warnings) < SUMMARY_WARNING_LIMIT:
+            self.warnings.extend(row.warnings[:SUMMARY_WARNING_LIMIT - len(self.warnings)])
+
+    @property
+    def overdue(self):
+        return self.bucket_30_60 + self.bucket_60_90 + self.bucket_over_90
+
+    @property
+    def status_rows(self):
+        # ``build_summary_status`` only needs to know whether any single row is due.
+        return [self.first_due_row] if self.first_due_row is not None else []
+
+
 def find_duplicate_import(parsed):
     return (
         AccountingImport.objects.filter(source_sha256=parsed.sha256)
@@ -231,10 +515,14 @@ def apply_blocklist_names(normalized_names):
     if not normalized_names:
         return {"matched_customers": 0, "matched_import_customers": 0}
 
+    matcher = BlocklistMatcher(normalized_names)
     matched_customer_ids = [
-        customer.id
-        for customer in AccountCustomer.objects.filter(is_active=True).only("id", "normalized_name")
-        if is_name_blocklisted(customer.normalized_name, normalized_names)
+        customer_id
+        for customer_id, normalized_name in AccountCustomer.objects.filter(is_active=True).values_list(
+            "id",
+            "normalized_name",
+        )
+        if matcher.matches(normalized_name)
     ]
     customers = AccountCustomer.objects.filter(id__in=matched_customer_ids)
     matched_customers = customers.count()
@@ -259,10 +547,8 @@ def apply_blocklist_names(normalized_names):
 
 
 def apply_active_blocklist_to_import(import_record):
-    active_names = list(
-        AccountingBlocklistedCustomer.objects.filter(is_active=True).values_list("normalized_name", flat=True)
-    )
-    if not active_names:
+    matcher = compile_active_blocklist()
+    if not matcher.exact_names:
         return {"matched_customers": 0, "matched_import_customers": 0}
     summaries = list(import_record.customers.select_related("customer").only(
         "id",
@@ -276,7 +562,7 @@ def apply_active_blocklist_to_import(import_record):
     matched_customer_ids = []
     for summary in summaries:
         normalized_name = summary.customer.normalized_name or normalize_customer_name(summary.customer_name)
-        if is_name_blocklisted(normalized_name, active_names):
+        if matcher.matches(normalized_name):
             matched_summary_ids.append(summary.id)
             matched_customer_ids.append(summary.customer_id)
 
@@ -359,6 +645,32 @@ def build_invoice_row(import_customer, row):
     )
 
 
+def insert_invoice_rows(records):
+    """Insert one chunk of invoice rows, using ``COPY`` on PostgreSQL."""
+
+    if not records:
+        return
+    if connection.vendor != "postgresql":
+        AccountingInvoiceRow.objects.bulk_create(records, batch_size=INVOICE_INSERT_CHUNK_SIZE)
+        return
+
+    fields = [field for field in AccountingInvoiceRow._meta.concrete_fields if not field.primary_key]
+    columns = ", ".join(connection.ops.quote_name(field.column) for field in fields)
+    table = connection.ops.quote_name(AccountingInvoiceRow._meta.db_table)
+    json_fields = {field.attname: field.encoder for field in fields if isinstance(field, models.JSONField)}
+    now = timezone.now()
+    with connection.cursor() as cursor:
+        with cursor.cursor.copy(f"COPY {table} ({columns}) FROM STDIN") as copy_stream:
+            for record in records:
+                record.created_at = now
+                copy_stream.write_row([
+                    json.dumps(getattr(record, field.attname), cls=json_fields[field.attname])
+                    if field.attname in json_fields
+                    else getattr(record, field.attname)
+                    for field in fields
+                ])
+
+
 @transaction.atomic
 def create_accounting_import(*, outstanding_file, category_file=None, actor=None):
     source = read_outstanding_source(outstanding_file)
@@ -388,16 +700,22 @@ def create_accounting_import(*, outstanding_file, category_file=None, actor=None
             "blocklist_update_message": blocklist_update_message(blocklist_meta) if blocklist_meta.get("matched_import_customers") else "",
         }
 
-    parsed = parse_outstanding_upload(source=source)
+    # A spooled temporary file is removed when closed or garbage-collected.
+    spool = ParsedRowSpool()
+    stats = OutstandingParseStats()
+    grouped = {}
+    for row in iter_outstanding_rows(source, stats):
+        spool.append(row)
+        key = customer_lookup_key(row)
+        group = grouped.get(key)
+        if group is None:
+            group = grouped[key] = ImportCustomerGroup(row)
+        group.add(row)
+    parsed = summarize_outstanding(source, stats)
     parsed_category = parse_category_upload(category_file) if category_file else None
     category_map = parsed_category.entries if parsed_category else {}
     category_code_map = parsed_category.code_entries if parsed_category else {}
-    active_blocklist_names = list(
-        AccountingBlocklistedCustomer.objects.filter(is_active=True).values_list("normalized_name", flat=True)
-    )
-    grouped = defaultdict(list)
-    for row in parsed.rows:
-        grouped[customer_lookup_key(row)].append(row)
+    active_blocklist = compile_active_blocklist()
 
     import_record = AccountingImport.objects.create(
         source_filename=parsed.filename,
@@ -407,7 +725,7 @@ def create_accounting_import(*, outstanding_file, category_file=None, actor=None
         category_sha256=parsed_category.sha256 if parsed_category else "",
         report_date=parsed.report_date,
         uploaded_by=actor if getattr(actor, "is_authenticated", False) else None,
-        parsed_row_count=len(parsed.rows),
+        parsed_row_count=parsed.row_count,
         skipped_row_count=parsed.skipped_row_count,
         customer_count=len(grouped),
         warnings=(parsed.warnings + (parsed_category.warnings if parsed_category else []))[:100],
@@ -421,44 +739,36 @@ def create_accounting_import(*, outstanding_file, category_file=None, actor=None
     due_count = 0
     invoice_count = 0
     summary_records = []
-    invoice_rows_by_summary = []
-    for rows in grouped.values():
-        first = rows[0]
-        customer = find_or_create_customer(first, category_map, category_code_map, active_blocklist_names)
-        bucket_0_30 = sum((row.bucket_0_30 for row in rows), Decimal("0.00"))
-        bucket_30_60 = sum((row.bucket_30_60 for row in rows), Decimal("0.00"))
-        bucket_60_90 = sum((row.bucket_60_90 for row in rows), Decimal("0.00"))
-        bucket_over_90 = sum((row.bucket_over_90 for row in rows), Decimal("0.00"))
-        total = sum((row.total for row in rows), Decimal("0.00"))
-        overdue = bucket_30_60 + bucket_60_90 + bucket_over_90
-        max_days = max((row.days for row in rows), default=0)
-        status, is_due = build_summary_status(customer, rows, overdue, max_days)
+    customers = resolve_import_customers(
+        [group.first for group in grouped.values()], category_map, category_code_map, active_blocklist
+    )
+    for group, customer in zip(grouped.values(), customers):
+        first = group.first
+        status, is_due = build_summary_status(customer, group.status_rows, group.overdue, group.max_days)
         if is_due and not customer.is_ignored:
             due_count += 1
 
-        import_customer = AccountingImportCustomer(
+        summary_records.append(AccountingImportCustomer(
             accounting_import=import_record,
             customer=customer,
             customer_code=customer.customer_code or first.customer_code,
             customer_name=customer.name or first.customer_name,
             category=customer.category,
             email=customer.email,
-            total_outstanding=total,
-            bucket_0_30=bucket_0_30,
-            bucket_30_60=bucket_30_60,
-            bucket_60_90=bucket_60_90,
-            bucket_over_90=bucket_over_90,
-            overdue_amount=overdue,
-            max_days=max_days,
-            invoice_count=len(rows),
+            total_outstanding=group.total,
+            bucket_0_30=group.bucket_0_30,
+            bucket_30_60=group.bucket_30_60,
+            bucket_60_90=group.bucket_60_90,
+            bucket_over_90=group.bucket_over_90,
+            overdue_amount=group.overdue,
+            max_days=group.max_days,
+            invoice_count=group.invoice_count,
             is_due=is_due,
             is_ignored=customer.is_ignored,
             status=status,
-            warnings=[warning for row in rows for warning in row.warnings][:25],
-        )
-        summary_records.append(import_customer)
-        invoice_rows_by_summary.append((import_customer, rows))
-        invoice_count += len(rows)
+            warnings=group.warnings,
+        ))
+        invoice_count += group.invoice_count
 
     AccountingImportCustomer.objects.bulk_create(summary_records, batch_size=1000)
 
@@ -467,17 +777,19 @@ def create_accounting_import(*, outstanding_file, category_file=None, actor=None
             item.customer_id: item
             for item in AccountingImportCustomer.objects.filter(accounting_import=import_record)
         }
-        invoice_rows_by_summary = [
-            (summaries_by_customer_id[summary.customer_id], rows)
-            for summary, rows in invoice_rows_by_summary
-        ]
-
-    invoice_records = [
-        build_invoice_row(import_customer, row)
-        for import_customer, rows in invoice_rows_by_summary
-        for row in rows
-    ]
-    AccountingInvoiceRow.objects.bulk_create(invoice_records, batch_size=5000)
+        summary_records = [summaries_by_customer_id[summary.customer_id] for summary in summary_records]
+    summaries_by_key = dict(zip(grouped, summary_records))
+
+    # Invoice rows are replayed from the spool into fixed-size insert chunks
+    # instead of one import-sized list or a second parse of the upload.
+    chunk = []
+    for row in spool:
+        chunk.append(build_invoice_row(summaries_by_key[customer_lookup_key(row)], row))
+        if len(chunk) >= INVOICE_INSERT_CHUNK_SIZE:
+            insert_invoice_rows(chunk)
+            chunk = []
+    insert_invoice_rows(chunk)
+    spool.close()
 
     import_record.due_customer_count = due_count
     import_record.generated_statement_count = due_count
@@ -579,25 +891,59 @@ def statement_filename(import_customer, style="professional"):
     return f"{safe_name}_{report_date}_statement.pdf"
 
 
+def statement_row_sort_key(row):
+    return (
+        row.invoice_date or date.min,
+        row.invoice_number or row.bill_number or "",
+        row.source_row_number,
+        row.id or 0,
+    )
+
+
 def filter_invoice_rows_for_period(import_customer, *, date_from=None, date_to=None):
     rows = list(import_customer.invoice_rows.all())
     if date_from:
         rows = [row for row in rows if row.invoice_date and row.invoice_date >= date_from]
     if date_to:
         rows = [row for row in rows if row.invoice_date and row.invoice_date <= date_to]
-    return sorted(
-        rows,
-        key=lambda row: (
-            row.invoice_date or date.min,
-            row.invoice_number or row.bill_number or "",
-            row.source_row_number,
-            row.id or 0,
-        ),
-    )
+    return sorted(rows, key=statement_row_sort_key)
+
+
+def statement_ledgers(import_customers, *, date_from=None, date_to=None):
+    """Build ``statement_ledger`` for many import customers from bulk-loaded rows.
+
+    Invoice rows are read with one date-filtered query per
+    ``STATEMENT_LEDGER_CHUNK_SIZE`` customers instead of one per customer.
+    Returns ledgers keyed by import customer id.
+    """
+
+    import_customers = list(import_customers)
+    rows_by_customer = {import_customer.pk: [] for import_customer in import_customers}
+    customer_ids = list(rows_by_customer)
+    for start in range(0, len(customer_ids), STATEMENT_LEDGER_CHUNK_SIZE):
+        queryset = AccountingInvoiceRow.objects.filter(
+            import_customer_id__in=customer_ids[start:start + STATEMENT_LEDGER_CHUNK_SIZE]
+        )
+        if date_from:
+            queryset = queryset.filter(invoice_date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(invoice_date__lte=date_to)
+        for row in queryset.order_by("import_customer_id", "invoice_date", "id").iterator(chunk_size=2000):
+            rows_by_customer[row.import_customer_id].append(row)
+    return {
+        import_customer.pk: statement_ledger(
+            import_customer,
+            date_from=date_from,
+            date_to=date_to,
+            rows=sorted(rows_by_customer[import_customer.pk], key=statement_row_sort_key),
+        )
+        for import_customer in import_customers
+    }
 
 
-def statement_ledger(import_customer, *, date_from=None, date_to=None):
-    rows = filter_invoice_rows_for_period(import_customer, date_from=date_from, date_to=date_to)
+def statement_ledger(import_customer, *, date_from=None, date_to=None, rows=None):
+    if rows is None:
+        rows = filter_invoice_rows_for_period(import_customer, date_from=date_from, date_to=date_to)
     invoice_dates = [row.invoice_date for row in rows if row.invoice_date]
     period_start = date_from or (min(invoice_dates) if invoice_dates else None)
     period_end = date_to or (max(invoice_dates) if invoice_dates else None)
@@ -0,0 +1,205 @@
+"""Streaming statement ZIP archives.
+
+Statements are written into the ZIP as soon as the next one in customer order
+is rendered, so a download never holds the whole archive (or a nested part
+archive) in memory. Request downloads render inline by default; background
+bundle jobs render in a bounded process pool.
+"""
+
+import logging
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+from zipfile import ZIP_STORED, ZipFile
+
+import django
+from django.apps import apps
+from django.conf import settings
+
+from .excel import build_statement_workbook, statement_excel_filename
+from .pdf import build_statement_pdf, company_config
+from .services import statement_filename, statement_ledgers
+
+
+logger = logging.getLogger(__name__)
+
+ZIP_FILENAME_PREFIXES = {
+    "pdf": "accounting-statements",
+    "excel": "accounting-excel-statements",
+}
+
+
+class _ZipChunkSink:
+    """Write-only, non-seekable ZIP target whose bytes are drained after each entry."""
+
+    def __init__(self):
+        self._chunks = []
+        self._position = 0
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def statement_zip_batch_size():
+    return int(getattr(settings, "ACCOUNTING_STATEMENT_ZIP_SYNC_LIMIT", 75))
+
+
+def statement_render_workers():
+    return max(int(getattr(settings, "ACCOUNTING_STATEMENT_RENDER_WORKERS", 0)), 0)
+
+
+def statement_job_render_workers():
+    return max(int(getattr(settings, "ACCOUNTING_STATEMENT_JOB_RENDER_WORKERS", 2)), 0)
+
+
+def _initialize_render_worker():
+    # Spawned/forkserver workers start without Django configured.
+    if not apps.ready:
+        django.setup()
+
+
+def render_statement_pdf(task):
+    import_customer, ledger, style, config = task
+    return build_statement_pdf(import_customer, style=style, config=config, ledger=ledger)
+
+
+def render_statement_workbook(task):
+    import_customer, ledger, _style, _config = task
+    return build_statement_workbook(import_customer, ledger=ledger)
+
+
+def render_in_order(render, tasks, *, workers=None):
+    """Yield ``render(task)`` for every task, in task order.
+
+    With more than one worker the tasks run in a process pool that is kept at
+    most ``2 * workers`` tasks ahead of the consumer. Tasks must be picklable
+    and must not need the database: the pool's processes do not share the
+    request's connection. A daemonic caller cannot start the pool, and a pool
+    that fails to start or breaks renders the remaining tasks inline.
+    """
+
+    workers = statement_render_workers() if workers is None else workers
+    if workers <= 1 or len(tasks) <= 1 or multiprocessing.current_process().daemon:
+        for task in tasks:
+            yield render(task)
+        return
+
+    rendered = 0
+    executor = ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_initialize_render_worker)
+    try:
+        remaining = iter(tasks)
+        pending = deque(executor.submit(render, task) for task in islice(remaining, workers * 2))
+        while pending:
+            result = pending.popleft().result()
+            for task in islice(remaining, 1):
+                pending.append(executor.submit(render, task))
+            rendered += 1
+            yield result
+    except (BrokenProcessPool, OSError) as exc:
+        logger.warning("Statement render pool unavailable (%s); rendering inline.", type(exc).__name__)
+    else:
+        return
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+    for task in tasks[rendered:]:
+        yield render(task)
+
+
+def stream_zip(entries, *, part_size=None, part_filename=None):
+    """Yield the bytes of a stored ZIP holding ``(filename, data)`` entries.
+
+    With ``part_size`` the entries are grouped into nested part ZIPs named by
+    ``part_filename(part_number)``; each part is streamed into the outer entry
+    rather than built in a separate buffer.
+    """
+
+    sink = _ZipChunkSink()
+    entries = iter(entries)
+    try:
+        with ZipFile(sink, "w", ZIP_STORED) as archive:
+            if part_size:
+                for part_number, first in enumerate(entries, start=1):
+                    with archive.open(part_filename(part_number), "w") as part_stream:
+                        with ZipFile(part_stream, "w", ZIP_STORED) as part:
+                            for filename, data in chain([first], islice(entries, part_size - 1)):
+                                part.writestr(filename, data)
+                                yield sink.drain()
+                    yield sink.drain()
+            else:
+                for filename, data in entries:
+                    archive.writestr(filename, data)
+                    yield sink.drain()
+        yield sink.drain()
+    finally:
+        close = getattr(entries, "close", None)
+        if close:
+            close()
+
+
+def select_statement_customers(import_record, *, customer_ids=(), date_from=None, date_to=None):
+    """Return the due, non-ignored customers a statement ZIP covers, with their ledgers."""
+
+    customers = (
+        import_record.customers.filter(is_due=True, is_ignored=False)
+        .select_related("accounting_import")
+        .order_by("customer_name")
+    )
+    if customer_ids:
+        customers = customers.filter(id__in=customer_ids)
+    customers = list(customers)
+    # One ledger per customer serves both the date-range filter and rendering.
+    ledgers = statement_ledgers(customers, date_from=date_from, date_to=date_to)
+    if date_from or date_to:
+        customers = [
+            customer
+            for customer in customers
+            if ledgers[customer.id]["invoice_count"] > 0 and ledgers[customer.id]["is_due"]
+        ]
+    return customers, ledgers
+
+
+def statement_zip_entries(customers, ledgers, style, *, workers=None):
+    config = company_config()
+    tasks = [(customer, ledgers[customer.id], style, config) for customer in customers]
+    filenames = [statement_filename(customer, style=style) for customer in customers]
+    return zip(filenames, render_in_order(render_statement_pdf, tasks, workers=workers))
+
+
+def statement_excel_zip_entries(customers, ledgers, *, workers=None):
+    tasks = [(customer, ledgers[customer.id], None, None) for customer in customers]
+    filenames = [statement_excel_filename(customer) for customer in customers]
+    return zip(filenames, render_in_order(render_statement_workbook, tasks, workers=workers))
+
+
+def statement_bundle_entries(customers, ledgers, *, kind="pdf", style="professional", workers=None):
+    if kind == "excel":
+        return statement_excel_zip_entries(customers, ledgers, workers=workers)
+    return statement_zip_entries(customers, ledgers, style, workers=workers)
+
+
+def statement_zip_chunks(import_record, entries, *, kind="pdf", batched=False):
+    prefix = ZIP_FILENAME_PREFIXES[kind]
+    return stream_zip(
+        entries,
+        part_size=statement_zip_batch_size() if batched else None,
+        part_filename=lambda part_number: f"{prefix}-{import_record.id}-part-{part_number:03d}.zip",
+    )
+
+
+def statement_zip_filename(import_record, *, kind="pdf", suffix="all"):
+    return f"{ZIP_FILENAME_PREFIXES[kind]}-{import_record.id}-{suffix}.zip"
@@ -0,0 +1,572 @@
+"""Durable, leased statement-bundle rendering.
+
+A bundle job renders the same ZIP the synchronous ``statements_zip`` endpoints
+stream, but in a worker (``run_accounting_statement_worker``) that writes the
+finished archive into private storage under its SHA-256. Jobs are keyed by the
+import, kind, style, date range, customer selection, the import's current
+edit state and the company branding rendered into each PDF, so repeating a request reuses the stored archive instead of
+rendering it again.
+"""
+
+import hashlib
+import json
+import logging
+import re
+import secrets
+import tempfile
+import time
+from dataclasses import asdict, dataclass, is_dataclass
+from datetime import timedelta
+
+from django.core.files import File
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from quotations.private_storage import (
+    PrivateEvidenceIntegrityError,
+    PrivateEvidenceStorageError,
+    PrivateEvidenceStorageUnavailable,
+    get_private_evidence_storage,
+)
+
+from .models import AccountingStatementBundleJob
+from .pdf import company_config
+from .statement_archive import (
+    select_statement_customers,
+    statement_bundle_entries,
+    statement_job_render_workers,
+    statement_zip_batch_size,
+    statement_zip_chunks,
+    statement_zip_filename,
+)
+
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_KEY_VERSION = 2
+DEFAULT_LEASE_SECONDS = 10 * 60
+MIN_LEASE_SECONDS = 5 * 60
+MAX_LEASE_SECONDS = 30 * 60
+MAX_JOB_ATTEMPTS = 3
+HEARTBEAT_INTERVAL_SECONDS = 15
+ARTIFACT_REF_PREFIX = "accounting_statements/v1/"
+ARTIFACT_REF_RE = re.compile(r"^accounting_statements/v1/(?P<sha256>[0-9a-f]{64})\.zip$")
+
+STAGE_QUEUED = "queued"
+STAGE_SELECTING = "selecting"
+STAGE_RENDERING = "rendering"
+STAGE_STORING = "storing"
+STAGE_COMPLETED = "completed"
+STAGE_FAILED = "failed"
+ALL_STAGES = (STAGE_QUEUED, STAGE_SELECTING, STAGE_RENDERING, STAGE_STORING, STAGE_COMPLETED, STAGE_FAILED)
+
+ERROR_NO_STATEMENTS = "no_statements"
+ERROR_STORAGE_UNAVAILABLE = "storage_unavailable"
+ERROR_UNEXPECTED_FAILURE = "unexpected_failure"
+SAFE_ERROR_CATEGORIES = {ERROR_NO_STATEMENTS, ERROR_STORAGE_UNAVAILABLE, ERROR_UNEXPECTED_FAILURE}
+NON_RETRYABLE_ERROR_CATEGORIES = {ERROR_NO_STATEMENTS}
+
+
+class StatementBundleLeaseLost(Exception):
+    """The worker's lease expired or was taken over while it was rendering."""
+
+
+class StatementBundleEmpty(Exception):
+    """No customer in the job's selection has a statement to render."""
+
+
+class StatementBundleArtifactMissing(Exception):
+    """A completed job's archive is no longer in private storage."""
+
+
+@dataclass(frozen=True)
+class StatementBundleEnqueueResult:
+    job: AccountingStatementBundleJob | None
+    queued: bool
+    cache_hit: bool = False
+
+
+def bounded_lease_seconds(value=None):
+    try:
+        value = int(value if value is not None else DEFAULT_LEASE_SECONDS)
+    except (TypeError, ValueError, OverflowError):
+        value = DEFAULT_LEASE_SECONDS
+    return min(MAX_LEASE_SECONDS, max(MIN_LEASE_SECONDS, value))
+
+
+def _safe_error_category(value):
+    value = str(value or "")
+    return value if value in SAFE_ERROR_CATEGORIES else ERROR_UNEXPECTED_FAILURE
+
+
+def _iso_or_none(value):
+    return value.isoformat() if value is not None else None
+
+
+def _branding_digest():
+    """Digest the company branding (name, TRN, logo, colours) statements render."""
+
+    config = company_config()
+    branding = asdict(config) if is_dataclass(config) else None
+    return hashlib.sha256(json.dumps(branding, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+def statement_bundle_key(import_record, *, kind, style, date_from=None, date_to=None, customer_ids=()):
+    """Return the cache identity of a bundle for the import's current edit state."""
+
+    # Customer edits (ignore flags, categories, codes) change statement content,
+    # so the newest customer change is part of the identity.
+    customer_state = import_record.customers.aggregate(count=Count("id"), changed_at=Max("updated_at"))
+    payload = {
+        "version": BUNDLE_KEY_VERSION,
+        "import_id": import_record.pk,
+        "import_updated_at": _iso_or_none(import_record.updated_at),
+        "customer_count": customer_state["count"],
+        "customers_updated_at": _iso_or_none(customer_state["changed_at"]),
+        "kind": kind,
+        "style": style,
+        "date_from": _iso_or_none(date_from),
+        "date_to": _iso_or_none(date_to),
+        "customer_ids": sorted(customer_ids),
+        "branding": _branding_digest(),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def statement_bundle_job_projection(job):
+    """Return the allow-listed job state without lease credentials."""
+
+    progress_stage = job.progress_stage if job.progress_stage in ALL_STAGES else ""
+    error_category = (
+        _safe_error_category(job.safe_error_category)
+        if job.status == AccountingStatementBundleJob.STATUS_FAILED
+        else ""
+    )
+    completed = job.status == AccountingStatementBundleJob.STATUS_COMPLETED
+    return {
+        "id": job.pk,
+        "import_id": job.accounting_import_id,
+        "kind": job.kind,
+        "style": job.style,
+        "date_from": _iso_or_none(job.date_from),
+        "date_to": _iso_or_none(job.date_to),
+        "customer_ids": list(job.customer_ids or []),
+        "state": job.status,
+        "progress_stage": progress_stage,
+        "statement_count": job.statement_count,
+        "rendered_count": min(job.rendered_count, job.statement_count),
+        "attempt_count": min(MAX_JOB_ATTEMPTS, int(job.attempt_count or 0)),
+        "safe_error_category": error_category,
+        "artifact_filename": job.artifact_filename if completed else "",
+        "artifact_size": job.artifact_size if completed else 0,
+        "queued_at": _iso_or_none(job.queued_at),
+        "started_at": _iso_or_none(job.started_at),
+        "heartbeat_at": _iso_or_none(job.heartbeat_at),
+        "completed_at": _iso_or_none(job.completed_at),
+        "updated_at": _iso_or_none(job.updated_at),
+        "terminal": job.status in AccountingStatementBundleJob.TERMINAL_STATUSES,
+        "retryable": bool(
+            job.status == AccountingStatementBundleJob.STATUS_FAILED
+            and error_category not in NON_RETRYABLE_ERROR_CATEGORIES
+        ),
+    }
+
+
+def _artifact_key(job):
+    ref = str(job.artifact_ref or "")
+    match = ARTIFACT_REF_RE.fullmatch(ref)
+    if not match or match.group("sha256") != job.artifact_sha256:
+        return ""
+    return ref
+
+
+def statement_bundle_artifact_exists(job):
+    key = _artifact_key(job)
+    if not key:
+        return False
+    try:
+        return get_private_evidence_storage().exists(key)
+    except Exception as exc:
+        raise PrivateEvidenceStorageUnavailable("The private evidence storage backend is unavailable.") from exc
+
+
+def open_statement_bundle_artifact(job):
+    """Open a completed job's stored archive for reading."""
+
+    if job.status != AccountingStatementBundleJob.STATUS_COMPLETED or not statement_bundle_artifact_exists(job):
+        raise StatementBundleArtifactMissing("The statement bundle is not in private storage.")
+    try:
+        return get_private_evidence_storage().open(_artifact_key(job), "rb")
+    except FileNotFoundError as exc:
+        raise StatementBundleArtifactMissing("The statement bundle is not in private storage.") from exc
+    except Exception as exc:
+        raise PrivateEvidenceStorageUnavailable("The private evidence storage backend is unavailable.") from exc
+
+
+def enqueue_statement_bundle(
+    import_record,
+    *,
+    kind=AccountingStatementBundleJob.KIND_PDF,
+    style="professional",
+    date_from=None,
+    date_to=None,
+    customer_ids=(),
+    actor=None,
+):
+    """Return a cached, active or newly queued job for one statement bundle request."""
+
+    customer_ids = sorted({int(customer_id) for customer_id in customer_ids})
+    candidates = import_record.customers.filter(is_due=True, is_ignored=False)
+    if customer_ids:
+        candidates = candidates.filter(id__in=customer_ids)
+    if not candidates.exists():
+        return StatementBundleEnqueueResult(None, queued=False)
+
+    bundle_key = statement_bundle_key(
+        import_record,
+        kind=kind,
+        style=style,
+        date_from=date_from,
+        date_to=date_to,
+        customer_ids=customer_ids,
+    )
+    cached = (
+        AccountingStatementBundleJob.objects.filter(
+            bundle_key=bundle_key,
+            status=AccountingStatementBundleJob.STATUS_COMPLETED,
+        )
+        .order_by("-completed_at", "-pk")
+        .first()
+    )
+    if cached is not None and statement_bundle_artifact_exists(cached):
+        return StatementBundleEnqueueResult(cached, queued=False, cache_hit=True)
+
+    active_jobs = AccountingStatementBundleJob.objects.filter(
+        bundle_key=bundle_key,
+        status__in=AccountingStatementBundleJob.ACTIVE_STATUSES,
+    )
+    active = active_jobs.first()
+    if active is not None:
+        return StatementBundleEnqueueResult(active, queued=False)
+    try:
+        with transaction.atomic():
+            job = AccountingStatementBundleJob.objects.create(
+                accounting_import=import_record,
+                requested_by=actor if getattr(actor, "is_authenticated", False) else None,
+                bundle_key=bundle_key,
+                kind=kind,
+                style=style,
+                date_from=date_from,
+                date_to=date_to,
+                customer_ids=customer_ids,
+            )
+    except IntegrityError:
+        # A concurrent request queued the same bundle first.
+        active = active_jobs.first()
+        if active is None:
+            raise
+        return StatementBundleEnqueueResult(active, queued=False)
+    return StatementBundleEnqueueResult(job, queued=True)
+
+
+def _job_claim_queryset(now):
+    return AccountingStatementBundleJob.objects.filter(
+        Q(status=AccountingStatementBundleJob.STATUS_QUEUED)
+        | Q(status=AccountingStatementBundleJob.STATUS_RUNNING, lease_expires_at__lte=now)
+        | Q(status=AccountingStatementBundleJob.STATUS_RUNNING, lease_expires_at__isnull=True),
+        attempt_count__lt=MAX_JOB_ATTEMPTS,
+    ).order_by("queued_at", "pk")
+
+
+def claim_next_statement_bundle_job(worker_id, *, lease_seconds=None):
+    """Claim one job in a short job-only transaction."""
+
+    worker_id = str(worker_id or "")[:128]
+    if not worker_id:
+        raise ValueError("A worker identity is required.")
+    lease_seconds = bounded_lease_seconds(lease_seconds)
+    now = timezone.now()
+    with transaction.atomic():
+        queryset = _job_claim_queryset(now)
+        if connection.features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        else:
+            queryset = queryset.select_for_update()
+        job = queryset.first()
+        if job is None:
+            return None, ""
+        lease_token = secrets.token_hex(32)
+        job.status = AccountingStatementBundleJob.STATUS_RUNNING
+        job.attempt_count += 1
+        job.lease_owner = worker_id
+        job.lease_token = lease_token
+        job.lease_expires_at = now + timedelta(seconds=lease_seconds)
+        job.heartbeat_at = now
+        job.started_at = job.started_at or now
+        job.safe_error_category = ""
+        job.save(
+            update_fields=[
+                "status",
+                "attempt_count",
+                "lease_owner",
+                "lease_token",
+                "lease_expires_at",
+                "heartbeat_at",
+                "started_at",
+                "safe_error_category",
+                "updated_at",
+            ]
+        )
+        job_id = job.pk
+    return AccountingStatementBundleJob.objects.select_related("accounting_import").get(pk=job_id), lease_token
+
+
+def heartbeat_statement_bundle_job(
+    job_id,
+    lease_token,
+    *,
+    stage=None,
+    statement_count=None,
+    rendered_count=None,
+    lease_seconds=None,
+):
+    """Renew only an unexpired lease; a stale worker cannot revive itself."""
+
+    now = timezone.now()
+    updates = {
+        "lease_expires_at": now + timedelta(seconds=bounded_lease_seconds(lease_seconds)),
+        "heartbeat_at": now,
+        "updated_at": now,
+    }
+    if stage:
+        updates["progress_stage"] = str(stage)[:40]
+    if statement_count is not None:
+        updates["statement_count"] = statement_count
+    if rendered_count is not None:
+        updates["rendered_count"] = rendered_count
+    return (
+        AccountingStatementBundleJob.objects.filter(
+            pk=job_id,
+            status=AccountingStatementBundleJob.STATUS_RUNNING,
+            lease_token=str(lease_token or ""),
+            lease_expires_at__gt=now,
+        ).update(**updates)
+        == 1
+    )
+
+
+def _mark_job_terminal_locked(job, *, status, at, error_category=""):
+    job.status = status
+    job.progress_stage = STAGE_COMPLETED if status == AccountingStatementBundleJob.STATUS_COMPLETED else STAGE_FAILED
+    job.safe_error_category = (
+        _safe_error_category(error_category) if status == AccountingStatementBundleJob.STATUS_FAILED else ""
+    )
+    job.lease_owner = ""
+    job.lease_token = ""
+    job.lease_expires_at = None
+    job.completed_at = at
+    job.save(
+        update_fields=[
+            "status",
+            "progress_stage",
+            "safe_error_category",
+            "lease_owner",
+            "lease_token",
+            "lease_expires_at",
+            "completed_at",
+            "artifact_ref",
+            "artifact_sha256",
+            "artifact_size",
+            "artifact_filename",
+            "rendered_count",
+            "updated_at",
+        ]
+    )
+
+
+def _terminalize_claimed_job(job_id, lease_token, *, status, error_category="", artifact=None):
+    now = timezone.now()
+    with transaction.atomic():
+        job = AccountingStatementBundleJob.objects.select_for_update().get(pk=job_id)
+        if not (
+            job.status == AccountingStatementBundleJob.STATUS_RUNNING
+            and job.lease_token
+            and job.lease_token == str(lease_token or "")
+        ):
+            return False
+        if artifact is not None:
+            job.artifact_ref, job.artifact_sha256, job.artifact_size, job.artifact_filename = artifact
+            job.rendered_count = job.statement_count
+        _mark_job_terminal_locked(job, status=status, at=now, error_category=error_category)
+    return True
+
+
+def _counted_entries(entries, job, lease_token, lease_seconds):
+    rendered = 0
+    last_heartbeat = time.monotonic()
+    for entry in entries:
+        yield entry
+        rendered += 1
+        if time.monotonic() - last_heartbeat >= HEARTBEAT_INTERVAL_SECONDS:
+            if not heartbeat_statement_bundle_job(
+                job.pk, lease_token, rendered_count=rendered, lease_seconds=lease_seconds
+            ):
+                raise StatementBundleLeaseLost()
+            last_heartbeat = time.monotonic()
+
+
+def _store_artifact(handle, sha256):
+    """Save a finished archive under its content address, reusing an identical copy."""
+
+    key = f"{ARTIFACT_REF_PREFIX}{sha256}.zip"
+    storage = get_private_evidence_storage()
+    try:
+        if storage.exists(key):
+            return key
+        handle.seek(0)
+        saved_name = storage.save(key, File(handle, name=f"{sha256}.zip"))
+    except PrivateEvidenceStorageError:
+        raise
+    except Exception as exc:
+        raise PrivateEvidenceStorageUnavailable(
+            "The private evidence storage backend could not save the statement bundle."
+        ) from exc
+    if saved_name != key:
+        # A concurrent worker stored the same bytes first; keep the canonical key.
+        storage.delete(saved_name)
+        if not storage.exists(key):
+            raise PrivateEvidenceIntegrityError("The private evidence storage backend changed the requested object key.")
+    return key
+
+
+def _render_statement_bundle(job, lease_token, lease_seconds):
+    import_record = job.accounting_import
+    customers, ledgers = select_statement_customers(
+        import_record,
+        customer_ids=job.customer_ids,
+        date_from=job.date_from,
+        date_to=job.date_to,
+    )
+    if not customers:
+        raise StatementBundleEmpty()
+    if not heartbeat_statement_bundle_job(
+        job.pk,
+        lease_token,
+        stage=STAGE_RENDERING,
+        statement_count=len(customers),
+        rendered_count=0,
+        lease_seconds=lease_seconds,
+    ):
+        raise StatementBundleLeaseLost()
+
+    is_batched = not job.customer_ids and len(customers) > statement_zip_batch_size()
+    entries = statement_bundle_entries(
+        customers,
+        ledgers,
+        kind=job.kind,
+        style=job.style,
+        workers=statement_job_render_workers(),
+    )
+    chunks = statement_zip_chunks(
+        import_record,
+        _counted_entries(entries, job, lease_token, lease_seconds),
+        kind=job.kind,
+        batched=is_batched,
+    )
+    digest = hashlib.sha256()
+    size = 0
+    with tempfile.TemporaryFile() as handle:
+        for chunk in chunks:
+            handle.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+        if not heartbeat_statement_bundle_job(
+            job.pk,
+            lease_token,
+            stage=STAGE_STORING,
+            rendered_count=len(customers),
+            lease_seconds=lease_seconds,
+        ):
+            raise StatementBundleLeaseLost()
+        sha256 = digest.hexdigest()
+        key = _store_artifact(handle, sha256)
+    suffix = "batched" if is_batched else "selected" if job.customer_ids else "all"
+    return key, sha256, size, statement_zip_filename(import_record, kind=job.kind, suffix=suffix)
+
+
+def process_claimed_statement_bundle_job(job, lease_token, *, lease_seconds=None):
+    """Render, store and terminalize one claimed job; return whether it completed."""
+
+    if not heartbeat_statement_bundle_job(job.pk, lease_token, stage=STAGE_SELECTING, lease_seconds=lease_seconds):
+        return False
+    try:
+        artifact = _render_statement_bundle(job, lease_token, lease_seconds)
+    except StatementBundleLeaseLost:
+        return False
+    except StatementBundleEmpty:
+        _terminalize_claimed_job(
+            job.pk,
+            lease_token,
+            status=AccountingStatementBundleJob.STATUS_FAILED,
+            error_category=ERROR_NO_STATEMENTS,
+        )
+        return False
+    except PrivateEvidenceStorageError:
+        logger.exception("Statement bundle job %s could not store its archive.", job.pk)
+        _terminalize_claimed_job(
+            job.pk,
+            lease_token,
+            status=AccountingStatementBundleJob.STATUS_FAILED,
+            error_category=ERROR_STORAGE_UNAVAILABLE,
+        )
+        return False
+    except Exception:
+        logger.exception("Statement bundle job %s failed.", job.pk)
+        _terminalize_claimed_job(
+            job.pk,
+            lease_token,
+            status=AccountingStatementBundleJob.STATUS_FAILED,
+            error_category=ERROR_UNEXPECTED_FAILURE,
+        )
+        return False
+    return _terminalize_claimed_job(
+        job.pk,
+        lease_token,
+        status=AccountingStatementBundleJob.STATUS_COMPLETED,
+        artifact=artifact,
+    )
+
+
+def fail_exhausted_statement_bundle_jobs():
+    """Fail expired jobs that have used up their crash-recovery attempts."""
+
+    now = timezone.now()
+    candidate_ids = list(
+        AccountingStatementBundleJob.objects.filter(
+            status=AccountingStatementBundleJob.STATUS_RUNNING,
+            lease_expires_at__lte=now,
+            attempt_count__gte=MAX_JOB_ATTEMPTS,
+        )
+        .order_by("pk")
+        .values_list("pk", flat=True)[:100]
+    )
+    failed = 0
+    for job_id in candidate_ids:
+        with transaction.atomic():
+            job = AccountingStatementBundleJob.objects.select_for_update().get(pk=job_id)
+            if not (
+                job.status == AccountingStatementBundleJob.STATUS_RUNNING
+                and job.lease_expires_at
+                and job.lease_expires_at <= now
+                and job.attempt_count >= MAX_JOB_ATTEMPTS
+            ):
+                continue
+            _mark_job_terminal_locked(
+                job,
+                status=AccountingStatementBundleJob.STATUS_FAILED,
+                at=now,
+                error_category=ERROR_UNEXPECTED_FAILURE,
+            )
+            failed += 1
+    return failed
@@ -1,19 +1,60 @@
 import csv
+import random
+import tempfile
+from datetime import date
 from io import BytesIO, StringIO
+from types import SimpleNamespace
+from unittest import skipUnless
 from unittest.mock import patch
 from zipfile import ZipFile
 
 from django.contrib.auth.models import Group, Permission, User
+from django.core.management import call_command
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, override_settings
+from django.db import connection, transaction
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from openpyxl import Workbook, load_workbook
 from pypdf import PdfReader
 from rest_framework.test import APITestCase
 
-from .models import AccountCustomer, AccountingBlocklistedCustomer, AccountingImport, AccountingImportCustomer
-from .parsers import normalize_customer_name, parse_outstanding_upload, split_bill_reference
+from quotations.models import QuotationSettings
+
+from .models import (
+    AccountCustomer,
+    AccountingBlocklistedCustomer,
+    AccountingImport,
+    AccountingImportCustomer,
+    AccountingInvoiceRow,
+    AccountingStatementBundleJob,
+)
+from .parsers import (
+    OutstandingParseStats,
+    iter_csv_rows,
+    iter_outstanding_rows,
+    normalize_customer_name,
+    parse_outstanding_upload,
+    read_outstanding_source,
+    split_bill_reference,
+)
 from .permissions import accounting_permissions_queryset, set_user_accounting_access
+from .services import (
+    BlocklistMatcher,
+    blocklist_name_matches,
+    find_or_create_customer,
+    insert_invoice_rows,
+    resolve_import_customers,
+    statement_ledger,
+    statement_ledgers,
+)
+from .statement_archive import render_in_order, stream_zip
+from .statement_jobs import (
+    claim_next_statement_bundle_job,
+    enqueue_statement_bundle,
+    heartbeat_statement_bundle_job,
+    process_claimed_statement_bundle_job,
+)
 
 
 def make_agewise_row(code, party, bill_no, invoice_date, amount, b0, b30, b60, b90, total, days):
@@ -200,6 +241,21 @@ class AccountingParserTests(TestCase):
         self.assertEqual(parsed.rows[2].customer_name, "P/LABEL")
         self.assertNotIn("Report date was not found", " ".join(parsed.warnings))
 
+    def test_streamed_rows_match_the_materialized_parse(self):
+        for make_upload in [make_agewise_upload, make_repeated_header_export_upload, make_ledger_upload]:
+            with self.subTest(upload=make_upload.__name__):
+                parsed = parse_outstanding_upload(make_upload())
+                source = read_outstanding_source(make_upload())
+                stats = OutstandingParseStats()
+                stream = iter_outstanding_rows(source, stats)
+
+                self.assertEqual(next(stream), parsed.rows[0])
+                self.assertEqual([parsed.rows[0], *stream], parsed.rows)
+                self.assertEqual(list(iter_outstanding_rows(source)), parsed.rows)
+                self.assertEqual(stats.parsed_row_count, parsed.row_count)
+                self.assertEqual(stats.report_date, parsed.report_date)
+                self.assertEqual(stats.total_input_rows, parsed.parse_meta["total_input_rows"])
+
     def test_bill_number_reference_split_is_clean(self):
         examples = {
             "570170-284750-0-": ("570170", "284750-0"),
@@ -212,6 +268,187 @@ class AccountingParserTests(TestCase):
                 self.assertEqual(split_bill_reference(raw), expected)
 
 
+FIXTURE_CUSTOMER_NAMES = [
+    "MILLENNIUM AIRPORT HOTEL",
+    "CARD CUSTOMER",
+    "CREDIT NOTE CUSTOMER",
+    "EMRILL CO",
+    "P/LABEL",
+    "INTERMASS TRADING LLC - BRANCH 01",
+    "INTERMASS TRADING LLC - BRANCH 02",
+    "GENERIC CLINIC CUSTOMER",
+    "DUBAI CLINIC CUSTOMER",
+    "DUPLICATE NAME LLC",
+    "AL AMEEN PHARMACY",
+]
+FIXTURE_BLOCKLIST_NAMES = ["MILLENNIUM AIRPORT HOTEL", "INTERMASS", "CLINIC", "Internal branch", "EMRILL CO LLC"]
+
+
+class BlocklistMatcherParityTests(SimpleTestCase):
+    def assert_parity(self, blocklist_names, customer_names):
+        matcher = BlocklistMatcher(blocklist_names)
+        for customer_name in customer_names:
+            with self.subTest(customer=customer_name):
+                self.assertEqual(
+                    matcher.matches(customer_name),
+                    any(blocklist_name_matches(customer_name, blocklist_name) for blocklist_name in blocklist_names),
+                )
+
+    def test_fixture_names_match_the_pairwise_rules(self):
+        blocklist = [normalize_customer_name(name) for name in FIXTURE_BLOCKLIST_NAMES]
+        customers = [normalize_customer_name(name) for name in FIXTURE_CUSTOMER_NAMES] + ["", "---"]
+
+        for size in range(len(blocklist) + 1):
+            self.assert_parity(blocklist[:size], customers)
+
+    def test_phrases_keep_substring_semantics_across_token_edges(self):
+        self.assert_parity(
+            ["al noor", "noor trading llc", "airport hotel est", "co", "pharmacy"],
+            ["dal noora clinic", "al noor", "alnoor", "the noor trading", "millennium airport hotels", "pharmacy a"],
+        )
+
+    def test_random_names_match_the_pairwise_rules(self):
+        rng = random.Random(20261017)
+        words = [
+            "al", "noor", "intermass", "trading", "llc", "co", "est", "clinic", "pharmacy", "airport",
+            "hotel", "millennium", "branch", "01", "emrill", "dubai", "card", "customer", "medical", "care",
+        ]
+
+        def name(max_words):
+            return " ".join(rng.choice(words) for _ in range(rng.randint(1, max_words)))
+
+        blocklist = [name(3) for _ in range(60)]
+        customers = [name(6) for _ in range(400)]
+
+        self.assert_parity(blocklist, customers)
+
+
+class _Rollback(Exception):
+    pass
+
+
+class CustomerResolutionParityTests(TestCase):
+    def setUp(self):
+        AccountCustomer.objects.create(customer_code="a01", name="Alpha Stores", normalized_name=normalize_customer_name("Alpha Stores"))
+        AccountCustomer.objects.create(customer_code="", name="Beta Clinic", normalized_name=normalize_customer_name("Beta Clinic"))
+        AccountCustomer.objects.create(customer_code="C03", name="Gamma LLC", normalized_name=normalize_customer_name("Gamma LLC"))
+        AccountCustomer.objects.create(customer_code="", name="Intermass", normalized_name=normalize_customer_name("Intermass"))
+        self.rows = [
+            SimpleNamespace(customer_code="A01", customer_name="Alpha Stores Branch"),
+            SimpleNamespace(customer_code="B02", customer_name="Beta Clinic"),
+            SimpleNamespace(customer_code="D04", customer_name="Gamma LLC"),
+            SimpleNamespace(customer_code="", customer_name="Gamma LLC"),
+            SimpleNamespace(customer_code="", customer_name="Delta Trading"),
+            SimpleNamespace(customer_code="E05", customer_name="Delta Trading"),
+            SimpleNamespace(customer_code="F06", customer_name="Epsilon Co"),
+            SimpleNamespace(customer_code="", customer_name="Epsilon Co"),
+            SimpleNamespace(customer_code="G07", customer_name="Intermass"),
+        ]
+        self.category_map = {normalize_customer_name("Gamma LLC"): "card"}
+        self.category_code_map = {"a01": "credit", "f06": "cash"}
+        self.blocklist = BlocklistMatcher([normalize_customer_name("Intermass")])
+
+    def snapshot(self, customers):
+        ids = [customer.pk for customer in customers]
+        return (
+            [ids.index(pk) for pk in ids],
+            [(customer.customer_code, customer.name, customer.category, customer.is_ignored) for customer in customers],
+            sorted(AccountCustomer.objects.values_list("customer_code", "name", "normalized_name", "category", "is_ignored")),
+        )
+
+    def test_bulk_resolution_matches_row_by_row_resolution(self):
+        try:
+            with transaction.atomic():
+                expected = self.snapshot([
+                    find_or_create_customer(row, self.category_map, self.category_code_map, self.blocklist)
+                    for row in self.rows
+                ])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        self.assertEqual(
+            self.snapshot(resolve_import_customers(self.rows, self.category_map, self.category_code_map, self.blocklist)),
+            expected,
+        )
+
+    def test_customer_matched_by_code_and_by_name_is_updated_once(self):
+        AccountCustomer.objects.create(
+            customer_code="H08",
+            name="Eta Pharmacy",
+            normalized_name=normalize_customer_name("Eta Pharmacy"),
+            category="credit",
+        )
+        rows = [
+            SimpleNamespace(customer_code="H08", customer_name="Eta Pharmacy Branch"),
+            SimpleNamespace(customer_code="", customer_name="Eta Pharmacy"),
+        ]
+        category_map = {normalize_customer_name("Eta Pharmacy"): "credit"}
+        category_code_map = {"h08": "cash"}
+        try:
+            with transaction.atomic():
+                expected = self.snapshot([
+                    find_or_create_customer(row, category_map, category_code_map, self.blocklist) for row in rows
+                ])
+                raise _Rollback
+        except _Rollback:
+            pass
+
+        resolved = resolve_import_customers(rows, category_map, category_code_map, self.blocklist)
+
+        self.assertEqual(self.snapshot(resolved), expected)
+        self.assertEqual(AccountCustomer.objects.get(customer_code="H08").category, "credit")
+
+    def test_query_count_does_not_grow_with_customers(self):
+        def rows(count):
+            return [SimpleNamespace(customer_code=f"N{index:04d}", customer_name=f"New Customer {index}") for index in range(count)]
+
+        with self.assertNumQueries(4):
+            resolve_import_customers(rows(20) + self.rows, self.category_map, self.category_code_map, self.blocklist)
+        with self.assertNumQueries(4):
+            resolve_import_customers(rows(200) + self.rows, self.category_map, self.category_code_map, self.blocklist)
+
+
+class StatementArchiveTests(SimpleTestCase):
+    def test_render_pool_returns_results_in_task_order(self):
+        tasks = list(range(-12, 0))
+        self.assertEqual(list(render_in_order(abs, tasks, workers=3)), [abs(task) for task in tasks])
+        self.assertEqual(list(render_in_order(abs, tasks, workers=0)), [abs(task) for task in tasks])
+
+    def test_render_pool_falls_back_inline_in_a_daemonic_process(self):
+        tasks = list(range(-6, 0))
+        with (
+            patch("accounting.statement_archive.multiprocessing.current_process", return_value=SimpleNamespace(daemon=True)),
+            patch("accounting.statement_archive.ProcessPoolExecutor") as executor,
+        ):
+            self.assertEqual(list(render_in_order(abs, tasks, workers=3)), [abs(task) for task in tasks])
+        executor.assert_not_called()
+
+    def test_render_pool_falls_back_inline_when_the_pool_cannot_start(self):
+        tasks = list(range(-6, 0))
+        with patch(
+            "accounting.statement_archive.ProcessPoolExecutor.submit",
+            side_effect=OSError("cannot fork"),
+        ):
+            self.assertEqual(list(render_in_order(abs, tasks, workers=3)), [abs(task) for task in tasks])
+
+    def test_stream_zip_writes_flat_and_nested_part_archives(self):
+        entries = [(f"statement-{index}.pdf", f"body {index}".encode()) for index in range(5)]
+
+        with ZipFile(BytesIO(b"".join(stream_zip(iter(entries))))) as archive:
+            self.assertEqual([(name, archive.read(name)) for name in archive.namelist()], entries)
+
+        chunks = list(stream_zip(iter(entries), part_size=2, part_filename=lambda number: f"part-{number:03d}.zip"))
+        self.assertGreater(len(chunks), 3)
+        with ZipFile(BytesIO(b"".join(chunks))) as archive:
+            self.assertEqual(archive.namelist(), ["part-001.zip", "part-002.zip", "part-003.zip"])
+            parts = []
+            for name in archive.namelist():
+                with ZipFile(BytesIO(archive.read(name))) as part:
+                    parts.append([(entry, part.read(entry)) for entry in part.namelist()])
+        self.assertEqual(parts, [entries[0:2], entries[2:4], entries[4:]])
+
+
 class AccountingAPITests(APITestCase):
     def setUp(self):
         self.customer = User.objects.create_user(username="customer", password="pass")
@@ -569,6 +806,49 @@ class AccountingAPITests(APITestCase):
         self.assertTrue(summary.is_ignored)
         self.assertFalse(summary.is_due)
 
+    def test_upload_streams_invoice_rows_in_chunks(self):
+        with patch("accounting.services.INVOICE_INSERT_CHUNK_SIZE", 2), patch(
+            "accounting.services.insert_invoice_rows", wraps=insert_invoice_rows
+        ) as insert_mock, patch("accounting.parsers.iter_csv_rows", wraps=iter_csv_rows) as parse_mock:
+            self.client.force_authenticate(self.accountant)
+            response = self.client.post(reverse("accounting-import-upload"), {"file": make_ledger_upload()}, format="multipart")
+
+        self.assertEqual(response.status_code, 201)
+        # Rows are spooled between the grouping and insert passes, not re-parsed.
+        self.assertEqual(parse_mock.call_count, 1)
+        parsed = parse_outstanding_upload(make_ledger_upload())
+        self.assertEqual([len(call.args[0]) for call in insert_mock.call_args_list[:-1]], [2] * (len(parsed.rows) // 2))
+        import_record = AccountingImport.objects.get(pk=response.data["id"])
+        self.assertEqual(import_record.parsed_row_count, len(parsed.rows))
+        for summary in import_record.customers.all():
+            rows = [row for row in parsed.rows if row.customer_code == summary.customer_code]
+            self.assertEqual(summary.invoice_count, len(rows))
+            self.assertEqual(summary.total_outstanding, sum(row.total for row in rows))
+            self.assertEqual(
+                list(summary.invoice_rows.order_by("id").values_list("source_row_number", flat=True)),
+                [row.source_row_number for row in rows],
+            )
+
+    @skipUnless(connection.vendor == "postgresql", "COPY FROM STDIN is only used on PostgreSQL.")
+    def test_postgresql_copy_insert_round_trips_invoice_rows(self):
+        self.client.force_authenticate(self.accountant)
+        response = self.client.post(reverse("accounting-import-upload"), {"file": make_ledger_upload()}, format="multipart")
+
+        self.assertEqual(response.status_code, 201)
+        parsed = parse_outstanding_upload(make_ledger_upload())
+        stored = AccountingInvoiceRow.objects.filter(import_customer__accounting_import_id=response.data["id"]).order_by("id")
+        self.assertEqual(
+            [
+                (row.source_row_number, row.invoice_number, row.lpo_reference, row.invoice_date, row.total, row.days, row.raw_data, row.warnings)
+                for row in stored
+            ],
+            [
+                (row.source_row_number, row.invoice_number, row.lpo_reference, row.invoice_date, row.total, row.days, row.raw_data, row.warnings)
+                for row in parsed.rows
+            ],
+        )
+        self.assertTrue(all(row.created_at for row in stored))
+
     def test_same_customer_name_with_different_codes_stays_separate(self):
         buffer = StringIO()
         writer = csv.writer(buffer)
@@ -659,7 +939,7 @@ class AccountingAPITests(APITestCase):
     def test_duplicate_upload_returns_previous_import_without_creating_another(self):
         first = self.upload_import()
         self.assertEqual(first.status_code, 201)
-        with patch("accounting.services.parse_outstanding_upload") as parse_mock:
+        with patch("accounting.services.iter_outstanding_rows") as parse_mock:
             second = self.client.post(reverse("accounting-import-upload"), {"file": make_agewise_upload()}, format="multipart")
         self.assertEqual(second.status_code, 200)
         self.assertTrue(second.data["duplicate"])
@@ -701,9 +981,28 @@ class AccountingAPITests(APITestCase):
         zip_response = self.client.get(reverse("accounting-import-statements-zip", args=[import_id]))
         self.assertEqual(zip_response.status_code, 200)
         self.assertEqual(zip_response["Content-Type"], "application/zip")
-        with ZipFile(BytesIO(zip_response.content)) as archive:
+        with ZipFile(BytesIO(zip_response.getvalue())) as archive:
             self.assertGreaterEqual(len(archive.namelist()), 1)
 
+    def test_bulk_statement_ledgers_match_per_customer_ledgers(self):
+        self.upload_import()
+        import_record = AccountingImport.objects.get(pk=self.upload_ledger_import().data["id"])
+        customers = list(AccountingImportCustomer.objects.select_related("accounting_import").order_by("id"))
+
+        for date_from, date_to in [(None, None), (date(2026, 1, 15), None), (None, date(2026, 2, 1)), (date(2026, 2, 1), date(2026, 2, 28))]:
+            with self.subTest(date_from=date_from, date_to=date_to):
+                with self.assertNumQueries(1):
+                    ledgers = statement_ledgers(customers, date_from=date_from, date_to=date_to)
+                for customer in customers:
+                    self.assertEqual(ledgers[customer.id], statement_ledger(customer, date_from=date_from, date_to=date_to))
+
+        summary = import_record.customers.get(customer__customer_code="083")
+        self.client.force_authenticate(self.accountant)
+        with patch("accounting.serializers.statement_ledger", wraps=statement_ledger) as ledger_mock:
+            detail = self.client.get(reverse("accounting-import-customer-detail", args=[summary.id]), {"date_from": "15/01/2026"})
+        self.assertEqual(detail.status_code, 200)
+        self.assertEqual(ledger_mock.call_count, 1)
+
     def test_ledger_running_balance_and_date_range_outputs(self):
         response = self.upload_ledger_import()
         import_id = response.data["id"]
@@ -792,7 +1091,7 @@ class AccountingAPITests(APITestCase):
             {"date_from": "2026-02-01", "date_to": "2026-02-28"},
         )
         self.assertEqual(zip_response.status_code, 200)
-        with ZipFile(BytesIO(zip_response.content)) as archive:
+        with ZipFile(BytesIO(zip_response.getvalue())) as archive:
             self.assertTrue(any("MILLENNIUM" in name for name in archive.namelist()))
             pdf_text = "\n".join(
                 page.extract_text() or ""
@@ -836,7 +1135,7 @@ class AccountingAPITests(APITestCase):
             {"date_from": "2026-02-01", "date_to": "2026-02-28"},
         )
         self.assertEqual(excel_zip.status_code, 200)
-        with ZipFile(BytesIO(excel_zip.content)) as archive:
+        with ZipFile(BytesIO(excel_zip.getvalue())) as archive:
             excel_names = archive.namelist()
             self.assertTrue(any(name.endswith(".xlsx") and "MILLENNIUM" in name for name in excel_names))
 
@@ -853,7 +1152,7 @@ class AccountingAPITests(APITestCase):
 
         zip_response = self.client.get(reverse("accounting-import-statements-zip", args=[import_id]))
         self.assertEqual(zip_response.status_code, 200)
-        with ZipFile(BytesIO(zip_response.content)) as archive:
+        with ZipFile(BytesIO(zip_response.getvalue())) as archive:
             names = archive.namelist()
         self.assertFalse(any("MILLENNIUM" in name for name in names))
 
@@ -867,7 +1166,7 @@ class AccountingAPITests(APITestCase):
         batched = self.client.get(reverse("accounting-import-statements-zip", args=[import_id]))
         self.assertEqual(batched.status_code, 200)
         self.assertEqual(batched["X-Accounting-Zip-Batched"], "true")
-        with ZipFile(BytesIO(batched.content)) as archive:
+        with ZipFile(BytesIO(batched.getvalue())) as archive:
             part_names = archive.namelist()
             self.assertGreaterEqual(len(part_names), 2)
             self.assertTrue(all(name.endswith(".zip") for name in part_names))
@@ -881,11 +1180,132 @@ class AccountingAPITests(APITestCase):
         )
         self.assertEqual(selected.status_code, 200)
         self.assertEqual(selected["Content-Type"], "application/zip")
-        with ZipFile(BytesIO(selected.content)) as archive:
+        with ZipFile(BytesIO(selected.getvalue())) as archive:
             names = archive.namelist()
         self.assertEqual(len(names), 1)
         self.assertTrue(any("MILLENNIUM" in name for name in names))
 
+    def test_statement_zip_render_pool_keeps_customer_order(self):
+        response = self.upload_import()
+        import_id = response.data["id"]
+        self.client.force_authenticate(self.accountant)
+
+        archives = {}
+        for workers in [0, 2]:
+            with self.subTest(workers=workers), override_settings(ACCOUNTING_STATEMENT_RENDER_WORKERS=workers):
+                zip_response = self.client.get(reverse("accounting-import-statements-zip", args=[import_id]))
+                self.assertEqual(zip_response.status_code, 200)
+                self.assertTrue(zip_response.streaming)
+                with ZipFile(BytesIO(zip_response.getvalue())) as archive:
+                    archives[workers] = [
+                        (name, "\n".join(page.extract_text() or "" for page in PdfReader(BytesIO(archive.read(name))).pages))
+                        for name in archive.namelist()
+                    ]
+
+        self.assertEqual(archives[0], archives[2])
+        expected_names = AccountingImportCustomer.objects.filter(
+            accounting_import_id=import_id, is_due=True, is_ignored=False
+        ).order_by("customer_name").values_list("customer_name", flat=True)
+        self.assertEqual(len(archives[2]), len(expected_names))
+        for (name, _text), customer_name in zip(archives[2], expected_names):
+            self.assertIn(customer_name.split()[0], name)
+
+    @override_settings(ACCOUNTING_STATEMENT_RENDER_WORKERS=0)
+    def test_statement_bundle_job_renders_once_and_serves_the_cached_archive(self):
+        import_id = self.upload_import().data["id"]
+        self.client.force_authenticate(self.accountant)
+        bundles_url = reverse("accounting-import-statement-bundles", args=[import_id])
+
+        with tempfile.TemporaryDirectory() as storage_root, override_settings(QUOTATION_PRIVATE_STORAGE_ROOT=storage_root):
+            queued = self.client.post(bundles_url, {"kind": "pdf", "style": "classic"}, format="json")
+            self.assertEqual(queued.status_code, 202)
+            self.assertEqual(queued.data["state"], "queued")
+            self.assertNotIn("lease_token", queued.data)
+            repeated = self.client.post(bundles_url, {"kind": "pdf", "style": "classic"}, format="json")
+            self.assertEqual(repeated.data["id"], queued.data["id"])
+
+            not_ready = self.client.get(reverse("accounting-statement-bundle-download", args=[queued.data["id"]]))
+            self.assertEqual(not_ready.status_code, 409)
+
+            stdout = StringIO()
+            call_command("run_accounting_statement_worker", "--once", "--worker-id", "test-worker", stdout=stdout)
+            self.assertIn("processed 1 job(s)", stdout.getvalue())
+
+            job = AccountingStatementBundleJob.objects.get(pk=queued.data["id"])
+            self.assertEqual(job.status, AccountingStatementBundleJob.STATUS_COMPLETED)
+            self.assertEqual(job.lease_token, "")
+            self.assertTrue(job.artifact_ref.endswith(f"{job.artifact_sha256}.zip"))
+            progress = self.client.get(reverse("accounting-statement-bundle-detail", args=[job.pk])).data
+            self.assertEqual(progress["progress_stage"], "completed")
+            self.assertEqual(progress["rendered_count"], progress["statement_count"])
+
+            download = self.client.get(reverse("accounting-statement-bundle-download", args=[job.pk]))
+            self.assertEqual(download.status_code, 200)
+            sync = self.client.get(reverse("accounting-import-statements-zip", args=[import_id]), {"style": "classic"})
+            with ZipFile(BytesIO(b"".join(download.streaming_content))) as archive, ZipFile(BytesIO(sync.getvalue())) as expected:
+                self.assertEqual(archive.namelist(), expected.namelist())
+                self.assertEqual(len(archive.namelist()), progress["statement_count"])
+
+            cached = self.client.post(bundles_url, {"kind": "pdf", "style": "classic"}, format="json")
+            self.assertEqual(cached.status_code, 200)
+            self.assertEqual(cached.data["id"], job.pk)
+            restyled = self.client.post(bundles_url, {"kind": "pdf", "style": "professional"}, format="json")
+            self.assertEqual(restyled.status_code, 202)
+
+            customer = AccountingImportCustomer.objects.filter(accounting_import_id=import_id, is_due=True).first()
+            self.client.patch(
+                reverse("accounting-import-customer-detail", args=[customer.pk]),
+                {"is_ignored": True},
+                format="json",
+            )
+            edited = self.client.post(bundles_url, {"kind": "pdf", "style": "classic"}, format="json")
+            self.assertEqual(edited.status_code, 202)
+            self.assertNotEqual(edited.data["id"], job.pk)
+
+    def test_statement_bundle_list_shows_only_the_callers_jobs(self):
+        import_id = self.upload_import().data["id"]
+        self.client.force_authenticate(self.accountant)
+        queued = self.client.post(
+            reverse("accounting-import-statement-bundles", args=[import_id]), {"kind": "excel"}, format="json"
+        )
+        list_url = reverse("accounting-statement-bundle-list")
+
+        self.assertEqual([job["id"] for job in self.client.get(list_url).data], [queued.data["id"]])
+        self.client.force_authenticate(self.superuser)
+        self.assertEqual(self.client.get(list_url).data, [])
+        shared = self.client.get(reverse("accounting-statement-bundle-detail", args=[queued.data["id"]]))
+        self.assertEqual(shared.status_code, 200)
+
+    def test_company_branding_change_queues_a_new_statement_bundle(self):
+        import_record = AccountingImport.objects.get(pk=self.upload_import().data["id"])
+        first = enqueue_statement_bundle(import_record, kind="pdf")
+        self.assertTrue(first.queued)
+        self.assertEqual(enqueue_statement_bundle(import_record, kind="pdf").job.pk, first.job.pk)
+
+        QuotationSettings.objects.update_or_create(pk=1, defaults={"company_name": "Al Ameen Medical Supplies"})
+        rebranded = enqueue_statement_bundle(import_record, kind="pdf")
+
+        self.assertTrue(rebranded.queued)
+        self.assertNotEqual(rebranded.job.pk, first.job.pk)
+        self.assertNotEqual(rebranded.job.bundle_key, first.job.bundle_key)
+
+    def test_statement_bundle_lease_cannot_be_renewed_after_it_expires(self):
+        import_record = AccountingImport.objects.get(pk=self.upload_import().data["id"])
+        result = enqueue_statement_bundle(import_record, kind="excel")
+        self.assertTrue(result.queued)
+
+        job, lease_token = claim_next_statement_bundle_job("worker-a")
+        self.assertEqual(job.pk, result.job.pk)
+        self.assertTrue(heartbeat_statement_bundle_job(job.pk, lease_token, stage="rendering"))
+        self.assertFalse(heartbeat_statement_bundle_job(job.pk, "stale-token"))
+
+        AccountingStatementBundleJob.objects.filter(pk=job.pk).update(lease_expires_at=timezone.now())
+        self.assertFalse(heartbeat_statement_bundle_job(job.pk, lease_token))
+        reclaimed, new_token = claim_next_statement_bundle_job("worker-b")
+        self.assertEqual((reclaimed.pk, reclaimed.attempt_count), (job.pk, 2))
+        self.assertFalse(process_claimed_statement_bundle_job(job, lease_token))
+        self.assertEqual(AccountingStatementBundleJob.objects.get(pk=job.pk).lease_owner, "worker-b")
+
     def test_ageing_filters_and_ordering(self):
         self.upload_import()
         self.client.force_authenticate(self.accountant)
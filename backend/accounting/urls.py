@@ -8,6 +8,7 @@ router.register(r"customers", views.AccountCustomerViewSet, basename="accounting
 router.register(r"blocklist", views.AccountingBlocklistViewSet, basename="accounting-blocklist")
 router.register(r"imports", views.AccountingImportViewSet, basename="accounting-import")
 router.register(r"import-customers", views.AccountingImportCustomerViewSet, basename="accounting-import-customer")
+router.register(r"statement-bundles", views.AccountingStatementBundleJobViewSet, basename="accounting-statement-bundle")
 
 urlpatterns = [
     path("dashboard/", views.AccountingDashboardView.as_view(), name="accounting-dashboard"),
@@ -1,20 +1,25 @@
-from io import BytesIO
 from decimal import Decimal
-from zipfile import ZIP_STORED, ZipFile
 
-from django.conf import settings
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.db import IntegrityError, transaction
 from django.db.models import Count, DecimalField, Max, Q, Sum, Value
 from django.db.models.functions import Coalesce
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.parsers import FormParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import AccountCustomer, AccountingBlocklistedCustomer, AccountingImport, AccountingImportCustomer
+from quotations.private_storage import PrivateEvidenceStorageUnavailable
+
+from .models import (
+    AccountCustomer,
+    AccountingBlocklistedCustomer,
+    AccountingImport,
+    AccountingImportCustomer,
+    AccountingStatementBundleJob,
+)
 from .formatting import parse_accounting_date, format_accounting_datetime
 from .excel import build_statement_workbook, statement_excel_filename
 from .pdf import build_statement_pdf
@@ -34,9 +39,22 @@ from .services import (
     category_update_message,
     create_accounting_import,
     statement_filename,
-    statement_ledger,
     update_import_customer,
 )
+from .statement_archive import (
+    ZIP_FILENAME_PREFIXES,
+    select_statement_customers,
+    statement_bundle_entries,
+    statement_zip_batch_size,
+    statement_zip_chunks,
+    statement_zip_filename,
+)
+from .statement_jobs import (
+    StatementBundleArtifactMissing,
+    enqueue_statement_bundle,
+    open_statement_bundle_artifact,
+    statement_bundle_job_projection,
+)
 
 
 def parse_accounting_date_range(request):
@@ -49,28 +67,6 @@ def money_string(value):
     return f"{value or Decimal('0.00'):.2f}"
 
 
-def chunked(items, size):
-    size = max(int(size or 1), 1)
-    for index in range(0, len(items), size):
-        yield index // size + 1, items[index : index + size]
-
-
-def write_statement_zip(archive, customers, style, *, date_from=None, date_to=None):
-    for customer in customers:
-        archive.writestr(
-            statement_filename(customer, style=style),
-            build_statement_pdf(customer, style=style, date_from=date_from, date_to=date_to),
-        )
-
-
-def write_statement_excel_zip(archive, customers, *, date_from=None, date_to=None):
-    for customer in customers:
-        archive.writestr(
-            statement_excel_filename(customer),
-            build_statement_workbook(customer, date_from=date_from, date_to=date_to),
-        )
-
-
 def validation_error_response(exc):
     message = getattr(exc, "messages", None)
     if message:
@@ -227,106 +223,118 @@ class AccountingImportViewSet(viewsets.ReadOnlyModelViewSet):
         data["message"] = data["category_update_message"]
         return Response(data)
 
-    @action(detail=True, methods=["get"])
-    def statements_zip(self, request, pk=None):
-        import_record = self.get_object()
-        style = request.query_params.get("style", "professional")
+    def statement_zip_request(self, request):
         date_from, date_to = parse_accounting_date_range(request)
         customer_ids = [
             int(item)
             for item in request.query_params.get("customer_ids", "").replace(" ", "").split(",")
             if item.isdigit()
         ]
-        customers = (
-            import_record.customers.filter(is_due=True, is_ignored=False)
-            .prefetch_related("invoice_rows")
-            .order_by("customer_name")
+        return customer_ids, date_from, date_to
+
+    def statement_zip_response(self, request, *, kind, empty_message):
+        import_record = self.get_object()
+        style = request.query_params.get("style", "professional")
+        customer_ids, date_from, date_to = self.statement_zip_request(request)
+        customers, ledgers = select_statement_customers(
+            import_record,
+            customer_ids=customer_ids,
+            date_from=date_from,
+            date_to=date_to,
         )
-        if customer_ids:
-            customers = customers.filter(id__in=customer_ids)
-        customers = list(customers)
-        if date_from or date_to:
-            filtered_customers = []
-            for customer in customers:
-                ledger = statement_ledger(customer, date_from=date_from, date_to=date_to)
-                if ledger["invoice_count"] > 0 and ledger["is_due"]:
-                    filtered_customers.append(customer)
-            customers = filtered_customers
         customer_count = len(customers)
-        batch_size = int(getattr(settings, "ACCOUNTING_STATEMENT_ZIP_SYNC_LIMIT", 75))
+        batch_size = statement_zip_batch_size()
         if customer_count == 0:
-            return Response({"detail": "No due, non-ignored customers are available for this ZIP."}, status=status.HTTP_400_BAD_REQUEST)
-        buffer = BytesIO()
+            return Response({"detail": empty_message}, status=status.HTTP_400_BAD_REQUEST)
         is_batched = not customer_ids and customer_count > batch_size
-        with ZipFile(buffer, "w", ZIP_STORED) as archive:
-            if is_batched:
-                for part_number, batch in chunked(customers, batch_size):
-                    part_buffer = BytesIO()
-                    with ZipFile(part_buffer, "w", ZIP_STORED) as part_archive:
-                        write_statement_zip(part_archive, batch, style, date_from=date_from, date_to=date_to)
-                    archive.writestr(
-                        f"accounting-statements-{import_record.id}-part-{part_number:03d}.zip",
-                        part_buffer.getvalue(),
-                    )
-            else:
-                write_statement_zip(archive, customers, style, date_from=date_from, date_to=date_to)
-        response = HttpResponse(buffer.getvalue(), content_type="application/zip")
+        # Parts are streamed into the outer archive; the response is never buffered whole.
+        response = StreamingHttpResponse(
+            statement_zip_chunks(
+                import_record,
+                statement_bundle_entries(customers, ledgers, kind=kind, style=style),
+                kind=kind,
+                batched=is_batched,
+            ),
+            content_type="application/zip",
+        )
         suffix = "batched" if is_batched else "selected" if customer_ids else "all"
-        response["Content-Disposition"] = f'attachment; filename="accounting-statements-{import_record.id}-{suffix}.zip"'
+        response["Content-Disposition"] = f'attachment; filename="{statement_zip_filename(import_record, kind=kind, suffix=suffix)}"'
         response["X-Accounting-Zip-Batched"] = "true" if is_batched else "false"
         response["X-Accounting-Statement-Count"] = str(customer_count)
         response["X-Accounting-Zip-Batch-Size"] = str(batch_size)
         return response
 
+    @action(detail=True, methods=["get"])
+    def statements_zip(self, request, pk=None):
+        return self.statement_zip_response(
+            request,
+            kind=AccountingStatementBundleJob.KIND_PDF,
+            empty_message="No due, non-ignored customers are available for this ZIP.",
+        )
+
     @action(detail=True, methods=["get"])
     def statements_excel_zip(self, request, pk=None):
+        return self.statement_zip_response(
+            request,
+            kind=AccountingStatementBundleJob.KIND_EXCEL,
+            empty_message="No due, non-ignored customers are available for this Excel ZIP.",
+        )
+
+    @action(detail=True, methods=["post"])
+    def statement_bundles(self, request, pk=None):
         import_record = self.get_object()
-        date_from, date_to = parse_accounting_date_range(request)
-        customer_ids = [
-            int(item)
-            for item in request.query_params.get("customer_ids", "").replace(" ", "").split(",")
-            if item.isdigit()
-        ]
-        customers = (
-            import_record.customers.filter(is_due=True, is_ignored=False)
-            .prefetch_related("invoice_rows")
-            .order_by("customer_name")
+        kind = request.data.get("kind", AccountingStatementBundleJob.KIND_PDF)
+        if kind not in ZIP_FILENAME_PREFIXES:
+            return Response({"detail": "Unknown statement bundle kind."}, status=status.HTTP_400_BAD_REQUEST)
+        customer_ids = [int(item) for item in request.data.get("customer_ids", []) or [] if str(item).isdigit()]
+        result = enqueue_statement_bundle(
+            import_record,
+            kind=kind,
+            style=str(request.data.get("style") or "professional"),
+            date_from=parse_accounting_date(str(request.data.get("date_from") or "")),
+            date_to=parse_accounting_date(str(request.data.get("date_to") or "")),
+            customer_ids=customer_ids,
+            actor=request.user,
         )
-        if customer_ids:
-            customers = customers.filter(id__in=customer_ids)
-        customers = list(customers)
-        if date_from or date_to:
-            customers = [
-                customer
-                for customer in customers
-                if (lambda ledger: ledger["invoice_count"] > 0 and ledger["is_due"])(
-                    statement_ledger(customer, date_from=date_from, date_to=date_to)
-                )
-            ]
-        customer_count = len(customers)
-        batch_size = int(getattr(settings, "ACCOUNTING_STATEMENT_ZIP_SYNC_LIMIT", 75))
-        if customer_count == 0:
-            return Response({"detail": "No due, non-ignored customers are available for this Excel ZIP."}, status=status.HTTP_400_BAD_REQUEST)
-        buffer = BytesIO()
-        is_batched = not customer_ids and customer_count > batch_size
-        with ZipFile(buffer, "w", ZIP_STORED) as archive:
-            if is_batched:
-                for part_number, batch in chunked(customers, batch_size):
-                    part_buffer = BytesIO()
-                    with ZipFile(part_buffer, "w", ZIP_STORED) as part_archive:
-                        write_statement_excel_zip(part_archive, batch, date_from=date_from, date_to=date_to)
-                    archive.writestr(
-                        f"accounting-excel-statements-{import_record.id}-part-{part_number:03d}.zip",
-                        part_buffer.getvalue(),
-                    )
-            else:
-                write_statement_excel_zip(archive, customers, date_from=date_from, date_to=date_to)
-        response = HttpResponse(buffer.getvalue(), content_type="application/zip")
-        suffix = "batched" if is_batched else "selected" if customer_ids else "all"
-        response["Content-Disposition"] = f'attachment; filename="accounting-excel-statements-{import_record.id}-{suffix}.zip"'
-        response["X-Accounting-Zip-Batched"] = "true" if is_batched else "false"
-        response["X-Accounting-Statement-Count"] = str(customer_count)
-        response["X-Accounting-Zip-Batch-Size"] = str(batch_size)
+        if result.job is None:
+            return Response({"detail": "No due, non-ignored customers are available for this ZIP."}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(
+            statement_bundle_job_projection(result.job),
+            status=status.HTTP_200_OK if result.cache_hit else status.HTTP_202_ACCEPTED,
+        )
+
+
+class AccountingStatementBundleJobViewSet(viewsets.ReadOnlyModelViewSet):
+    permission_classes = [IsAccountingUser]
+    queryset = AccountingStatementBundleJob.objects.select_related("accounting_import")
+
+    def list(self, request, *args, **kwargs):
+        # Listing is limited to the caller's own requests. A job id returned by
+        # the bundle POST stays readable by any accounting user, since a cached
+        # bundle may have been requested by a colleague for the same statements.
+        queryset = self.get_queryset().filter(requested_by=request.user).order_by("-created_at", "-pk")
+        import_id = request.query_params.get("import_id")
+        if import_id:
+            queryset = queryset.filter(accounting_import_id=import_id)
+        return Response([statement_bundle_job_projection(job) for job in queryset[:50]])
+
+    def retrieve(self, request, *args, **kwargs):
+        return Response(statement_bundle_job_projection(self.get_object()))
+
+    @action(detail=True, methods=["get"])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if job.status != AccountingStatementBundleJob.STATUS_COMPLETED:
+            return Response({"detail": "This statement bundle is not ready yet."}, status=status.HTTP_409_CONFLICT)
+        try:
+            artifact = open_statement_bundle_artifact(job)
+        except StatementBundleArtifactMissing:
+            return Response({"detail": "This statement bundle is no longer available. Request it again."}, status=status.HTTP_410_GONE)
+        except PrivateEvidenceStorageUnavailable:
+            return Response({"detail": "Statement storage is temporarily unavailable."}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response = FileResponse(artifact, content_type="application/zip", as_attachment=True, filename=job.artifact_filename)
+        response["Content-Length"] = str(job.artifact_size)
+        response["X-Accounting-Statement-Count"] = str(job.statement_count)
         return response
 
 
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_product_identity_columns'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='identity_source_key',
+            field=models.CharField(blank=True, editable=False, max_length=64),
+        ),
+    ]
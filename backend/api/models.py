@@ -211,10 +211,32 @@ class Product(models.Model):
         help_text="SEO description (max 160 chars)"
     )
 
+    # Quotation matching identity, derived from name/dosage/pack_size on save
+    identity_core_name = models.CharField(max_length=255, blank=True, editable=False)
+    identity_fingerprint = models.CharField(max_length=64, blank=True, editable=False)
+    identity_strengths = models.CharField(max_length=255, blank=True, editable=False)
+    identity_pack_counts = models.CharField(max_length=255, blank=True, editable=False)
+    identity_dosage_forms = models.CharField(max_length=100, blank=True, editable=False)
+    identity_pack_forms = models.CharField(max_length=100, blank=True, editable=False)
+    identity_source_key = models.CharField(max_length=64, blank=True, editable=False)
+    identity_version = models.PositiveSmallIntegerField(default=0, editable=False)
+
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    IDENTITY_SOURCE_FIELDS = frozenset({'name', 'dosage', 'pack_size'})
+    IDENTITY_FIELDS = (
+        'identity_core_name',
+        'identity_fingerprint',
+        'identity_strengths',
+        'identity_pack_counts',
+        'identity_dosage_forms',
+        'identity_pack_forms',
+        'identity_source_key',
+        'identity_version',
+    )
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -226,6 +248,8 @@ class Product(models.Model):
             models.Index(fields=['created_at']),
             models.Index(fields=['brand']),
             models.Index(fields=['category']),
+            models.Index(fields=['identity_core_name']),
+            models.Index(fields=['identity_fingerprint']),
         ]
 
     def __str__(self):
@@ -256,6 +280,14 @@ class Product(models.Model):
             while Product.objects.filter(slug=self.slug).exclude(pk=self.pk).exists():
                 self.slug = f"{original_slug}-{counter}"
                 counter += 1
+        # Imported lazily: the quotations matcher itself imports this model.
+        from quotations.matching import product_identity_columns
+
+        for field_name, value in product_identity_columns(self).items():
+            setattr(self, field_name, value)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and self.IDENTITY_SOURCE_FIELDS.intersection(update_fields):
+            kwargs['update_fields'] = {*update_fields, *self.IDENTITY_FIELDS}
         super().save(*args, **kwargs)
 
 
@@ -373,6 +373,9 @@ QUOTATION_AI_NATIVE_MAX_SPREADSHEET_ROWS_PER_SHEET = int(
 # the configured AI provider. Generic AI cleanup toggles alone do not enable
 # mailbox file processing; production must opt in explicitly.
 QUOTATION_MAILBOX_AI_VISION_ENABLED = env_bool("QUOTATION_MAILBOX_AI_VISION_ENABLED", False)
+# Optional directory for the pickled eligible-quotation snapshot shared by
+# mailbox reconciliation workers. Empty keeps the snapshot in process memory.
+QUOTATION_MAILBOX_QUOTE_SNAPSHOT_DIR = os.environ.get("QUOTATION_MAILBOX_QUOTE_SNAPSHOT_DIR", "").strip()
 
 # ---- Gmail OAuth for quotation discovery and explicit reviewed delivery ----
 GOOGLE_OAUTH_CLIENT_ID = os.environ.get("GOOGLE_OAUTH_CLIENT_ID", "").strip()
@@ -472,6 +475,13 @@ QUOTATION_GMAIL_XLSX_PREEXTRACT_SHADOW_ENABLED = env_bool(
     "QUOTATION_GMAIL_XLSX_PREEXTRACT_SHADOW_ENABLED",
     False,
 )
+# PostgreSQL only: retrieve fuzzy catalog candidates by pg_trgm word
+# similarity instead of the in-process substring pool. Ignored on SQLite or
+# when the pg_trgm extension is not installed.
+QUOTATION_PRODUCT_TRIGRAM_SEARCH_ENABLED = env_bool(
+    "QUOTATION_PRODUCT_TRIGRAM_SEARCH_ENABLED",
+    False,
+)
 GMAIL_ADDON_OAUTH_CLIENT_ID = os.environ.get(
     "GMAIL_ADDON_OAUTH_CLIENT_ID",
     "",
@@ -507,6 +517,11 @@ GMAIL_INQUIRY_ATTACHMENT_VIEW_MAX_BYTES = max(
 # ---- accounting overdue statement imports ----
 ACCOUNTING_IMPORT_MAX_UPLOAD_BYTES = int(os.environ.get("ACCOUNTING_IMPORT_MAX_UPLOAD_BYTES", str(25 * 1024 * 1024)))
 ACCOUNTING_STATEMENT_ZIP_SYNC_LIMIT = int(os.environ.get("ACCOUNTING_STATEMENT_ZIP_SYNC_LIMIT", "75"))
+# Request-time ZIP downloads render inline by default: forking a threaded web
+# worker that holds a database connection is not safe. Background statement
+# bundle jobs keep a bounded process pool.
+ACCOUNTING_STATEMENT_RENDER_WORKERS = int(os.environ.get("ACCOUNTING_STATEMENT_RENDER_WORKERS", "0"))
+ACCOUNTING_STATEMENT_JOB_RENDER_WORKERS = int(os.environ.get("ACCOUNTING_STATEMENT_JOB_RENDER_WORKERS", "2"))
 
 # ---- Cloudinary Configuration (Cloud Image Storage) ----
 # Images will be stored on Cloudinary CDN instead of local filesystem
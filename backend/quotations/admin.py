@@ -219,8 +219,8 @@ class MailboxPOAuditFailureAdmin(ReadOnlyHistoryAdminMixin, admin.ModelAdmin):
 
 @admin.register(MailboxPOMatchRun)
 class MailboxPOMatchRunAdmin(ReadOnlyHistoryAdminMixin, admin.ModelAdmin):
-    list_display = ["id", "audit_run", "algorithm_version", "status", "completed_at", "created_at"]
-    list_filter = ["status", "algorithm_version", "created_at"]
+    list_display = ["id", "audit_run", "algorithm_version", "mode", "status", "completed_at", "created_at"]
+    list_filter = ["status", "mode", "algorithm_version", "created_at"]
     readonly_fields = [field.name for field in MailboxPOMatchRun._meta.fields]
 
 
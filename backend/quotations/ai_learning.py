@@ -23,7 +23,13 @@ from .ai_parsing import (
     get_ai_parse_provider,
     settings_ai_status,
 )
-from .matching import create_or_reuse_product, create_product_alias, product_catalog_queryset, suggest_product_for_text
+from .matching import (
+    create_or_reuse_product,
+    create_product_alias,
+    product_catalog_queryset,
+    suggest_product_for_text,
+    suggest_products_for_lines,
+)
 from .models import (
     Company,
     CompanyPriceHistory,
@@ -245,10 +251,11 @@ def _historical_noise_reason(line):
     return ""
 
 
-def _candidate_products_for_line(line, company=None):
+def _candidate_products_for_line(line, company=None, match=None):
     ranked = []
     seen = set()
-    match = suggest_product_for_text(line.item_name, company, unit=line.unit or "")
+    if match is None:
+        match = suggest_product_for_text(line.item_name, company, unit=line.unit or "")
     for candidate in match.candidates:
         if candidate.product.id in seen:
             continue
@@ -337,11 +344,18 @@ def build_learning_context(historical_import):
     candidate_companies = _candidate_companies_for_import(historical_import)
     lines = []
     noise_rows = []
+    learning_lines = []
     for line in historical_import.lines.order_by("sort_order", "id")[:MAX_LEARNING_ROWS]:
         noise_reason = _historical_noise_reason(line)
         if noise_reason:
             noise_rows.append({"line": line, "reason": noise_reason})
             continue
+        learning_lines.append(line)
+    matches = suggest_products_for_lines(
+        [{"raw_text": line.item_name, "unit": line.unit or ""} for line in learning_lines],
+        historical_import.company,
+    )
+    for line, match in zip(learning_lines, matches):
         lines.append(
             {
                 "line_id": line.id,
@@ -354,7 +368,7 @@ def build_learning_context(historical_import):
                 "parse_confidence": line.parse_confidence,
                 "current_product_id": line.product_id or "",
                 "current_product_name": line.product.name if line.product_id else "",
-                "candidate_products": _candidate_products_for_line(line, historical_import.company),
+                "candidate_products": _candidate_products_for_line(line, historical_import.company, match),
             }
         )
 
@@ -1,9 +1,23 @@
 import re
+import threading
 from difflib import SequenceMatcher
 
+from django.db.models import Count, Max
+from rapidfuzz import fuzz, process
+
 from .models import Company, normalize_label
 
 
+# A blocking key shared by more companies than this is not distinctive enough
+# to bound the candidate set on its own.
+COMPANY_BLOCK_MAX_POSTINGS = 200
+COMPANY_BLOCK_CHUNK_SIZE = 500
+# Below this many companies every row is scored, so blocking can never hide a
+# duplicate from the company guard on a typical customer table.
+COMPANY_BLOCK_FULL_SCAN_MAX_COMPANIES = 2000
+COMPANY_BLOCK_QGRAM_SIZE = 3
+
+
 LEGAL_SUFFIXES = {
     "co",
     "company",
@@ -40,8 +54,15 @@ def company_match_key(value):
 
 
 def score_company_name(source_name, candidate_name):
-    source_key = company_match_key(source_name)
-    candidate_key = company_match_key(candidate_name)
+    return _score_company_key(
+        source_name,
+        company_match_key(source_name),
+        candidate_name,
+        company_match_key(candidate_name),
+    )
+
+
+def _score_company_key(source_name, source_key, candidate_name, candidate_key, sequence_ratio=None):
     if not source_key or not candidate_key:
         return 0, "No usable company name."
     if normalize_label(source_name) == normalize_label(candidate_name):
@@ -58,7 +79,7 @@ def score_company_name(source_name, candidate_name):
         if source_tokens.issubset(candidate_tokens) or candidate_tokens.issubset(source_tokens):
             return 84, "One company name is a shorter version of the other."
 
-    ratio = SequenceMatcher(None, source_key, candidate_key).ratio()
+    ratio = SequenceMatcher(None, source_key, candidate_key).ratio() if sequence_ratio is None else sequence_ratio
     if ratio >= 0.86:
         return round(ratio * 100), "Company names are very similar."
     if ratio >= 0.74:
@@ -66,11 +87,140 @@ def score_company_name(source_name, candidate_name):
     return round(ratio * 100), "Low similarity."
 
 
+def company_blocking_keys(match_key):
+    """Return the tokens, prefixes and character q-grams that block a key.
+
+    The compact prefix and q-grams ignore spacing, so "Al Noor" and "Alnoor"
+    share a block. A one-character edit only touches the q-grams that overlap
+    it, so "Medicare" and "Medcare" still share "med", "car" and "are".
+    """
+
+    tokens = match_key.split()
+    keys = {f"t:{token}" for token in tokens if len(token) >= 3}
+    keys.update(f"p:{token[:4]}" for token in tokens if len(token) >= 4)
+    compact = "".join(tokens)
+    if len(compact) >= 4:
+        keys.add(f"c:{compact[:5]}")
+    size = COMPANY_BLOCK_QGRAM_SIZE
+    keys.update(f"g:{compact[start:start + size]}" for start in range(len(compact) - size + 1))
+    return keys
+
+
+class CompanyBlockIndex:
+    """Process-local blocking index from company blocking keys to Company ids."""
+
+    def __init__(self, stamp, rows):
+        self.stamp = stamp
+        self.keys = {}
+        self._postings = {}
+        for company_id, name, stored_key in rows:
+            match_key = stored_key or company_match_key(name)
+            self.keys[company_id] = match_key
+            for blocking_key in company_blocking_keys(match_key):
+                self._postings.setdefault(blocking_key, set()).add(company_id)
+
+    @property
+    def full_scan(self):
+        """Small tables are scored in full rather than blocked."""
+
+        return len(self.keys) <= COMPANY_BLOCK_FULL_SCAN_MAX_COMPANIES
+
+    def candidate_ids(self, name):
+        """Ids of companies sharing a distinctive blocking key with ``name``."""
+
+        if self.full_scan:
+            return set(self.keys)
+        postings = [
+            self._postings[key]
+            for key in company_blocking_keys(company_match_key(name))
+            if key in self._postings
+        ]
+        distinctive = [ids for ids in postings if len(ids) <= COMPANY_BLOCK_MAX_POSTINGS]
+        if not distinctive and postings:
+            distinctive = [min(postings, key=len)]
+        return set().union(*distinctive)
+
+
+_company_block_index = None
+_company_block_index_lock = threading.Lock()
+
+
+def current_company_block_index():
+    """Return the blocking index, rebuilding it when the Company table changed."""
+
+    global _company_block_index
+    summary = Company.objects.order_by().aggregate(rows=Count("id"), last_id=Max("id"), last_updated=Max("updated_at"))
+    stamp = (summary["rows"], summary["last_id"], summary["last_updated"])
+    index = _company_block_index
+    if index is not None and index.stamp == stamp:
+        return index
+    index = CompanyBlockIndex(stamp, Company.objects.order_by().values_list("id", "name", "company_match_key"))
+    with _company_block_index_lock:
+        _company_block_index = index
+    return index
+
+
+def score_company_names(source_name, candidate_names, min_score=0, candidate_keys=None):
+    """Score many candidate names; ``None`` marks a score proven below ``min_score``.
+
+    RapidFuzz bounds every difflib ratio in one batched pass (its Indel ratio
+    is never lower), so ``SequenceMatcher`` only runs where the exact score
+    could still reach ``min_score``. ``candidate_keys`` may carry persisted
+    ``company_match_key`` values to skip re-deriving them.
+    """
+
+    source_key = company_match_key(source_name)
+    if candidate_keys is None:
+        candidate_keys = [company_match_key(name) for name in candidate_names]
+    bounds = process.extract(source_key, candidate_keys, scorer=fuzz.ratio, processor=None, limit=None)
+    results = [None] * len(candidate_keys)
+    for _choice, bound, index in bounds:
+        candidate_name = candidate_names[index]
+        candidate_key = candidate_keys[index]
+        upper_score, _reason = _score_company_key(
+            source_name,
+            source_key,
+            candidate_name,
+            candidate_key,
+            sequence_ratio=min(1.0, bound / 100 + 1e-9),
+        )
+        if upper_score < min_score:
+            continue
+        results[index] = _score_company_key(source_name, source_key, candidate_name, candidate_key)
+    return results
+
+
+def blocked_companies(name, companies):
+    """Keep only the companies sharing a distinctive blocking key with ``name``."""
+
+    candidate_ids = current_company_block_index().candidate_ids(name)
+    return [company for company in companies if company.id in candidate_ids]
+
+
 def find_similar_companies(name, queryset=None, limit=5, threshold=74):
-    queryset = queryset or Company.objects.all()
+    if queryset is None:
+        queryset = Company.objects.all()
+    index = current_company_block_index()
+    if index.full_scan:
+        companies = list(queryset)
+    else:
+        candidate_ids = sorted(index.candidate_ids(name))
+        companies = [
+            company
+            for start in range(0, len(candidate_ids), COMPANY_BLOCK_CHUNK_SIZE)
+            for company in queryset.filter(pk__in=candidate_ids[start:start + COMPANY_BLOCK_CHUNK_SIZE])
+        ]
     suggestions = []
-    for company in queryset:
-        score, reason = score_company_name(name, company.name)
+    scored = score_company_names(
+        name,
+        [company.name for company in companies],
+        min_score=threshold,
+        candidate_keys=[company.company_match_key or company_match_key(company.name) for company in companies],
+    )
+    for company, result in zip(companies, scored):
+        if result is None:
+            continue
+        score, reason = result
         if score >= threshold:
             suggestions.append(
                 {
@@ -57,7 +57,7 @@ from .contract_intelligence import (
     get_valid_access_token,
     resolve_gmail_connection,
 )
-from .company_matching import score_company_name
+from .company_matching import blocked_companies, score_company_names
 from .email_identity import (
     canonical_email_addresses,
     canonical_singleton_from_address,
@@ -74,7 +74,7 @@ from .mailbox_po_matching import (
     normalize_company_identity_text,
 )
 from .matching import (
-    apply_match_to_preview_line,
+    apply_matches_to_preview_lines,
     preload_company_history_match_context,
 )
 from .models import (
@@ -1970,10 +1970,16 @@ def _company_identity_name_matches(company_name, companies):
     if not _has_distinctive_ai_company_name(company_name):
         return []
     matches = []
-    for company in companies:
-        score, reason = score_company_name(company_name, company.name)
-        if score < AI_COMPANY_NAME_CANDIDATE_SCORE:
+    companies = blocked_companies(company_name, companies)
+    scored = score_company_names(
+        company_name,
+        [company.name for company in companies],
+        min_score=AI_COMPANY_NAME_CANDIDATE_SCORE,
+    )
+    for company, result in zip(companies, scored):
+        if result is None or result[0] < AI_COMPANY_NAME_CANDIDATE_SCORE:
             continue
+        score, reason = result
         matches.append(
             {
                 "company": company,
@@ -6092,13 +6098,12 @@ def _build_source_analysis(
         recommended_company
     )
     matched_rows = []
-    for row_index, line in enumerate(semantic_result["rows"], start=1):
-        matched = {**line}
-        apply_match_to_preview_line(
-            matched,
-            recommended_company,
-            history_context=history_context,
-        )
+    batch = apply_matches_to_preview_lines(
+        [{**line} for line in semantic_result["rows"]],
+        recommended_company,
+        history_context=history_context,
+    )
+    for row_index, matched in enumerate(batch, start=1):
         # Bind this suggestion to the customer context that produced it. A
         # later manual company correction must not be able to approve a match
         # derived from another customer's aliases/history as if it were still
@@ -7506,29 +7511,31 @@ def _selected_analysis_rows(gmail_import, selected_source_keys=None):
 def _rows_for_company(rows, company):
     history_context = preload_company_history_match_context(company)
     matched_rows = []
-    for line in rows:
-        cleaned = {
-            key: value
-            for key, value in line.items()
-            if key
-            not in {
-                "matched_product",
-                "matched_product_name",
-                "matched_quote_item",
-                "matched_quote_item_name",
-                "match_candidates",
-                "match_confidence",
-                "match_method",
-                "match_reason",
-                "match_status",
-                "match_company_id",
+    batch = apply_matches_to_preview_lines(
+        [
+            {
+                key: value
+                for key, value in line.items()
+                if key
+                not in {
+                    "matched_product",
+                    "matched_product_name",
+                    "matched_quote_item",
+                    "matched_quote_item_name",
+                    "match_candidates",
+                    "match_confidence",
+                    "match_method",
+                    "match_reason",
+                    "match_status",
+                    "match_company_id",
+                }
             }
-        }
-        apply_match_to_preview_line(
-            cleaned,
-            company,
-            history_context=history_context,
-        )
+            for line in rows
+        ],
+        company,
+        history_context=history_context,
+    )
+    for cleaned in batch:
         cleaned["match_company_id"] = getattr(company, "pk", None)
         if cleaned.get("matched_product") or cleaned.get("matched_quote_item"):
             suggested_reason = str(cleaned.get("match_reason") or "").strip()
@@ -16,15 +16,17 @@ from __future__ import annotations
 import math
 import re
 import unicodedata
+from bisect import bisect_left
 from collections import Counter
 from dataclasses import dataclass, field
 from datetime import date, datetime, timezone
 from decimal import Decimal, InvalidOperation
-from functools import lru_cache
+from functools import cached_property, lru_cache
 from typing import Any, Iterable, Mapping, Sequence
 from zoneinfo import ZoneInfo
 
 from rapidfuzz.fuzz import ratio as rapidfuzz_ratio
+from rapidfuzz.process import extract as rapidfuzz_extract
 
 from .email_identity import (
     canonical_email_addresses,
@@ -328,6 +330,12 @@ class MailboxPOLine:
     unit: str = ""
     source: str = "attachment"
 
+    @cached_property
+    def identity(self) -> _TextIdentity:
+        # Computed on first comparison and reused for every quote the row is
+        # ranked against.
+        return _line_identity(self.name, self.description)
+
 
 @dataclass(frozen=True)
 class CanonicalMailboxMessage:
@@ -370,6 +378,20 @@ class CanonicalMailboxMessage:
     document_text: str = ""
     document_filename: str = ""
 
+    @cached_property
+    def company_haystack(self) -> str:
+        # Normalized once per message instead of once per compared quote.
+        exact_source = (
+            self.document_text
+            if str(self.source_kind or "").casefold() == "attachment" and self.document_text
+            else f"{self.subject} {self.body[:5000]}"
+        )
+        return _normalize_text(f"{self.company_name} {exact_source}")
+
+    @cached_property
+    def normalized_document_text(self) -> str:
+        return _normalize_text(self.document_text)
+
 
 @dataclass(frozen=True)
 class EligibleQuoteLine:
@@ -382,6 +404,12 @@ class EligibleQuoteLine:
     gross_line_total: Decimal | None = None
     unit: str = ""
 
+    @cached_property
+    def identity(self) -> _TextIdentity:
+        # Quote lines are fixed for a reconciliation run; the index build
+        # computes this once and every message comparison reuses it.
+        return _line_identity(self.name, self.description)
+
 
 @dataclass(frozen=True)
 class EligibleQuotation:
@@ -509,6 +537,10 @@ class MailboxMatchResult:
     rejection_summary: tuple[tuple[str, int], ...] = ()
     reason: str = ""
     automatic_blockers: tuple[str, ...] = ()
+    # Every quotation that survived its own evaluation, before the cross-quote
+    # filters and the returned-candidate cap. Delta reconciliation uses it to
+    # tell whether a changed quotation could alter this result.
+    candidate_quote_ids: tuple[Any, ...] = ()
 
     def as_dict(self) -> dict[str, Any]:
         return {
@@ -559,6 +591,13 @@ class _Evaluation:
     rejection: str = ""
 
 
+_NO_LINE_OVERLAP_REJECTION = "no parsed PO item overlaps this quotation"
+_NO_STABLE_REFERENCE_REJECTION = "quotation has no stable reference"
+_REFERENCE_ELSEWHERE_REJECTION = "explicit quotation reference points elsewhere or is mixed"
+_NOT_AFTER_BOUNDARY_REJECTION = "message is not after the quotation send/finalize timestamp"
+_NO_IDENTITY_REJECTION = "no quotation reference or customer identity signal"
+
+
 def _mapping_value(value: Any, *keys: str, default: Any = None) -> Any:
     for key in keys:
         if isinstance(value, Mapping) and key in value:
@@ -906,18 +945,7 @@ def _spec_conflict(left: _TextIdentity, right: _TextIdentity) -> bool:
     )
 
 
-def _text_similarity(left: str, right: str) -> float:
-    if not left or not right:
-        return 0.0
-    if left == right:
-        return 1.0
-    if left.replace(" ", "") == right.replace(" ", ""):
-        return 0.99
-    left_tokens = set(left.split())
-    right_tokens = set(right.split())
-    common = left_tokens & right_tokens
-    if not common:
-        return 0.0
+def _token_overlap_score(left_tokens: frozenset[str], right_tokens: frozenset[str], common: frozenset[str]) -> float:
     union = left_tokens | right_tokens
     jaccard = len(common) / len(union)
     containment = len(common) / min(len(left_tokens), len(right_tokens))
@@ -930,31 +958,129 @@ def _text_similarity(left: str, right: str) -> float:
             containment_score = 0.55
     else:
         containment_score = containment * 0.82
+    return max(jaccard, containment_score)
+
+
+@lru_cache(maxsize=100_000)
+def _text_features(text: str) -> tuple[frozenset[str], str]:
+    return frozenset(text.split()), text.replace(" ", "")
+
+
+def _text_similarity(left: str, right: str) -> float:
+    if not left or not right:
+        return 0.0
+    if left == right:
+        return 1.0
+    left_tokens, left_compact = _text_features(left)
+    right_tokens, right_compact = _text_features(right)
+    if left_compact == right_compact:
+        return 0.99
+    common = left_tokens & right_tokens
+    if not common:
+        return 0.0
     # This is the matching hot path: a mailbox document may be compared with
     # thousands of quotation lines. RapidFuzz implements the same normalized
     # edit-similarity calculation in native code and keeps a mailbox-wide
-    # reconciliation comfortably inside the web-worker timeout.
+    # reconciliation comfortably inside the web-worker timeout, which
+    # ``benchmark_mailbox_reconciliation`` checks page by page.
     sequence = (rapidfuzz_ratio(left, right) / 100.0) * 0.9
-    return min(1.0, max(jaccard, containment_score, sequence))
+    return min(1.0, max(_token_overlap_score(left_tokens, right_tokens, common), sequence))
+
+
+_IDENTITY_PROJECTIONS = (
+    ("normalized_name", "normalized_name"),
+    ("core_name", "core_name"),
+    ("normalized_combined", "normalized_combined"),
+    ("core_combined", "core_combined"),
+    ("normalized_name", "normalized_combined"),
+    ("normalized_combined", "normalized_name"),
+)
 
 
 def _identity_similarity(left: _TextIdentity, right: _TextIdentity) -> float:
-    comparisons = [
-        (left.normalized_name, right.normalized_name),
-        (left.core_name, right.core_name),
-        (left.normalized_combined, right.normalized_combined),
-        (left.core_combined, right.core_combined),
-        (left.normalized_name, right.normalized_combined),
-        (left.normalized_combined, right.normalized_name),
-    ]
     best = 0.0
-    for first, second in comparisons:
-        best = max(best, _text_similarity(first, second))
+    for left_field, right_field in _IDENTITY_PROJECTIONS:
+        best = max(best, _text_similarity(getattr(left, left_field), getattr(right, right_field)))
         if best >= 1.0:
             return 1.0
     return best
 
 
+def _similarity_matrix(
+    po_identities: Sequence[_TextIdentity], quote_identities: Sequence[_TextIdentity]
+) -> list[dict[int, float]]:
+    """Return ``_identity_similarity`` for every PO/quote line pair that can be non-zero.
+
+    Row ``i`` maps quote-line indexes to their similarity with PO line ``i``;
+    absent pairs score zero.  Each distinct projection string pair is scored
+    once: quote strings are reached through a token/compact-text inverted
+    index (pairs sharing neither score zero), and each PO string's remaining
+    edit ratios are computed in one batched RapidFuzz call.
+    """
+
+    quote_strings: dict[str, dict[str, list[int]]] = {}
+    token_index: dict[str, set[str]] = {}
+    compact_index: dict[str, set[str]] = {}
+    for right_field in {right for _left, right in _IDENTITY_PROJECTIONS}:
+        by_string = quote_strings.setdefault(right_field, {})
+        for quote_index, identity in enumerate(quote_identities):
+            text = getattr(identity, right_field)
+            if not text:
+                continue
+            by_string.setdefault(text, []).append(quote_index)
+            tokens, compact = _text_features(text)
+            compact_index.setdefault(compact, set()).add(text)
+            for token in tokens:
+                token_index.setdefault(token, set()).add(text)
+
+    pair_scores: dict[str, dict[str, float]] = {}
+
+    def scores_for(left: str) -> dict[str, float]:
+        scores = pair_scores.get(left)
+        if scores is not None:
+            return scores
+        scores = pair_scores[left] = {}
+        left_tokens, left_compact = _text_features(left)
+        related = set(compact_index.get(left_compact, ()))
+        for token in left_tokens:
+            related.update(token_index.get(token, ()))
+        overlaps = {}
+        for right in related:
+            right_tokens, right_compact = _text_features(right)
+            if right == left:
+                scores[right] = 1.0
+            elif right_compact == left_compact:
+                scores[right] = 0.99
+            else:
+                common = left_tokens & right_tokens
+                if common:
+                    overlaps[right] = _token_overlap_score(left_tokens, right_tokens, common)
+        if overlaps:
+            choices = list(overlaps)
+            for right in choices:
+                scores[right] = min(1.0, overlaps[right])
+            for right, ratio, _index in rapidfuzz_extract(
+                left, choices, scorer=rapidfuzz_ratio, processor=None, limit=None
+            ):
+                scores[right] = min(1.0, max(overlaps[right], (ratio / 100.0) * 0.9))
+        return scores
+
+    matrix = []
+    for identity in po_identities:
+        row: dict[int, float] = {}
+        for left_field, right_field in _IDENTITY_PROJECTIONS:
+            left = getattr(identity, left_field)
+            if not left:
+                continue
+            by_string = quote_strings[right_field]
+            for right, score in scores_for(left).items():
+                for quote_index in by_string.get(right, ()):
+                    if score > row.get(quote_index, 0.0):
+                        row[quote_index] = score
+        matrix.append(row)
+    return matrix
+
+
 def _compare_quantity(po_value: Decimal | None, quote_value: Decimal | None) -> str:
     if po_value is None or quote_value is None:
         return "unknown"
@@ -1071,13 +1197,15 @@ def _edge(
 def _assign_lines(
     po_lines: tuple[MailboxPOLine, ...], quote_lines: tuple[EligibleQuoteLine, ...]
 ) -> tuple[tuple[_Edge, ...], int]:
-    po_identities = tuple(_line_identity(line.name, line.description) for line in po_lines)
-    quote_identities = tuple(_line_identity(line.name, line.description) for line in quote_lines)
+    po_identities = tuple(line.identity for line in po_lines)
+    quote_identities = tuple(line.identity for line in quote_lines)
     edges = []
     conflict_rows = set()
-    for po_index, (po_line, po_identity) in enumerate(zip(po_lines, po_identities)):
-        for quote_index, (quote_line, quote_identity) in enumerate(zip(quote_lines, quote_identities)):
-            similarity = _identity_similarity(po_identity, quote_identity)
+    for po_index, similarities in enumerate(_similarity_matrix(po_identities, quote_identities)):
+        po_line = po_lines[po_index]
+        po_identity = po_identities[po_index]
+        for quote_index, similarity in similarities.items():
+            quote_identity = quote_identities[quote_index]
             if similarity >= 0.56 and _spec_conflict(po_identity, quote_identity):
                 conflict_rows.add(po_index)
                 continue
@@ -1085,7 +1213,7 @@ def _assign_lines(
                 po_index,
                 quote_index,
                 po_line,
-                quote_line,
+                quote_lines[quote_index],
                 po_identity,
                 quote_identity,
                 similarity=similarity,
@@ -1194,12 +1322,7 @@ def _company_strength(company_name: str, message: CanonicalMailboxMessage) -> tu
     ]
     if not company_tokens:
         return 0.0, ""
-    exact_source = (
-        message.document_text
-        if str(message.source_kind or "").casefold() == "attachment" and message.document_text
-        else f"{message.subject} {message.body[:5000]}"
-    )
-    haystack = _normalize_text(f"{message.company_name} {exact_source}")
+    haystack = message.company_haystack
     normalized_company = " ".join(company_tokens)
     if normalized_company and f" {normalized_company} " in f" {haystack} ":
         location = (
@@ -1236,7 +1359,7 @@ def _attachment_has_distinctive_exact_company_name(
     if len(company_tokens) < 2 or len("".join(company_tokens)) < 7:
         return False
     normalized_company = " ".join(company_tokens)
-    document = _normalize_text(message.document_text)
+    document = message.normalized_document_text
     return bool(
         normalized_company
         and f" {normalized_company} " in f" {document} "
@@ -1404,8 +1527,21 @@ def company_private_sender_domain_identity(
 
 
 def _customer_component(
-    message: CanonicalMailboxMessage, quote: EligibleQuotation
+    message: CanonicalMailboxMessage,
+    quote: EligibleQuotation,
+    memo: dict[tuple[str, tuple[str, ...]], tuple[ScoreComponent, bool]] | None = None,
 ) -> tuple[ScoreComponent, bool]:
+    """Score the message's customer identity against the quote's customer.
+
+    The result depends only on the quote's company name and emails, so callers
+    ranking one message against many quotes pass a ``memo`` shared across them.
+    """
+
+    if memo is not None:
+        key = (quote.company_name, quote.customer_emails)
+        if key not in memo:
+            memo[key] = _customer_component(message, quote)
+        return memo[key]
     physical_sender = canonical_singleton_from_address(
         message.sender,
         from_header_values=message.from_header_values,
@@ -1577,26 +1713,40 @@ def _document_total_component(
     return ScoreComponent("document_total", score, detail), result
 
 
-def _evaluate(
+def _precheck(
     message: CanonicalMailboxMessage,
     quote: EligibleQuotation,
     reference_keys: frozenset[str],
-) -> _Evaluation:
+) -> tuple[str, bool, datetime | None]:
+    """Return the cheap reference/time rejection, exact-reference flag and boundary."""
+
     quote_key = _reference_key(quote.quotation_number)
     if not quote_key:
-        return _Evaluation(rejection="quotation has no stable reference")
+        return _NO_STABLE_REFERENCE_REJECTION, False, None
     exact_reference = bool(reference_keys and reference_keys == {quote_key})
     if reference_keys and not exact_reference:
-        return _Evaluation(rejection="explicit quotation reference points elsewhere or is mixed")
+        return _REFERENCE_ELSEWHERE_REJECTION, False, None
 
     boundary = _quote_boundary(quote)
     if message.received_at is None:
-        return _Evaluation(rejection="message receipt timestamp is missing")
+        return "message receipt timestamp is missing", exact_reference, None
     if boundary is None:
-        return _Evaluation(rejection="quotation send/finalize timestamp is missing")
+        return "quotation send/finalize timestamp is missing", exact_reference, None
     boundary = _datetime(boundary)
     if boundary is None or message.received_at <= boundary:
-        return _Evaluation(rejection="message is not after the quotation send/finalize timestamp")
+        return _NOT_AFTER_BOUNDARY_REJECTION, exact_reference, None
+    return "", exact_reference, boundary
+
+
+def _evaluate(
+    message: CanonicalMailboxMessage,
+    quote: EligibleQuotation,
+    reference_keys: frozenset[str],
+    customer_memo: dict | None = None,
+) -> _Evaluation:
+    rejection, exact_reference, boundary = _precheck(message, quote, reference_keys)
+    if rejection:
+        return _Evaluation(rejection=rejection)
     order_dates, supplier_quote_dates = _printed_reference_dates(message)
     order_date_predates = _printed_date_predates_quote(order_dates, boundary)
     supplier_quote_date_predates = _printed_date_predates_quote(
@@ -1614,7 +1764,7 @@ def _evaluate(
     components = []
     if exact_reference:
         components.append(ScoreComponent("quotation_reference", 45.0, "exact sole quotation reference"))
-    customer_component, exact_sender = _customer_component(message, quote)
+    customer_component, exact_sender = _customer_component(message, quote, customer_memo)
     components.append(customer_component)
     components.append(_time_component(boundary, message.received_at))
     components.append(
@@ -1636,7 +1786,7 @@ def _evaluate(
     )
 
     if po_count and not matched_count and not exact_reference:
-        return _Evaluation(rejection="no parsed PO item overlaps this quotation")
+        return _Evaluation(rejection=_NO_LINE_OVERLAP_REJECTION)
     if not po_count and not exact_reference and not message.lpo_references:
         return _Evaluation(rejection="no structured PO rows or LPO reference to compare")
     # A long order that happens to share a handful of common pharmacy items is
@@ -1792,7 +1942,7 @@ def _evaluate(
 
     identity_score = customer_component.score
     if not exact_reference and identity_score <= 0:
-        return _Evaluation(rejection="no quotation reference or customer identity signal")
+        return _Evaluation(rejection=_NO_IDENTITY_REJECTION)
 
     raw_score = sum(component.score for component in components)
     score = round(max(0.0, min(100.0, raw_score)), 3)
@@ -2336,9 +2486,149 @@ def _is_automatic(
     )
 
 
+def _identity_signal_keys(identity: _TextIdentity) -> set[str]:
+    """Return every key through which two identities can reach a line edge.
+
+    ``_text_similarity`` is zero unless the compared strings share a token or
+    are equal once spaces are removed, so a quote line sharing none of these
+    keys with any PO row can never produce an edge.
+    """
+
+    keys = set()
+    for text in (
+        identity.normalized_name,
+        identity.core_name,
+        identity.normalized_combined,
+        identity.core_combined,
+    ):
+        if text:
+            keys.update(text.split())
+            keys.add("=" + text.replace(" ", ""))
+    return keys
+
+
+class EligibleQuotationIndex:
+    """Inverted indexes over one fixed set of eligible quotations.
+
+    Build it once per reconciliation run and pass it to
+    ``rank_message_to_quotations`` in place of the quotation iterable.  Quotes
+    are addressed by their position in ``quotes``; a message only runs the full
+    evaluation against quotes sharing a customer address/domain, a quotation
+    reference or a normalized line token with it.
+
+    Quotes with a reference and a send/finalize boundary are also kept sorted by
+    that boundary, so the quotes sent before a message are found by bisection
+    instead of a time check per quote.
+    """
+
+    def __init__(self, eligible_quotes: Iterable[EligibleQuotation | Mapping[str, Any]]):
+        self.quotes = tuple(canonicalize_quotation(quote) for quote in eligible_quotes)
+        self.by_address: dict[str, set[int]] = {}
+        self.by_domain: dict[str, set[int]] = {}
+        self.by_reference: dict[str, set[int]] = {}
+        self.by_line_token: dict[str, set[int]] = {}
+        self.unreferenced_count = 0
+        self.unbounded_positions: list[int] = []
+        bounded: list[tuple[datetime, int]] = []
+        for position, quote in enumerate(self.quotes):
+            quote_key = _reference_key(quote.quotation_number)
+            if quote_key:
+                self.by_reference.setdefault(quote_key, set()).add(position)
+                boundary = _datetime(_quote_boundary(quote))
+                if boundary is None:
+                    self.unbounded_positions.append(position)
+                else:
+                    bounded.append((boundary, position))
+            else:
+                self.unreferenced_count += 1
+            for address in _addresses(quote.customer_emails):
+                self.by_address.setdefault(address, set()).add(position)
+                domain = _domain(address)
+                if _private_domain(domain):
+                    self.by_domain.setdefault(domain, set()).add(position)
+            for line in quote.lines:
+                for key in _identity_signal_keys(line.identity):
+                    self.by_line_token.setdefault(key, set()).add(position)
+        bounded.sort()
+        self.boundaries = [boundary for boundary, _position in bounded]
+        self.bounded_positions = [position for _boundary, position in bounded]
+
+    def __len__(self) -> int:
+        return len(self.quotes)
+
+    def __iter__(self):
+        return iter(self.quotes)
+
+    def candidate_positions(
+        self,
+        message: CanonicalMailboxMessage,
+        reference_keys: frozenset[str],
+    ) -> set[int] | None:
+        """Return positions of quotes sharing a signal, or ``None`` to evaluate all.
+
+        Without parsed rows an LPO-only message can still match on customer
+        identity alone, so no quote is pruned.
+        """
+
+        if not message.parsed_rows:
+            return None
+        positions: set[int] = set()
+        for key in reference_keys:
+            positions.update(self.by_reference.get(key, ()))
+        sender = canonical_singleton_from_address(
+            message.sender,
+            from_header_values=message.from_header_values,
+        )
+        if sender:
+            positions.update(self.by_address.get(sender, ()))
+            positions.update(self.by_domain.get(_domain(sender), ()))
+        line_keys = set()
+        for row in message.parsed_rows:
+            line_keys.update(_identity_signal_keys(row.identity))
+        for key in line_keys:
+            positions.update(self.by_line_token.get(key, ()))
+        return positions
+
+    def reachable_positions(
+        self,
+        received_at: datetime,
+        reference_keys: frozenset[str],
+    ) -> tuple[list[int], Counter[str]]:
+        """Return positions that pass the cheap checks in order, and the rejections.
+
+        Quotes without a reference, quotes another explicit reference points
+        away from, and quotes not sent before ``received_at`` are counted under
+        the same reasons ``_precheck`` gives them.  Quotes without a usable
+        boundary are returned so ``_precheck`` can name their exact reason.
+        """
+
+        rejections: Counter[str] = Counter()
+        if self.unreferenced_count:
+            rejections[_NO_STABLE_REFERENCE_REJECTION] = self.unreferenced_count
+        if reference_keys:
+            # Only the sole referenced quotation number survives the reference
+            # check; its few quotes are time-checked individually.
+            positions = (
+                list(self.by_reference.get(next(iter(reference_keys)), ()))
+                if len(reference_keys) == 1
+                else []
+            )
+            elsewhere = len(self.quotes) - self.unreferenced_count - len(positions)
+            if elsewhere:
+                rejections[_REFERENCE_ELSEWHERE_REJECTION] = elsewhere
+        else:
+            cut = bisect_left(self.boundaries, received_at)
+            if cut < len(self.boundaries):
+                rejections[_NOT_AFTER_BOUNDARY_REJECTION] = len(self.boundaries) - cut
+            positions = self.bounded_positions[:cut] + self.unbounded_positions
+        # Candidate order follows quote order, as a full scan would.
+        positions.sort()
+        return positions, rejections
+
+
 def rank_message_to_quotations(
     message: CanonicalMailboxMessage | Mapping[str, Any],
-    eligible_quotes: Iterable[EligibleQuotation | Mapping[str, Any]],
+    eligible_quotes: EligibleQuotationIndex | Iterable[EligibleQuotation | Mapping[str, Any]],
     *,
     max_candidates: int = MAX_RETURNED_CANDIDATES,
     automatic_threshold: float = DEFAULT_AUTOMATIC_THRESHOLD,
@@ -2349,11 +2639,17 @@ def rank_message_to_quotations(
     ``max_candidates`` is deliberately capped at three even if a caller asks
     for more.  Rejected candidates are summarized by reason instead of being
     returned individually, preventing the UI from recreating the historical
-    candidate explosion.
+    candidate explosion.  Callers ranking many messages against the same
+    quotations should pass an ``EligibleQuotationIndex`` built once.
     """
 
     canonical_message = canonicalize_message(message)
-    quotes = tuple(canonicalize_quotation(quote) for quote in eligible_quotes)
+    index = (
+        eligible_quotes
+        if isinstance(eligible_quotes, EligibleQuotationIndex)
+        else EligibleQuotationIndex(eligible_quotes)
+    )
+    quotes = index.quotes
     document_rejection = _document_rejection_reason(canonical_message)
     if document_rejection:
         return MailboxMatchResult(
@@ -2397,13 +2693,30 @@ def rank_message_to_quotations(
         )
 
     candidates = []
-    rejections: Counter[str] = Counter()
-    for quote in quotes:
-        evaluation = _evaluate(canonical_message, quote, reference_keys)
+    # Cheap checks run first and in bulk: reference, then the send/finalize
+    # boundary window, then the shared-signal index, and only then the full
+    # per-quote evaluation.
+    positions, rejections = index.reachable_positions(
+        canonical_message.received_at,
+        reference_keys,
+    )
+    candidate_positions = index.candidate_positions(canonical_message, reference_keys)
+    customer_memo = {}
+    for position in positions:
+        quote = quotes[position]
+        if candidate_positions is not None and position not in candidate_positions:
+            # A pruned quote shares no line key with the PO rows, so after the
+            # cheap checks the full evaluation could only report no overlap.
+            rejections[
+                _precheck(canonical_message, quote, reference_keys)[0] or _NO_LINE_OVERLAP_REJECTION
+            ] += 1
+            continue
+        evaluation = _evaluate(canonical_message, quote, reference_keys, customer_memo)
         if evaluation.candidate:
             candidates.append(evaluation.candidate)
         else:
             rejections[evaluation.rejection or "candidate rejected"] += 1
+    candidate_quote_ids = tuple(candidate.quote_id for candidate in candidates)
 
     candidates.sort(
         key=lambda candidate: (
@@ -2452,6 +2765,7 @@ def rank_message_to_quotations(
             rejected_count=sum(rejections.values()),
             rejection_summary=tuple(sorted(rejections.items(), key=lambda item: (-item[1], item[0]))),
             reason=reason,
+            candidate_quote_ids=candidate_quote_ids,
         )
 
     top = candidates[0]
@@ -2536,6 +2850,7 @@ def rank_message_to_quotations(
         rejection_summary=tuple(sorted(rejections.items(), key=lambda item: (-item[1], item[0]))),
         reason=reason,
         automatic_blockers=blockers,
+        candidate_quote_ids=candidate_quote_ids,
     )
 
 
@@ -2549,6 +2864,7 @@ __all__ = [
     "UNMATCHED",
     "CanonicalMailboxMessage",
     "EligibleQuotation",
+    "EligibleQuotationIndex",
     "EligibleQuoteLine",
     "MailboxMatchResult",
     "MailboxPOLine",
@@ -9,17 +9,33 @@ never creates an LPO, proforma, order, or quotation-line outcome.
 from __future__ import annotations
 
 import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
 import re
+import sys
+import tempfile
+import threading
 import uuid
 from collections import defaultdict
-from dataclasses import dataclass
-from datetime import timedelta
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, fields
+from datetime import datetime, timedelta
 from decimal import Decimal, InvalidOperation
+from functools import cached_property, lru_cache
+from pathlib import Path
 
+import django
+from django.apps import apps
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Prefetch, Q
+from django.db.models import Count, Max, Prefetch, Q
 from django.utils import timezone
 
+from . import import_parsers, import_rules, mailbox_po_audit
 from .ai_parsing import AI_SOURCE_VISION
 from .contract_intelligence import gmail_connection_lineage_q
 from .import_parsers import parse_text_preview
@@ -29,14 +45,18 @@ from .mailbox_po_matching import (
     AUTOMATIC,
     CanonicalMailboxMessage,
     EligibleQuotation,
+    EligibleQuotationIndex,
     EligibleQuoteLine,
     MailboxPOLine,
     rank_message_to_quotations,
 )
 from .models import (
+    Company,
     CompanyContact,
     MailboxPOAuditRun,
+    MailboxPODocumentVariantCache,
     MailboxPOMatchRun,
+    MailboxPOMatchRunMessage,
     MailboxPOMessage,
     Quotation,
     QuotationLine,
@@ -44,6 +64,8 @@ from .models import (
 )
 
 
+logger = logging.getLogger(__name__)
+
 # Sender-header multiplicity is part of the matching evidence from v6 onward.
 # The version rollover prevents an already-completed v5 run from reusing an
 # automatic proposal that was produced from a collapsed/ambiguous From field.
@@ -53,6 +75,28 @@ MAX_MATCH_ERRORS = 500
 DEFAULT_MATCH_PAGE_SIZE = 5
 MAX_MATCH_PAGE_SIZE = 25
 MATCH_LEASE_SECONDS = 90
+ELIGIBLE_QUOTATION_SNAPSHOT_VERSION = 1
+ELIGIBLE_QUOTATION_SNAPSHOT_FILENAME = "eligible-quotations.pickle"
+# Bump when the cached variant payload changes shape without a code change in
+# the parser modules hashed by ``document_variant_parser_version``.
+DOCUMENT_VARIANT_CACHE_VERSION = 1
+CACHED_DECIMAL_FIELDS = frozenset({"quantity", "unit_price", "line_total", "document_total"})
+CACHED_DATETIME_FIELDS = frozenset({"received_at"})
+# Every inventory field that document variants and ranking read. A delta run
+# reuses a message's previous result only while these are unchanged.
+MATCH_INPUT_FIELDS = (
+    "gmail_message_id",
+    "sender",
+    "full_headers",
+    "recipients",
+    "cc",
+    "subject",
+    "sent_at",
+    "snippet",
+    "newest_body_text",
+    "attachment_manifest",
+    "auto_link_eligible",
+)
 BODY_ORDER_SIGNAL_RE = re.compile(
     r"\b(?:lpo|local\s+purchase\s+order|purchase\s+order|order\s+confirmation)\b"
     r"|\b(?:please\s+proceed|go\s+ahead)\b"
@@ -1021,19 +1065,77 @@ def _imdaad_order_rows(text, *, source):
     return True, tuple(rows), tuple(warnings)
 
 
+@dataclass(frozen=True)
+class PortalLayout:
+    """A customer-portal PO layout and the header markers that identify it.
+
+    Every document ``parse_rows`` (or ``document_total``) recognizes must contain
+    at least one of ``signatures``; a layout is only tried on text that does.
+    """
+
+    name: str
+    signatures: tuple[str, ...]
+    parse_rows: object
+    document_total: object = None
+
+
+PORTAL_LAYOUTS = []
+
+
+def register_portal_layout(name, *, signatures, parse_rows, document_total=None):
+    """Add a portal layout after the existing ones; earlier layouts win."""
+
+    signatures = tuple(" ".join(marker.casefold().split()) for marker in signatures)
+    if not signatures or not all(signatures):
+        raise ValueError(f"Portal layout {name!r} needs at least one non-blank signature.")
+    if any(layout.name == name for layout in PORTAL_LAYOUTS):
+        raise ValueError(f"Portal layout {name!r} is already registered.")
+    layout = PortalLayout(name, signatures, parse_rows, document_total)
+    PORTAL_LAYOUTS.append(layout)
+    _portal_signature_pattern.cache_clear()
+    portal_layouts_for.cache_clear()
+    return layout
+
+
+@lru_cache(maxsize=1)
+def _portal_signature_pattern():
+    markers = sorted(
+        {marker for layout in PORTAL_LAYOUTS for marker in layout.signatures},
+        key=len,
+        reverse=True,
+    )
+    # The lookahead reports a marker at every offset, so one marker can never
+    # hide another that overlaps it. Cells collapse whitespace runs, so any
+    # whitespace between marker words matches.
+    alternation = "|".join(r"\s+".join(map(re.escape, marker.split())) for marker in markers)
+    return re.compile(f"(?=({alternation}))")
+
+
+def detect_portal_layouts(text):
+    """Return the registered layouts whose signatures occur in ``text``, in priority order."""
+
+    found = {
+        " ".join(match.group(1).split())
+        for match in _portal_signature_pattern().finditer(str(text or "").casefold())
+    }
+    if not found:
+        return ()
+    return tuple(
+        layout
+        for layout in PORTAL_LAYOUTS
+        if any(marker in found for marker in layout.signatures)
+    )
+
+
+@lru_cache(maxsize=64)
+def portal_layouts_for(text):
+    # Rows and totals are read from the same document text back to back.
+    return detect_portal_layouts(text)
+
+
 def _portal_order_rows(text, *, source):
-    for parser in (
-        _ariba_order_rows,
-        _hotel_procurement_order_rows,
-        _raq_order_rows,
-        _khansaheb_order_rows,
-        _dubai_holding_order_rows,
-        _ecc_order_rows,
-        _al_sahel_order_rows,
-        _emrill_order_rows,
-        _imdaad_order_rows,
-    ):
-        recognized, rows, warnings = parser(text, source=source)
+    for layout in portal_layouts_for(str(text or "")):
+        recognized, rows, warnings = layout.parse_rows(text, source=source)
         if recognized:
             return True, rows, warnings
     return False, (), ()
@@ -1099,13 +1201,63 @@ def _raq_document_total(text):
     return True, None
 
 
+register_portal_layout(
+    "ariba",
+    signatures=("SAP Business Network", "Ariba Network"),
+    parse_rows=_ariba_order_rows,
+)
+register_portal_layout(
+    "hotel",
+    signatures=("Product Desc.",),
+    parse_rows=_hotel_procurement_order_rows,
+)
+register_portal_layout(
+    "raq",
+    signatures=("Sanisoft",),
+    parse_rows=_raq_order_rows,
+    document_total=_raq_document_total,
+)
+register_portal_layout(
+    "khansaheb",
+    signatures=("Khansaheb Civil Engineering",),
+    parse_rows=_khansaheb_order_rows,
+)
+register_portal_layout(
+    "dubai_holding",
+    signatures=("Schedule of Details",),
+    parse_rows=_dubai_holding_order_rows,
+)
+register_portal_layout(
+    "ecc",
+    # The totals summary accepts the company name without its trailing dot.
+    signatures=("Engineering Contracting Co",),
+    parse_rows=_ecc_order_rows,
+    document_total=_ecc_document_total,
+)
+register_portal_layout(
+    "al_sahel",
+    signatures=("Al Sahel",),
+    parse_rows=_al_sahel_order_rows,
+)
+register_portal_layout(
+    "emrill",
+    signatures=("Emrill",),
+    parse_rows=_emrill_order_rows,
+)
+register_portal_layout(
+    "imdaad",
+    signatures=("IMDAAD Contact Name",),
+    parse_rows=_imdaad_order_rows,
+)
+
+
 def _document_total(document, text):
-    ecc_recognized, ecc_total = _ecc_document_total(text)
-    if ecc_recognized:
-        return ecc_total
-    raq_recognized, raq_total = _raq_document_total(text)
-    if raq_recognized:
-        return raq_total
+    for layout in portal_layouts_for(str(text or "")):
+        if layout.document_total is None:
+            continue
+        recognized, total = layout.document_total(text)
+        if recognized:
+            return total
     totals = document.get("totals") or {}
     if isinstance(totals, dict):
         for key in ("grand_total", "net_total", "total", "total_amount"):
@@ -1582,6 +1734,143 @@ def document_variants(inventory):
     return tuple(variants)
 
 
+@lru_cache(maxsize=1)
+def document_variant_parser_version():
+    """Return a digest of everything that turns an inventory row into variants.
+
+    It covers this module (the portal layout parsers and the variant builder),
+    the generic import parsers and rules, the reference extractor and the
+    cached dataclass shapes, so editing any of them invalidates every cached
+    row without a manual version bump.
+    """
+
+    digest = hashlib.sha256(f"document-variants:{DOCUMENT_VARIANT_CACHE_VERSION}".encode("ascii"))
+    for dataclass_type in (DocumentVariant, CanonicalMailboxMessage, MailboxPOLine):
+        digest.update(",".join(field.name for field in fields(dataclass_type)).encode("ascii"))
+    for module in (sys.modules[__name__], import_parsers, import_rules, mailbox_po_audit):
+        digest.update(Path(module.__file__).read_bytes())
+    return digest.hexdigest()
+
+
+def _cached_value(value):
+    if isinstance(value, MailboxPOLine):
+        return {field.name: _cached_value(getattr(value, field.name)) for field in fields(MailboxPOLine)}
+    if isinstance(value, tuple):
+        return [_cached_value(item) for item in value]
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def _restored_fields(values):
+    restored = {}
+    for name, value in values.items():
+        if isinstance(value, list):
+            value = tuple(value)
+        elif value is not None and name in CACHED_DECIMAL_FIELDS:
+            value = Decimal(value)
+        elif value is not None and name in CACHED_DATETIME_FIELDS:
+            value = datetime.fromisoformat(value)
+        restored[name] = value
+    return restored
+
+
+def _variant_to_cache(variant):
+    payload = {
+        field.name: _cached_value(getattr(variant, field.name))
+        for field in fields(DocumentVariant)
+        if field.name != "message"
+    }
+    payload["message"] = {
+        field.name: _cached_value(getattr(variant.message, field.name))
+        for field in fields(CanonicalMailboxMessage)
+    }
+    return payload
+
+
+def _variant_from_cache(payload):
+    message = dict(payload["message"])
+    rows = tuple(MailboxPOLine(**_restored_fields(row)) for row in message.pop("parsed_rows"))
+    variant = _restored_fields({name: value for name, value in payload.items() if name != "message"})
+    return DocumentVariant(
+        message=CanonicalMailboxMessage(parsed_rows=rows, **_restored_fields(message)),
+        **variant,
+    )
+
+
+def load_document_variants(inventories, fingerprints):
+    """Return cached variants, by message id, whose inputs and parser are unchanged."""
+
+    rows = MailboxPODocumentVariantCache.objects.filter(
+        message__in=[inventory.id for inventory in inventories],
+        parser_version=document_variant_parser_version(),
+    )
+    return {
+        row.message_id: tuple(_variant_from_cache(payload) for payload in row.variants)
+        for row in rows
+        if row.input_sha256 == fingerprints[row.message_id]
+    }
+
+
+def store_document_variants(variants_by_id, fingerprints):
+    if not variants_by_id:
+        return
+    version = document_variant_parser_version()
+    MailboxPODocumentVariantCache.objects.bulk_create(
+        [
+            MailboxPODocumentVariantCache(
+                message_id=message_id,
+                input_sha256=fingerprints[message_id],
+                parser_version=version,
+                variants=[_variant_to_cache(variant) for variant in variants],
+            )
+            for message_id, variants in variants_by_id.items()
+        ],
+        update_conflicts=True,
+        unique_fields=["message"],
+        update_fields=["input_sha256", "parser_version", "variants", "updated_at"],
+    )
+
+
+def cached_document_variants(inventory, *, store=True):
+    """Return ``document_variants(inventory)``, from the cache when it is current."""
+
+    fingerprints = {inventory.id: mailbox_message_fingerprint(inventory)}
+    variants = load_document_variants([inventory], fingerprints).get(inventory.id)
+    if variants is None:
+        variants = document_variants(inventory)
+        if store:
+            store_document_variants({inventory.id: variants}, fingerprints)
+    return variants
+
+
+class _PageDocumentVariants:
+    """Document variants of one match page: cached rows first, parsed on demand."""
+
+    def __init__(self, page, fingerprints):
+        self.fingerprints = fingerprints
+        self.variants = load_document_variants(page, fingerprints) if page else {}
+        self.parsed = {}
+
+    def cached(self, inventory):
+        return self.variants.get(inventory.id)
+
+    def add_parsed(self, inventory, variants):
+        self.variants[inventory.id] = self.parsed[inventory.id] = variants
+
+    def __call__(self, inventory):
+        variants = self.cached(inventory)
+        if variants is None:
+            variants = document_variants(inventory)
+            self.add_parsed(inventory, variants)
+        return variants
+
+    def save(self):
+        store_document_variants(self.parsed, self.fingerprints)
+
+
 def eligible_quotations():
     contacts = Prefetch(
         "company__contacts",
@@ -1639,15 +1928,116 @@ def eligible_quotations():
     return tuple(canonical)
 
 
-def _proposals_for_message(inventory, quotes):
+def eligible_quotation_watermark():
+    """Return a cheap stamp that changes whenever ``eligible_quotations`` could."""
+
+    watermark = []
+    for model in (Quotation, QuotationLine, Company, CompanyContact):
+        summary = model.objects.order_by().aggregate(
+            rows=Count("id"),
+            last_id=Max("id"),
+            last_updated=Max("updated_at"),
+        )
+        watermark.append((summary["rows"], summary["last_id"], summary["last_updated"]))
+    return tuple(watermark)
+
+
+class EligibleQuotationSnapshot:
+    """Versioned canonical eligible quotations, with their ranking index."""
+
+    def __init__(self, watermark, quotes, *, version=ELIGIBLE_QUOTATION_SNAPSHOT_VERSION):
+        self.version = version
+        self.watermark = watermark
+        self.quotes = tuple(quotes)
+        self.index = EligibleQuotationIndex(self.quotes)
+
+    @cached_property
+    def fingerprints(self):
+        """Digest of each canonical quotation, keyed by its id as a string."""
+
+        return {
+            str(quote.quote_id): hashlib.sha256(repr(quote).encode("utf-8")).hexdigest()[:32]
+            for quote in self.quotes
+        }
+
+
+_eligible_quotation_snapshot = None
+_eligible_quotation_snapshot_lock = threading.Lock()
+
+
+def _snapshot_path():
+    directory = str(getattr(settings, "QUOTATION_MAILBOX_QUOTE_SNAPSHOT_DIR", "") or "")
+    return Path(directory) / ELIGIBLE_QUOTATION_SNAPSHOT_FILENAME if directory else None
+
+
+def _load_snapshot_quotes(path, watermark):
+    # The directory is operator-owned; a missing, stale or corrupt file is
+    # simply rebuilt.
+    try:
+        with path.open("rb") as handle:
+            version, stored_watermark, quotes = pickle.load(handle)
+    except Exception:
+        return None
+    if version != ELIGIBLE_QUOTATION_SNAPSHOT_VERSION or stored_watermark != watermark:
+        return None
+    return quotes
+
+
+def _store_snapshot_quotes(path, snapshot):
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        handle = tempfile.NamedTemporaryFile("wb", dir=path.parent, prefix=".eligible-quotations-", delete=False)
+    except OSError:
+        return
+    try:
+        with handle:
+            pickle.dump(
+                (snapshot.version, snapshot.watermark, snapshot.quotes),
+                handle,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+        os.replace(handle.name, path)
+    except OSError:
+        Path(handle.name).unlink(missing_ok=True)
+
+
+def current_eligible_quotation_snapshot():
+    """Return the eligible-quotation snapshot, rebuilding it only after a data change.
+
+    The snapshot is kept per process and, when
+    ``QUOTATION_MAILBOX_QUOTE_SNAPSHOT_DIR`` is set, pickled there so a new
+    worker process can reuse it. Draining many pages therefore canonicalizes
+    the quotation set once rather than once per page.
+    """
+
+    global _eligible_quotation_snapshot
+    watermark = eligible_quotation_watermark()
+    snapshot = _eligible_quotation_snapshot
+    if snapshot is not None and snapshot.watermark == watermark:
+        return snapshot
+    path = _snapshot_path()
+    quotes = _load_snapshot_quotes(path, watermark) if path else None
+    # The watermark is read before the rows, so a concurrent edit can only make
+    # the snapshot look older than its data and trigger one extra rebuild.
+    snapshot = EligibleQuotationSnapshot(watermark, quotes if quotes is not None else eligible_quotations())
+    if path and quotes is None:
+        _store_snapshot_quotes(path, snapshot)
+    with _eligible_quotation_snapshot_lock:
+        _eligible_quotation_snapshot = snapshot
+    return snapshot
+
+
+def _proposals_for_message(inventory, quotes, variants=None):
     # Rank every attachment/body as an independent document. A single Gmail
     # message can legitimately carry LPOs for multiple quotations; collapsing
     # all variants to one message-level winner silently discards those orders.
     best_by_source_and_quote = {}
+    candidate_quote_ids = set()
     variant_count = 0
-    for variant in document_variants(inventory):
+    for variant in document_variants(inventory) if variants is None else variants:
         variant_count += 1
         result = rank_message_to_quotations(variant.message, quotes)
+        candidate_quote_ids.update(result.candidate_quote_ids)
         variant_decisive = bool(inventory.auto_link_eligible and result.status == AUTOMATIC)
         candidates = result.candidates[:1] if variant_decisive else result.candidates[:3]
         source_key = QuotationPOEvidence.build_source_key(
@@ -1681,9 +2071,189 @@ def _proposals_for_message(inventory, quotes):
         ),
         reverse=True,
     )
+    candidate_quote_ids = tuple(sorted(candidate_quote_ids, key=str))
     if not ranked:
-        return (), False, variant_count
-    return tuple(ranked), any(proposal.decisive for proposal in ranked), variant_count
+        return (), False, variant_count, candidate_quote_ids
+    return (
+        tuple(ranked),
+        any(proposal.decisive for proposal in ranked),
+        variant_count,
+        candidate_quote_ids,
+    )
+
+
+def mailbox_message_fingerprint(inventory):
+    """Return a digest of the inventory fields that matching depends on."""
+
+    payload = json.dumps(
+        [getattr(inventory, field) for field in MATCH_INPUT_FIELDS],
+        default=str,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8", errors="ignore")).hexdigest()
+
+
+_delta_quote_changes = None
+_delta_quote_changes_lock = threading.Lock()
+
+
+def _changed_quotations(baseline_id, snapshot):
+    """Return quotations added, edited or removed since a baseline match run.
+
+    The result is ``(changed_ids, index)``: string ids of every such quotation,
+    and an index of the ones still eligible. It is cached per baseline and
+    snapshot because every page of a delta run asks the same question.
+    """
+
+    global _delta_quote_changes
+    key = (baseline_id, snapshot.watermark)
+    cached = _delta_quote_changes
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+    previous = (
+        MailboxPOMatchRun.objects.filter(pk=baseline_id)
+        .values_list("quote_fingerprints", flat=True)
+        .first()
+    ) or {}
+    current = snapshot.fingerprints
+    changed_ids = {quote_id for quote_id, digest in current.items() if previous.get(quote_id) != digest}
+    changed_ids.update(set(previous) - set(current))
+    index = EligibleQuotationIndex(
+        [quote for quote in snapshot.quotes if str(quote.quote_id) in changed_ids]
+    )
+    with _delta_quote_changes_lock:
+        _delta_quote_changes = (key, changed_ids, index)
+    return changed_ids, index
+
+
+def _carried_message_results(match_run, snapshot, page, fingerprints, variants):
+    """Return the baseline results that still hold for a page, by message id.
+
+    A result is reused only when the message's matching inputs are unchanged,
+    none of its evidence was touched after the baseline completed, none of its
+    former candidate quotations changed or disappeared, and no changed
+    quotation yields a candidate for it on its own. Quotations are evaluated
+    independently, so a full re-rank would then reproduce the same result.
+    """
+
+    baseline_id = match_run.baseline_run_id
+    if match_run.mode != MailboxPOMatchRun.MODE_DELTA or not baseline_id or not page:
+        return {}
+    previous = {
+        row.message_id: row
+        for row in MailboxPOMatchRunMessage.objects.filter(
+            match_run_id=baseline_id,
+            message__in=[inventory.id for inventory in page],
+        )
+    }
+    if not previous:
+        return {}
+    baseline_completed_at = (
+        MailboxPOMatchRun.objects.filter(pk=baseline_id)
+        .values_list("completed_at", flat=True)
+        .first()
+    )
+    touched = set(
+        QuotationPOEvidence.objects.filter(
+            mailbox_message_id__in=list(previous),
+            updated_at__gt=baseline_completed_at,
+        ).values_list("mailbox_message_id", flat=True)
+    )
+    changed_ids, changed_quotes = _changed_quotations(baseline_id, snapshot)
+    carried = {}
+    for inventory in page:
+        row = previous.get(inventory.id)
+        if row is None or inventory.id in touched or row.input_sha256 != fingerprints[inventory.id]:
+            continue
+        if changed_ids.intersection(str(quote_id) for quote_id in row.candidate_quote_ids):
+            continue
+        if len(changed_quotes) and any(
+            rank_message_to_quotations(variant.message, changed_quotes).candidate_quote_ids
+            for variant in variants(inventory)
+        ):
+            continue
+        carried[inventory.id] = row
+    return carried
+
+
+_worker_quotes = None
+
+
+def _initialize_match_worker(quotes):
+    global _worker_quotes
+    # Spawned/forkserver workers start without Django configured.
+    if not apps.ready:
+        django.setup()
+    _worker_quotes = EligibleQuotationIndex(quotes)
+
+
+def _rank_message_in_worker(task):
+    inventory, variants = task
+    parsed = None
+    if variants is None:
+        variants = parsed = document_variants(inventory)
+    return _proposals_for_message(inventory, _worker_quotes, variants=variants), parsed
+
+
+class MailboxMatchPool:
+    """Rank page messages in worker processes against one quotation snapshot.
+
+    The snapshot's quotations are pickled to each worker once, when the pool
+    starts, and the pool restarts only after the snapshot's watermark moves.
+    Workers never touch the database: evidence is still written by the lease
+    holder, one message at a time in cursor order.
+    """
+
+    def __init__(self, workers):
+        self.workers = max(int(workers or 0), 1)
+        self._executor = None
+        self._watermark = None
+        self._unavailable = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+            self._watermark = None
+
+    def submit(self, snapshot, inventories, variants=None):
+        """Return one future per inventory, in the order given.
+
+        Each future resolves to ``(ranking, parsed)``, where ``parsed`` holds
+        the document variants the worker had to parse because ``variants``
+        had no cached entry for that message. Returns ``None`` when worker
+        processes cannot run here (a daemonic parent, or a pool that fails to
+        start); the caller then ranks the page inline.
+        """
+
+        if self._unavailable or multiprocessing.current_process().daemon:
+            return None
+        try:
+            if self._executor is None or self._watermark != snapshot.watermark:
+                self.close()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    initializer=_initialize_match_worker,
+                    initargs=(snapshot.quotes,),
+                )
+                self._watermark = snapshot.watermark
+            variants = variants or {}
+            return [
+                self._executor.submit(_rank_message_in_worker, (inventory, variants.get(inventory.id)))
+                for inventory in inventories
+            ]
+        except (BrokenProcessPool, OSError) as exc:
+            logger.warning("Mailbox match pool unavailable (%s); ranking inline.", type(exc).__name__)
+            self.close()
+            self._unavailable = True
+            return None
 
 
 def _manifest_with_selection(inventory, variant):
@@ -2528,7 +3098,23 @@ def _run_messages(audit_run):
     )
 
 
-def _claim_match_run(audit_run, *, requested_by=None, match_run=None, force=False):
+def _delta_baseline(audit_run):
+    """Return the latest completed run a delta run can reuse, if any."""
+
+    baseline = (
+        MailboxPOMatchRun.objects.filter(
+            audit_run__gmail_connection=audit_run.gmail_connection,
+            algorithm_version=ALGORITHM_VERSION,
+            status=MailboxPOMatchRun.STATUS_COMPLETED,
+        )
+        .order_by("-completed_at", "-id")
+        .first()
+    )
+    # Runs recorded before per-message results existed cannot be reused.
+    return baseline if baseline and baseline.quote_fingerprints else None
+
+
+def _claim_match_run(audit_run, *, requested_by=None, match_run=None, force=False, delta=False):
     """Claim a short lease without holding a database lock during matching."""
 
     now = timezone.now()
@@ -2561,10 +3147,13 @@ def _claim_match_run(audit_run, *, requested_by=None, match_run=None, force=Fals
                 # existing reconciliation is still resumable.
                 pass
             elif force or current is None or current.status == MailboxPOMatchRun.STATUS_FAILED:
+                baseline = _delta_baseline(locked_audit) if delta else None
                 current = MailboxPOMatchRun.objects.create(
                     audit_run=locked_audit,
                     requested_by=requested_by,
                     algorithm_version=ALGORITHM_VERSION,
+                    mode=MailboxPOMatchRun.MODE_DELTA if baseline else MailboxPOMatchRun.MODE_FULL,
+                    baseline_run=baseline,
                     summary=_initial_summary(),
                 )
 
@@ -2682,6 +3271,14 @@ def _supersede_stale_evidence(stale_ids):
 
 def _finalize_match_run(match_run, audit_run, summary, errors, *, max_active_per_quote):
     summary["existing_evidence_linked"] = _link_existing_evidence_to_inventory(audit_run)
+    if match_run.mode == MailboxPOMatchRun.MODE_DELTA and match_run.baseline_run_id:
+        # Carried messages keep the evidence their baseline stored. Adopt it
+        # so this run owns its whole active set; a queryset update leaves
+        # updated_at alone, so the next delta does not read it as a review.
+        QuotationPOEvidence.objects.filter(
+            mailbox_match_run_id=match_run.baseline_run_id,
+            mailbox_message_id__in=match_run.message_results.filter(carried=True).values("message_id"),
+        ).update(mailbox_match_run=match_run)
     active_ids = set(
         QuotationPOEvidence.objects.filter(mailbox_match_run=match_run)
         .exclude(
@@ -2735,6 +3332,8 @@ def _persist_owned_match_page(
     cursor_message_id,
     has_more,
     max_active_per_quote,
+    message_results=(),
+    quote_fingerprints=None,
 ):
     """Commit page state only if the claimed lease still belongs to this worker."""
 
@@ -2742,6 +3341,11 @@ def _persist_owned_match_page(
         current = _locked_owned_match_run(match_run_id, lease_token)
         now = timezone.now()
         current.cursor_message_id = cursor_message_id
+        MailboxPOMatchRunMessage.objects.bulk_create(message_results)
+        if quote_fingerprints and not current.quote_fingerprints:
+            # The first page's quotations are the oldest any message in this
+            # run was ranked against, so the next delta compares with those.
+            current.quote_fingerprints = quote_fingerprints
         current.lease_expires_at = now + timedelta(seconds=MATCH_LEASE_SECONDS)
         current.last_heartbeat_at = now
         if not has_more:
@@ -2761,6 +3365,7 @@ def _persist_owned_match_page(
         current.save(
             update_fields=[
                 "cursor_message_id",
+                "quote_fingerprints",
                 "status",
                 "summary",
                 "errors",
@@ -2811,12 +3416,20 @@ def reconcile_mailbox_po_audit_page(
     page_size=DEFAULT_MATCH_PAGE_SIZE,
     force=False,
     max_active_per_quote=MAX_ACTIVE_EVIDENCE_PER_QUOTE,
+    workers=0,
+    pool=None,
+    delta=False,
 ):
     """Match one bounded message page and persist a resumable cursor.
 
     The lease is held only in the ledger, never as an open database
     transaction while CPU-heavy comparisons run. Replaying a page after a
     killed worker is safe because evidence upserts are source-key idempotent.
+    With ``workers`` above one (or a shared ``pool``) the page is ranked in a
+    ``MailboxMatchPool``; proposals are still stored here, in cursor order.
+    ``delta`` applies when a new run is started: it then carries forward the
+    results of the latest completed run that no message or quotation change
+    could alter, and re-ranks only the rest.
     """
 
     audit_run, match_run, lease_token = _claim_match_run(
@@ -2824,15 +3437,24 @@ def reconcile_mailbox_po_audit_page(
         requested_by=requested_by,
         match_run=match_run,
         force=force,
+        delta=delta,
     )
     if not lease_token:
         return match_run
 
     page_size = max(1, min(int(page_size or DEFAULT_MATCH_PAGE_SIZE), MAX_MATCH_PAGE_SIZE))
     summary = {**_initial_summary(), **(match_run.summary or {})}
+    if match_run.mode == MailboxPOMatchRun.MODE_DELTA:
+        summary.setdefault("delta_carried_messages", 0)
+        summary.setdefault("delta_reranked_messages", 0)
     errors = list(match_run.errors or [])[-MAX_MATCH_ERRORS:]
+    message_results = []
+    owned_pool = None
+    if pool is None and int(workers or 0) > 1:
+        pool = owned_pool = MailboxMatchPool(workers)
     try:
-        quotes = eligible_quotations()
+        snapshot = current_eligible_quotation_snapshot()
+        quotes = snapshot.index
         _renew_match_lease(match_run.id, lease_token)
         summary["eligible_quotations"] = len(quotes)
         page = list(
@@ -2843,38 +3465,82 @@ def reconcile_mailbox_po_audit_page(
         _renew_match_lease(match_run.id, lease_token)
         has_more = len(page) > page_size
         page = page[:page_size]
+        fingerprints = {inventory.id: mailbox_message_fingerprint(inventory) for inventory in page}
+        variants = _PageDocumentVariants(page, fingerprints)
+        carried = _carried_message_results(match_run, snapshot, page, fingerprints, variants)
+        _renew_match_lease(match_run.id, lease_token)
+        to_rank = [inventory for inventory in page if inventory.id not in carried]
+        futures = pool.submit(snapshot, to_rank, variants.variants) if pool is not None and to_rank else None
+        ranked = dict(zip([inventory.id for inventory in to_rank], futures)) if futures is not None else None
         for inventory in page:
             _renew_match_lease(match_run.id, lease_token)
             summary["relevant_messages"] += 1
             if not inventory.auto_link_eligible:
                 summary["spam_or_trash_messages"] += 1
+            previous = carried.get(inventory.id)
+            if previous is not None:
+                summary["delta_carried_messages"] += 1
+                summary["document_variants"] += previous.variant_count
+                summary[f"{previous.outcome}_messages"] += 1
+                message_results.append(
+                    MailboxPOMatchRunMessage(
+                        match_run_id=match_run.id,
+                        message=inventory,
+                        input_sha256=previous.input_sha256,
+                        candidate_quote_ids=previous.candidate_quote_ids,
+                        variant_count=previous.variant_count,
+                        outcome=previous.outcome,
+                        carried=True,
+                    )
+                )
+                continue
             try:
-                proposals, decisive, variant_count = _proposals_for_message(inventory, quotes)
+                if ranked is not None:
+                    ranking, parsed = ranked[inventory.id].result()
+                    if parsed is not None:
+                        variants.add_parsed(inventory, parsed)
+                else:
+                    ranking = _proposals_for_message(inventory, quotes, variants=variants(inventory))
+                proposals, decisive, variant_count, candidate_quote_ids = ranking
                 # Matching can be CPU-heavy. Verify ownership again before any
                 # evidence write so an expired/stolen worker cannot persist its
                 # stale page after returning from the comparison.
                 _renew_match_lease(match_run.id, lease_token)
                 summary["document_variants"] += variant_count
+                if match_run.mode == MailboxPOMatchRun.MODE_DELTA:
+                    summary["delta_reranked_messages"] += 1
                 if not proposals:
-                    summary["unmatched_messages"] += 1
+                    outcome = MailboxPOMatchRunMessage.OUTCOME_UNMATCHED
+                elif decisive:
+                    outcome = MailboxPOMatchRunMessage.OUTCOME_DECISIVE
                 else:
-                    if decisive:
-                        summary["decisive_messages"] += 1
-                    else:
-                        summary["ambiguous_messages"] += 1
-                    for proposal in proposals:
-                        evidence, created = _store_owned_proposal(
-                            match_run.id,
-                            lease_token,
-                            inventory,
-                            proposal,
-                            requested_by,
-                            decisive=proposal.decisive,
-                            variant_count=variant_count,
-                        )
-                        summary["evidence_created" if created else "evidence_updated"] += 1
+                    outcome = MailboxPOMatchRunMessage.OUTCOME_AMBIGUOUS
+                summary[f"{outcome}_messages"] += 1
+                for proposal in proposals:
+                    evidence, created = _store_owned_proposal(
+                        match_run.id,
+                        lease_token,
+                        inventory,
+                        proposal,
+                        requested_by,
+                        decisive=proposal.decisive,
+                        variant_count=variant_count,
+                    )
+                    summary["evidence_created" if created else "evidence_updated"] += 1
+                message_results.append(
+                    MailboxPOMatchRunMessage(
+                        match_run_id=match_run.id,
+                        message=inventory,
+                        input_sha256=fingerprints[inventory.id],
+                        candidate_quote_ids=list(candidate_quote_ids),
+                        variant_count=variant_count,
+                        outcome=outcome,
+                    )
+                )
                 _renew_match_lease(match_run.id, lease_token)
-            except MailboxPOMatchBusy:
+            except (MailboxPOMatchBusy, BrokenProcessPool):
+                # A dead worker says nothing about this message; fail the page
+                # so the cursor stays put and the page is replayed.
                 raise
             except Exception as exc:
                 _renew_match_lease(match_run.id, lease_token)
@@ -2886,6 +3552,7 @@ def reconcile_mailbox_po_audit_page(
                         }
                     )
 
+        variants.save()
         cursor_message_id = page[-1].id if page else match_run.cursor_message_id
         match_run = _persist_owned_match_page(
             match_run.id,
@@ -2896,12 +3563,17 @@ def reconcile_mailbox_po_audit_page(
             cursor_message_id=cursor_message_id,
             has_more=has_more,
             max_active_per_quote=max_active_per_quote,
+            message_results=message_results,
+            quote_fingerprints=snapshot.fingerprints,
         )
     except Exception as exc:
         if not isinstance(exc, MailboxPOMatchBusy):
             errors.append({"error": str(exc)[:1000]})
         _persist_owned_match_failure(match_run.id, lease_token, summary, errors)
         raise
+    finally:
+        if owned_pool is not None:
+            owned_pool.close()
     return match_run
 
 
@@ -2911,19 +3583,34 @@ def reconcile_mailbox_po_audit(
     requested_by=None,
     max_active_per_quote=MAX_ACTIVE_EVIDENCE_PER_QUOTE,
     page_size=MAX_MATCH_PAGE_SIZE,
+    workers=0,
+    delta=False,
 ):
-    """Drain resumable match pages for management commands and focused tests."""
+    """Drain resumable match pages for management commands and focused tests.
+
+    ``workers`` above one keeps a single ``MailboxMatchPool`` for the whole
+    drain, so the quotation snapshot is shipped to the workers only once.
+    ``delta`` starts the run against the latest completed one; see
+    ``reconcile_mailbox_po_audit_page``.
+    """
 
     match_run = None
     force = True
-    while match_run is None or match_run.status == MailboxPOMatchRun.STATUS_RUNNING:
-        match_run = reconcile_mailbox_po_audit_page(
-            audit_run,
-            requested_by=requested_by,
-            match_run=match_run,
-            page_size=page_size,
-            force=force,
-            max_active_per_quote=max_active_per_quote,
-        )
-        force = False
+    pool = MailboxMatchPool(workers) if int(workers or 0) > 1 else None
+    try:
+        while match_run is None or match_run.status == MailboxPOMatchRun.STATUS_RUNNING:
+            match_run = reconcile_mailbox_po_audit_page(
+                audit_run,
+                requested_by=requested_by,
+                match_run=match_run,
+                page_size=page_size,
+                force=force,
+                max_active_per_quote=max_active_per_quote,
+                pool=pool,
+                delta=delta,
+            )
+            force = False
+    finally:
+        if pool is not None:
+            pool.close()
     return match_run
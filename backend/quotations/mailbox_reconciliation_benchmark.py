@@ -0,0 +1,369 @@
+"""Load benchmark for resumable mailbox PO reconciliation.
+
+Every run generates a synthetic shared-mailbox audit inside one transaction
+that is always rolled back: sent quotations with realistic line counts, and
+relevant inventory messages in the attachment, portal-layout, email-body and
+unrelated-order styles the reconciler sees. The audit is then drained page by
+page exactly as the API and management command do, so the report measures real
+SQL, parsing and ranking against the configured backend.
+"""
+
+import random
+import sys
+import time
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .mailbox_po_reconciliation import (
+    MailboxMatchPool,
+    current_eligible_quotation_snapshot,
+    reconcile_mailbox_po_audit_page,
+)
+from .matching_benchmark import _percentile, _product_name
+from .models import (
+    Company,
+    GmailOAuthConnection,
+    MailboxPOAuditRun,
+    MailboxPOAuditRunMessage,
+    MailboxPOMatchRun,
+    MailboxPOMessage,
+    Quotation,
+    QuotationLine,
+)
+from .portal_layout_benchmark import NO_PORTAL_LAYOUT, load_portal_layout_corpus
+
+try:
+    import resource
+except ImportError:  # Windows development machines.
+    resource = None
+
+
+DEFAULT_MESSAGE_COUNT = 1_000
+DEFAULT_QUOTATION_COUNT = 1_000
+DEFAULT_SEED = 20261017
+# The reconcile API clamps each request to ten messages.
+DEFAULT_PAGE_SIZE = 10
+# Gunicorn's default ``--timeout`` in the Procfile.
+DEFAULT_MAX_PAGE_SECONDS = 300.0
+QUOTES_PER_COMPANY = 8
+# Relative frequency of each generated message style.
+MESSAGE_STYLES = (
+    ("attachment", 55),
+    ("body", 20),
+    ("portal", 15),
+    ("unrelated", 10),
+)
+_UNITS = ["PCS", "BOX", "NOS", "EA", "PKT", "ROLL"]
+_UNRELATED_ITEMS = ["Toner Cartridge", "Office Chair", "A4 Paper Ream", "Extension Cable", "Whiteboard Marker"]
+
+
+def _line_count(rng):
+    # Most quotations are short; a long tail carries dozens of lines.
+    return min(60, max(1, int(rng.lognormvariate(1.6, 0.7))))
+
+
+def _build_quotations(rng, count, *, seed, user, now):
+    company_count = max(1, count // QUOTES_PER_COMPANY)
+    companies = [
+        Company.objects.create(
+            name=f"{_product_name(rng).split()[0]} Medical Centre {seed % 1000:03d}-{index:05d}",
+            email=f"buyer{index}@customer{index}-{seed % 1000:03d}.test",
+        )
+        for index in range(company_count)
+    ]
+    quotations = []
+    numbers_per_day = defaultdict(int)
+    for index in range(count):
+        sent_at = now - timedelta(days=rng.uniform(30, 395))
+        day = f"{sent_at:%Y%m%d}"
+        # Real numbering restarts at 0001 each day; starting at 9000 keeps the
+        # synthetic numbers clear of it while matching QUOTATION_REFERENCE.
+        number = 9000 + numbers_per_day[day]
+        numbers_per_day[day] += 1
+        quotations.append(
+            Quotation(
+                company=companies[index % company_count],
+                quotation_number=f"QT-{day}-{number}",
+                status=Quotation.STATUS_SENT,
+                sent_at=sent_at,
+                created_by=user,
+            )
+        )
+    quotations = Quotation.objects.bulk_create(quotations, batch_size=1000)
+    lines = []
+    lines_by_quote = {}
+    for quotation in quotations:
+        quote_lines = []
+        for sort_order in range(_line_count(rng)):
+            quantity = Decimal(rng.choice([1, 2, 5, 10, 12, 20, 50, 100]))
+            unit_price = Decimal(rng.randint(150, 25_000)) / Decimal("100")
+            subtotal = (quantity * unit_price).quantize(Decimal("0.01"))
+            quote_lines.append(
+                QuotationLine(
+                    quotation=quotation,
+                    item_name_snapshot=_product_name(rng),
+                    quantity=quantity,
+                    unit=rng.choice(_UNITS),
+                    unit_price=unit_price,
+                    line_subtotal=subtotal,
+                    line_total=subtotal,
+                    sort_order=sort_order,
+                )
+            )
+        lines.extend(quote_lines)
+        lines_by_quote[quotation.id] = quote_lines
+        quotation.subtotal = quotation.total = sum((line.line_subtotal for line in quote_lines), Decimal("0.00"))
+    QuotationLine.objects.bulk_create(lines, batch_size=1000)
+    Quotation.objects.bulk_update(quotations, ["subtotal", "total"], batch_size=1000)
+    return quotations, lines_by_quote
+
+
+def _ordered_rows(rng, quote_lines):
+    # Customers order most of a quotation, sometimes at a reduced quantity.
+    chosen = rng.sample(quote_lines, max(1, round(len(quote_lines) * rng.uniform(0.6, 1.0))))
+    rows = []
+    for line in chosen:
+        quantity = line.quantity if rng.random() < 0.8 else max(Decimal("1"), line.quantity // 2)
+        rows.append((line.item_name_snapshot, quantity, line.unit, line.unit_price))
+    return rows
+
+
+def _message_fields(rng, style, index, quotation, quote_lines, portal_texts, *, seed):
+    reference = f" ref {quotation.quotation_number}" if rng.random() < 0.3 else ""
+    sender = quotation.company.email if rng.random() < 0.85 else f"procurement{index}@forwarder.test"
+    sender = f"{quotation.company.name} <{sender}>"
+    subject = f"Purchase Order LPO-{seed % 1000:03d}-{index:06d}{reference}"
+    fields = {
+        "subject": subject,
+        "sender": sender,
+        "full_headers": [{"name": "From", "value": sender}, {"name": "Subject", "value": subject}],
+        "sent_at": quotation.sent_at + timedelta(hours=rng.uniform(2, 24 * 25)),
+        "newest_body_text": "Please find the purchase order attached.",
+        "attachment_manifest": [],
+    }
+    if style == "unrelated":
+        rows = [(rng.choice(_UNRELATED_ITEMS), Decimal(rng.randint(1, 20)), "PCS", Decimal("12.50"))]
+    else:
+        rows = _ordered_rows(rng, quote_lines)
+    if style == "body":
+        body = ["Dear Sir,", "Please find our purchase order for the items below."]
+        body += [f"{number}. {name} - {quantity} {unit}" for number, (name, quantity, unit, _price) in enumerate(rows, 1)]
+        body += ["Kindly deliver before Thursday.", "Regards,", "Procurement Team"]
+        fields["newest_body_text"] = "\n".join(body)
+        return fields
+    if style == "portal":
+        text = rng.choice(portal_texts)
+        lines = []
+    else:
+        total = sum((quantity * price for _name, quantity, _unit, price in rows), Decimal("0"))
+        text = "\n".join(
+            [f"Purchase Order{reference}"]
+            + [name for name, _quantity, _unit, _price in rows]
+            + [f"Grand Total: AED {total:.2f}"]
+        )
+        lines = [
+            {
+                "raw_name": name,
+                "quantity": str(quantity),
+                "unit": unit,
+                "unit_price": str(price),
+                "line_total": str((quantity * price).quantize(Decimal("0.01"))),
+            }
+            for name, quantity, unit, price in rows
+        ]
+    fields["attachment_manifest"] = [
+        {
+            "attachment_id": f"att-{index}",
+            "filename": f"LPO-{index:06d}.pdf",
+            "mime_type": "application/pdf",
+            "status": "parsed",
+            "source_sha256": f"{seed:016x}{index:048x}"[-64:],
+            "original_text": text,
+            "warnings": [],
+            "lines": lines,
+        }
+    ]
+    return fields
+
+
+def build_synthetic_mailbox(message_count, quotation_count, *, seed=DEFAULT_SEED):
+    """Create a completed audit run over synthetic quotations and PO messages.
+
+    Returns ``(audit_run, user, style_counts)``.
+    """
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    user = User.objects.create_user(f"mailbox-benchmark-{seed}", is_staff=True)
+    gmail_connection = GmailOAuthConnection.objects.create(
+        user=user,
+        email=f"orders-{seed}@benchmark.test",
+        status=GmailOAuthConnection.STATUS_CONNECTED,
+    )
+    quotations, lines_by_quote = _build_quotations(rng, quotation_count, seed=seed, user=user, now=now)
+    audit_run = MailboxPOAuditRun.objects.create(
+        gmail_connection=gmail_connection,
+        requested_by=user,
+        status=MailboxPOAuditRun.STATUS_COMPLETED,
+        earliest_quote_at=min(quotation.sent_at for quotation in quotations),
+        mailbox_cutoff_at=now,
+        gmail_query="in:anywhere -from:me",
+        exhausted=True,
+        completed_at=now,
+    )
+    portal_texts = [
+        document["text"]
+        for document in load_portal_layout_corpus().values()
+        if document["layout"] != NO_PORTAL_LAYOUT
+    ]
+    styles, weights = zip(*MESSAGE_STYLES)
+    style_counts = dict.fromkeys(styles, 0)
+    messages = []
+    for index in range(message_count):
+        style = rng.choices(styles, weights)[0]
+        style_counts[style] += 1
+        quotation = rng.choice(quotations)
+        messages.append(
+            MailboxPOMessage(
+                gmail_connection=gmail_connection,
+                gmail_message_id=f"benchmark-{seed}-{index:06d}",
+                mailbox_email=gmail_connection.email,
+                recipients=gmail_connection.email,
+                classification=MailboxPOMessage.CLASS_PURCHASE_ORDER,
+                is_relevant=True,
+                auto_link_eligible=True,
+                first_seen_run=audit_run,
+                last_seen_run=audit_run,
+                **_message_fields(
+                    rng,
+                    style,
+                    index,
+                    quotation,
+                    lines_by_quote[quotation.id],
+                    portal_texts,
+                    seed=seed,
+                ),
+            )
+        )
+    messages = MailboxPOMessage.objects.bulk_create(messages, batch_size=500)
+    MailboxPOAuditRunMessage.objects.bulk_create(
+        [MailboxPOAuditRunMessage(audit_run=audit_run, message=message) for message in messages],
+        batch_size=1000,
+    )
+    return audit_run, user, style_counts
+
+
+def peak_rss_kb():
+    """Return this process's and its reaped children's peak RSS in KiB."""
+
+    if resource is None:
+        return None, None
+    # ``ru_maxrss`` is KiB on Linux and bytes on macOS.
+    scale = 1024 if sys.platform == "darwin" else 1
+    return (
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // scale,
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss // scale,
+    )
+
+
+def _drain(audit_run, user, *, page_size, workers):
+    match_run = None
+    force = True
+    page_ms = []
+    pool = MailboxMatchPool(workers) if workers > 1 else None
+    try:
+        while match_run is None or match_run.status == MailboxPOMatchRun.STATUS_RUNNING:
+            started = time.perf_counter()
+            match_run = reconcile_mailbox_po_audit_page(
+                audit_run,
+                requested_by=user,
+                match_run=match_run,
+                page_size=page_size,
+                force=force,
+                pool=pool,
+            )
+            page_ms.append((time.perf_counter() - started) * 1000)
+            force = False
+    finally:
+        if pool is not None:
+            pool.close()
+    return match_run, page_ms
+
+
+def run_mailbox_reconciliation_benchmark(
+    *,
+    message_count=DEFAULT_MESSAGE_COUNT,
+    quotation_count=DEFAULT_QUOTATION_COUNT,
+    seed=DEFAULT_SEED,
+    page_size=DEFAULT_PAGE_SIZE,
+    workers=0,
+    max_page_seconds=DEFAULT_MAX_PAGE_SECONDS,
+):
+    """Reconcile one synthetic mailbox audit and report its throughput.
+
+    The audit is generated and drained in a rolled-back transaction, so
+    nothing persists. ``comparisons`` counts document variants times eligible
+    quotations, the pairs the ranking considers before pruning.
+    """
+
+    with transaction.atomic():
+        started = time.perf_counter()
+        audit_run, user, style_counts = build_synthetic_mailbox(message_count, quotation_count, seed=seed)
+        generation_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        current_eligible_quotation_snapshot()
+        snapshot_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        match_run, page_ms = _drain(audit_run, user, page_size=page_size, workers=workers)
+        reconcile_seconds = time.perf_counter() - started
+        summary = dict(match_run.summary or {})
+        status = match_run.status
+        error_count = len(match_run.errors or [])
+        transaction.set_rollback(True)
+
+    messages = int(summary.get("relevant_messages") or 0)
+    comparisons = int(summary.get("document_variants") or 0) * int(summary.get("eligible_quotations") or 0)
+    peak_rss, peak_child_rss = peak_rss_kb()
+    max_page_ms = max(page_ms, default=0.0)
+    violations = []
+    if status != MailboxPOMatchRun.STATUS_COMPLETED:
+        violations.append(f"Reconciliation ended with status {status!r}.")
+    if max_page_seconds is not None and max_page_ms > max_page_seconds * 1000:
+        violations.append(
+            f"Slowest page took {max_page_ms / 1000:.1f}s, above the {max_page_seconds:g}s page budget."
+        )
+    return {
+        "vendor": connection.vendor,
+        "seed": seed,
+        "messages": message_count,
+        "quotations": quotation_count,
+        "message_styles": style_counts,
+        "page_size": page_size,
+        "workers": workers,
+        "status": status,
+        "errors": error_count,
+        "summary": summary,
+        "generation_ms": round(generation_ms, 1),
+        "snapshot_ms": round(snapshot_ms, 1),
+        "reconcile_seconds": round(reconcile_seconds, 3),
+        "pages": len(page_ms),
+        "pages_per_second": round(len(page_ms) / reconcile_seconds, 3) if reconcile_seconds else None,
+        "page_p50_ms": round(_percentile(page_ms, 50), 1),
+        "page_p95_ms": round(_percentile(page_ms, 95), 1),
+        "page_max_ms": round(max_page_ms, 1),
+        "messages_per_second": round(messages / reconcile_seconds, 3) if reconcile_seconds else None,
+        "comparisons": comparisons,
+        "comparisons_per_second": round(comparisons / reconcile_seconds, 1) if reconcile_seconds else None,
+        "peak_rss_kb": peak_rss,
+        "peak_child_rss_kb": peak_child_rss,
+        "max_page_seconds": max_page_seconds,
+        "violations": violations,
+        "passed": not violations,
+    }
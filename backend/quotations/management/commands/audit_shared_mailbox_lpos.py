@@ -28,6 +28,17 @@ class Command(BaseCommand):
         parser.add_argument("--restart", action="store_true")
         parser.add_argument("--inventory-only", action="store_true")
         parser.add_argument("--rematch", action="store_true")
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=0,
+            help="Rank messages in this many worker processes; evidence is still stored in cursor order.",
+        )
+        parser.add_argument(
+            "--delta",
+            action="store_true",
+            help="Re-rank only messages and quotations changed since the last completed match run.",
+        )
 
     def handle(self, *args, **options):
         connection = resolve_gmail_connection(None, shared_only=True)
@@ -131,7 +142,12 @@ class Command(BaseCommand):
             status=MailboxPOMatchRun.STATUS_COMPLETED,
         ).first()
         if not match_run or options.get("rematch"):
-            match_run = reconcile_mailbox_po_audit(run, requested_by=connection.user)
+            match_run = reconcile_mailbox_po_audit(
+                run,
+                requested_by=connection.user,
+                workers=max(0, int(options.get("workers") or 0)),
+                delta=bool(options.get("delta")),
+            )
         payload.update(
             {
                 "match_run_id": match_run.id,
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.models import Product
+from quotations.matching import PRODUCT_IDENTITY_VERSION, bump_catalog_generation, product_identity_columns
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute the persisted quotation-matching identity columns for Products whose "
+        "identity is missing or was derived by an older normalization version."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Products loaded and updated per batch.",
+        )
+        parser.add_argument(
+            "--all",
+            action="store_true",
+            help="Recompute every Product, including rows already at the current identity version.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report how many Products would change without writing them.",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        queryset = Product.objects.order_by("pk").only("pk", "name", "dosage", "pack_size", *Product.IDENTITY_FIELDS)
+        if not options["all"]:
+            queryset = queryset.exclude(identity_version=PRODUCT_IDENTITY_VERSION)
+
+        scanned = 0
+        changed = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            scanned += len(batch)
+            updates = []
+            for product in batch:
+                columns = product_identity_columns(product)
+                if all(getattr(product, name) == value for name, value in columns.items()):
+                    continue
+                for name, value in columns.items():
+                    setattr(product, name, value)
+                updates.append(product)
+            changed += len(updates)
+            if updates and not options["dry_run"]:
+                Product.objects.bulk_update(updates, Product.IDENTITY_FIELDS)
+
+        if changed and not options["dry_run"]:
+            bump_catalog_generation()
+        action = "would update" if options["dry_run"] else "updated"
+        self.stdout.write(
+            f"Scanned {scanned} Product(s); {action} {changed} identity row(s) "
+            f"at identity version {PRODUCT_IDENTITY_VERSION}."
+        )
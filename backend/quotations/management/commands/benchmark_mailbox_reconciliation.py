@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quotations.mailbox_po_reconciliation import MAX_MATCH_PAGE_SIZE
+from quotations.mailbox_reconciliation_benchmark import (
+    DEFAULT_MAX_PAGE_SECONDS,
+    DEFAULT_MESSAGE_COUNT,
+    DEFAULT_PAGE_SIZE,
+    DEFAULT_QUOTATION_COUNT,
+    DEFAULT_SEED,
+    run_mailbox_reconciliation_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconcile a rolled-back synthetic mailbox audit and report page throughput, "
+        "messages/s, comparisons/s and peak RSS as JSON; fail when a page exceeds its budget."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--messages", type=int, default=DEFAULT_MESSAGE_COUNT, help="Synthetic PO messages.")
+        parser.add_argument(
+            "--quotations",
+            type=int,
+            default=DEFAULT_QUOTATION_COUNT,
+            help="Synthetic sent quotations.",
+        )
+        parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+        parser.add_argument("--page-size", type=int, default=DEFAULT_PAGE_SIZE)
+        parser.add_argument("--workers", type=int, default=0, help="Ranking processes; 0 or 1 ranks inline.")
+        parser.add_argument(
+            "--max-page-seconds",
+            type=float,
+            default=DEFAULT_MAX_PAGE_SECONDS,
+            help="Fail when any page takes longer (the web-worker timeout by default).",
+        )
+
+    def handle(self, *args, **options):
+        if options["messages"] < 1 or options["quotations"] < 1:
+            raise CommandError("--messages and --quotations must be at least 1.")
+        if not 1 <= options["page_size"] <= MAX_MATCH_PAGE_SIZE:
+            raise CommandError(f"--page-size must be between 1 and {MAX_MATCH_PAGE_SIZE}.")
+        if options["workers"] < 0:
+            raise CommandError("--workers must not be negative.")
+
+        report = run_mailbox_reconciliation_benchmark(
+            message_count=options["messages"],
+            quotation_count=options["quotations"],
+            seed=options["seed"],
+            page_size=options["page_size"],
+            workers=options["workers"],
+            max_page_seconds=options["max_page_seconds"],
+        )
+        self.stdout.write(json.dumps(report, sort_keys=True, indent=2))
+        if not report["passed"]:
+            raise CommandError("Mailbox reconciliation benchmark failed:\n" + "\n".join(report["violations"]))
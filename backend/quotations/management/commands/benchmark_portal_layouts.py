@@ -0,0 +1,27 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quotations.portal_layout_benchmark import DEFAULT_REPEATS, run_portal_layout_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark sequential against signature-dispatched mailbox PO portal parsing per "
+        "layout and fail when the two disagree on any corpus document."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help="Timed runs per document.")
+        parser.add_argument("--corpus", help="Optional portal layout corpus JSON file.")
+
+    def handle(self, *args, **options):
+        if options["repeats"] < 1:
+            raise CommandError("--repeats must be at least 1.")
+        try:
+            report = run_portal_layout_benchmark(repeats=options["repeats"], path=options.get("corpus"))
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(json.dumps(report, sort_keys=True, indent=2))
+        if not report["passed"]:
+            raise CommandError("Portal layout dispatch mismatch:\n" + "\n".join(report["mismatches"]))
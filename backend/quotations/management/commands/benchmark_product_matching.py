@@ -0,0 +1,62 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from quotations.matching_benchmark import (
+    DEFAULT_CATALOG_SIZES,
+    DEFAULT_LINE_COUNT,
+    DEFAULT_SEED,
+    load_budgets,
+    run_matching_benchmark,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark product matching against rolled-back synthetic catalogs and fail when "
+        "p95 latency or SQL queries per line exceed their budgets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            default=",".join(str(size) for size in DEFAULT_CATALOG_SIZES),
+            help="Comma-separated synthetic catalog sizes.",
+        )
+        parser.add_argument("--lines", type=int, default=DEFAULT_LINE_COUNT, help="Request lines per catalog.")
+        parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+        parser.add_argument("--budgets", help="Optional JSON file of per-operation budgets.")
+        parser.add_argument("--max-p95-ms", type=float, help="Override every operation's p95 budget.")
+        parser.add_argument(
+            "--max-queries-per-line",
+            type=float,
+            help="Override every operation's queries-per-line budget.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(value) for value in options["sizes"].split(",") if value.strip()]
+        except ValueError as exc:
+            raise CommandError("--sizes must be comma-separated integers.") from exc
+        if not sizes or any(size < 1 for size in sizes):
+            raise CommandError("--sizes must list at least one positive catalog size.")
+        if options["lines"] < 1:
+            raise CommandError("--lines must be at least 1.")
+        try:
+            budgets = load_budgets(
+                options.get("budgets"),
+                max_p95_ms=options.get("max_p95_ms"),
+                max_queries_per_line=options.get("max_queries_per_line"),
+            )
+        except (OSError, ValueError) as exc:
+            raise CommandError(str(exc)) from exc
+
+        report = run_matching_benchmark(
+            sizes,
+            line_count=options["lines"],
+            seed=options["seed"],
+            budgets=budgets,
+        )
+        self.stdout.write(json.dumps(report, sort_keys=True, indent=2))
+        if not report["passed"]:
+            raise CommandError("Product matching budget exceeded:\n" + "\n".join(report["violations"]))
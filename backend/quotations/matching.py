@@ -1,12 +1,24 @@
+import copy
+import hashlib
+import heapq
+import json
 import re
+import threading
 import unicodedata
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, replace
 from decimal import Decimal, InvalidOperation
 from difflib import SequenceMatcher
 
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramWordSimilar
+from django.contrib.postgres.search import TrigramWordSimilarity
 from django.core.exceptions import ValidationError
 from django.db import IntegrityError, connection, transaction
-from django.db.models import Q
+from django.db.models import Count, F, Max, Q, Value
+from django.db.models.functions import Greatest, Lower
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rapidfuzz import fuzz, process
 
 from api.models import Product
 
@@ -16,6 +28,13 @@ from .models import Company, CompanyPriceHistory, ProductAlias, normalize_label
 AUTO_MATCH_CONFIDENCE = 0.88
 FUZZY_CANDIDATE_THRESHOLD = 0.58
 MAX_MATCH_CANDIDATES = 6
+# Bump when normalization rules change so persisted Product identity columns
+# are recomputed by ``backfill_product_identity`` and ignored until then.
+PRODUCT_IDENTITY_VERSION = 2
+CATALOG_POOL_LIMIT = 300
+CATALOG_SUBSTRING_CACHE_SIZE = 4096
+BATCH_LOOKUP_CHUNK_SIZE = 400
+ALIAS_INDEX_CACHE_SIZE = 256
 GLOBAL_PRODUCT_ALIAS_ADVISORY_LOCK = 1_884_115_049
 
 _TOKEN_RE = re.compile(r"\d+(?:\.\d+)?|[a-z]+|%")
@@ -29,6 +48,9 @@ _COUNT_FORM_RE = re.compile(
     re.IGNORECASE,
 )
 _X_COUNT_RE = re.compile(r"(?<![a-z0-9])(?:pack|box|packet|pkt|strip)?\s*x\s*(\d+)(?![a-z0-9])", re.IGNORECASE)
+# Search tokens are built only from word characters and dots, so any
+# occurrence inside a Product name lies wholly within one of these runs.
+_SEARCH_WORD_RE = re.compile(r"[\w.]+")
 
 _TOKEN_ALIASES = {
     "ug": "mcg",
@@ -196,7 +218,7 @@ def item_identity(name, *, dosage="", pack_size="", unit=""):
     )
 
 
-def product_identity(product):
+def _parsed_product_identity(product):
     return item_identity(
         product.name,
         dosage=getattr(product, "dosage", "") or "",
@@ -204,6 +226,79 @@ def product_identity(product):
     )
 
 
+def _stored_product_identity(product):
+    return ItemIdentity(
+        normalized_text=normalize_item_text(
+            " ".join(part for part in [product.name, product.dosage, product.pack_size] if part)
+        ),
+        core_name=product.identity_core_name,
+        core_tokens=tuple(product.identity_core_name.split()),
+        strengths=tuple(product.identity_strengths.split()),
+        pack_counts=tuple(
+            (int(count), form)
+            for count, form in (item.split(":", 1) for item in product.identity_pack_counts.split())
+        ),
+        dosage_forms=tuple(product.identity_dosage_forms.split()),
+        pack_forms=tuple(product.identity_pack_forms.split()),
+    )
+
+
+def identity_source_key(product):
+    """Digest of the name/dosage/pack_size the identity columns derive from."""
+
+    source = "\x00".join(
+        str(getattr(product, field_name, "") or "") for field_name in ("name", "dosage", "pack_size")
+    )
+    return hashlib.sha256(source.encode("utf-8")).hexdigest()
+
+
+def stored_identity_is_current(product):
+    """Whether the persisted identity columns still describe ``product``.
+
+    In-memory edits and queryset ``update()`` calls change the source fields
+    without recomputing the columns; the stored source digest catches both.
+    """
+
+    return getattr(product, "identity_version", None) == PRODUCT_IDENTITY_VERSION and getattr(
+        product, "identity_source_key", None
+    ) == identity_source_key(product)
+
+
+def product_identity(product):
+    """Return a Product's identity, preferring its persisted identity columns."""
+
+    if stored_identity_is_current(product):
+        return _stored_product_identity(product)
+    return _parsed_product_identity(product)
+
+
+def identity_fingerprint_key(identity):
+    encoded = json.dumps(identity.fingerprint, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+def product_identity_columns(product):
+    """Compute the persisted identity columns for ``Product.save()`` and backfills."""
+
+    identity = _parsed_product_identity(product)
+    columns = {
+        "identity_core_name": identity.core_name,
+        "identity_fingerprint": identity_fingerprint_key(identity),
+        "identity_strengths": " ".join(identity.strengths),
+        "identity_pack_counts": " ".join(f"{count}:{form}" for count, form in identity.pack_counts),
+        "identity_dosage_forms": " ".join(identity.dosage_forms),
+        "identity_pack_forms": " ".join(identity.pack_forms),
+        "identity_source_key": identity_source_key(product),
+        "identity_version": PRODUCT_IDENTITY_VERSION,
+    }
+    for name, value in columns.items():
+        max_length = getattr(Product._meta.get_field(name), "max_length", None)
+        if max_length and len(value) > max_length:
+            # An identity that does not fit is left unstored and parsed on use.
+            return {**{key: "" for key in columns if key != "identity_version"}, "identity_version": 0}
+    return columns
+
+
 def identities_compatible(requested, candidate):
     if requested.strengths and candidate.strengths and requested.strengths != candidate.strengths:
         return False
@@ -308,16 +403,367 @@ class ProductCreationResult:
 
 @dataclass(frozen=True)
 class CompanyHistoryMatchContext:
-    """Request-scoped snapshot of the existing company-history match window."""
+    """Request-scoped snapshot of the existing company-history match window.
+
+    Each distinct non-archived Product is indexed once, at its most recent
+    position in the window, by lower-cased SKU, barcode and core name. The
+    earliest position wins, exactly as in a newest-first scan of ``entries``.
+    """
 
     company_id: int | None
     entries: tuple[CompanyPriceHistory, ...] = ()
+    by_identifier: dict = field(default_factory=dict, compare=False, repr=False)
+    by_core_name: dict = field(default_factory=dict, compare=False, repr=False)
+
+    @classmethod
+    def from_entries(cls, company_id, entries):
+        entries = tuple(entries)
+        by_identifier = {}
+        by_core_name = {}
+        seen = set()
+        for history in entries:
+            product = history.product
+            if not product or product.id in seen or product.status == "archived":
+                continue
+            position = len(seen)
+            seen.add(product.id)
+            for identifier in {(product.sku or "").strip().lower(), (product.barcode or "").strip().lower()} - {""}:
+                by_identifier.setdefault(identifier, (position, product))
+            identity = product_identity(product)
+            if identity.core_name:
+                by_core_name.setdefault(identity.core_name, []).append((position, product, identity))
+        return cls(
+            company_id=company_id,
+            entries=entries,
+            by_identifier=by_identifier,
+            by_core_name=by_core_name,
+        )
+
+    def match(self, requested, identifiers):
+        hits = [self.by_identifier[identifier] for identifier in identifiers if identifier in self.by_identifier]
+        if requested.core_name:
+            hits.extend(
+                next(
+                    (
+                        [(position, product)]
+                        for position, product, identity in self.by_core_name.get(requested.core_name, ())
+                        if identities_compatible(requested, identity)
+                    ),
+                    [],
+                )
+            )
+        return min(hits, key=lambda hit: hit[0])[1] if hits else None
 
 
 def product_catalog_queryset():
     return Product.objects.exclude(status="archived").select_related("brand", "category")
 
 
+@dataclass(frozen=True)
+class CatalogIndexEntry:
+    product: Product
+    identity: ItemIdentity
+    rank: int
+
+
+class CatalogIndex:
+    """Process-local snapshot of the matchable catalog and its identities.
+
+    ``rank`` preserves the ``name, id`` database ordering that bounded the
+    former ``icontains`` pool. Name fragments resolve through the distinct
+    search words rather than every Product row, so a substring lookup costs
+    one pass over the vocabulary and is then memoized for the snapshot. The
+    snapshot's Product instances are shared across requests and are swapped
+    for fresh rows by ``_refetch_catalog_products`` before a match is returned.
+    """
+
+    def __init__(self, stamp, products):
+        self.stamp = stamp
+        self._entries = {}
+        self._by_name = {}
+        self._unstored_by_core_name = {}
+        self._word_postings = {}
+        self._substring_cache = {}
+        for rank, product in enumerate(products):
+            entry = CatalogIndexEntry(product=product, identity=product_identity(product), rank=rank)
+            self._entries[product.id] = entry
+            self._by_name.setdefault(product.name.lower(), []).append(product.id)
+            # Stored identities are found by the indexed core-name column;
+            # only rows the column cannot answer for are kept here.
+            if entry.identity.core_name and not stored_identity_is_current(product):
+                self._unstored_by_core_name.setdefault(entry.identity.core_name, []).append(product.id)
+            searchable = f"{product.name} {product.active_ingredient or ''}".lower()
+            for word in set(_SEARCH_WORD_RE.findall(searchable)):
+                self._word_postings.setdefault(word, []).append(product.id)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def identity(self, product):
+        entry = self._entries.get(product.id)
+        return entry.identity if entry else product_identity(product)
+
+    def entry(self, product):
+        """The snapshot entry for ``product``, or a fresh one if it is newer."""
+
+        entry = self._entries.get(product.id)
+        if entry is None:
+            entry = CatalogIndexEntry(product=product, identity=product_identity(product), rank=len(self._entries))
+        return entry
+
+    def _containing(self, fragment):
+        cached = self._substring_cache.get(fragment)
+        if cached is not None:
+            return cached
+        product_ids = set()
+        for word, word_product_ids in self._word_postings.items():
+            if fragment in word:
+                product_ids.update(word_product_ids)
+        if len(self._substring_cache) >= CATALOG_SUBSTRING_CACHE_SIZE:
+            self._substring_cache.clear()
+        self._substring_cache[fragment] = product_ids
+        return product_ids
+
+    def pool(self, requested, raw_text, limit=CATALOG_POOL_LIMIT):
+        raw_text = str(raw_text or "").strip()
+        significant = [token for token in requested.core_tokens if len(token) >= 3][:4]
+        if not significant and not raw_text:
+            return []
+        product_ids = set(self._by_name.get(raw_text.lower(), ()))
+        for token in significant:
+            # A name containing the token also contains its four-letter prefix.
+            product_ids.update(self._containing(token[:4]))
+        entries = [self._entries[product_id] for product_id in product_ids]
+        return heapq.nsmallest(limit, entries, key=lambda entry: entry.rank)
+
+    def ranked_pool(self, raw_text, product_ids, limit=CATALOG_POOL_LIMIT):
+        """Exact-name entries followed by ``product_ids`` in their given order."""
+
+        raw_text = str(raw_text or "").strip()
+        ordered = [*self._by_name.get(raw_text.lower(), ()), *product_ids]
+        entries = [self._entries[product_id] for product_id in dict.fromkeys(ordered) if product_id in self._entries]
+        return entries[:limit]
+
+    def product(self, product_id):
+        entry = self._entries.get(product_id)
+        return entry.product if entry else None
+
+    def shares(self, product):
+        """Whether ``product`` is this snapshot's own, process-shared instance."""
+
+        entry = self._entries.get(product.id)
+        return entry is not None and entry.product is product
+
+    def unstored_core_name(self, core_name):
+        """Entries with this parsed core name whose identity columns are not current."""
+
+        return [self._entries[product_id] for product_id in self._unstored_by_core_name.get(core_name, ())]
+
+
+_catalog_generation = 0
+_catalog_index = None
+_catalog_index_lock = threading.Lock()
+
+
+def bump_catalog_generation():
+    """Invalidate this process's catalog index after a Product write."""
+
+    global _catalog_generation
+    with _catalog_index_lock:
+        _catalog_generation += 1
+
+
+@receiver(post_save, sender=Product, dispatch_uid="quotations_catalog_generation_save")
+@receiver(post_delete, sender=Product, dispatch_uid="quotations_catalog_generation_delete")
+def _bump_catalog_generation_on_product_write(sender, **kwargs):
+    bump_catalog_generation()
+
+
+def _catalog_watermark():
+    # Writes from other worker processes, bulk updates and rolled-back
+    # transactions never reach this process's generation counter.
+    summary = Product.objects.order_by().aggregate(
+        rows=Count("id"),
+        archived=Count("id", filter=Q(status="archived")),
+        last_id=Max("id"),
+        last_updated=Max("updated_at"),
+    )
+    return (summary["rows"], summary["archived"], summary["last_id"], summary["last_updated"])
+
+
+def current_catalog_index():
+    """Return the catalog index, rebuilding it when its version stamp is stale."""
+
+    global _catalog_index
+    stamp = (_catalog_generation, _catalog_watermark())
+    index = _catalog_index
+    if index is not None and index.stamp == stamp:
+        return index
+    index = CatalogIndex(stamp, product_catalog_queryset().order_by("name", "id"))
+    with _catalog_index_lock:
+        if _catalog_generation == stamp[0]:
+            _catalog_index = index
+    return index
+
+
+class AliasIndex:
+    """Process-local snapshot of one alias scope's active ProductAlias rows.
+
+    Rows are keyed by ``normalized_alias`` and by their domain-normalized
+    wording, both in id order, and carry only ``product_id``. Products are
+    resolved through the catalog index at lookup time, so archiving a Product
+    hides its aliases without invalidating this snapshot.
+    """
+
+    def __init__(self, stamp, aliases):
+        self.stamp = stamp
+        self._exact = {}
+        self._equivalent = {}
+        for alias in aliases:
+            self._exact.setdefault(alias.normalized_alias, []).append(alias)
+            self._equivalent.setdefault(normalize_item_text(alias.alias), []).append(alias)
+
+    def aliases_for_text(self, raw_text, catalog):
+        """Mirror the read-only ``_aliases_for_text`` lookup for this scope."""
+
+        simple = normalize_label(raw_text)
+        domain = normalize_item_text(raw_text)
+        raw_variants = _alias_first_term_variants(domain)
+        matches = []
+        seen = set()
+
+        def resolve(alias):
+            product = catalog.product(alias.product_id)
+            if product is None:
+                return None
+            resolved = copy.copy(alias)
+            resolved.product = product
+            return resolved
+
+        for alias in self._exact.get(simple, [])[:10]:
+            resolved = resolve(alias)
+            if resolved:
+                matches.append(resolved)
+                seen.add(alias.id)
+        for alias in self._equivalent.get(domain, ()):
+            if alias.id in seen:
+                continue
+            if raw_variants and not any(variant in alias.alias.lower() for variant in raw_variants):
+                continue
+            resolved = resolve(alias)
+            if resolved:
+                matches.append(resolved)
+                seen.add(alias.id)
+        return matches
+
+
+_alias_generation = 0
+_alias_indexes = {}
+_alias_index_lock = threading.Lock()
+
+
+def bump_alias_generation():
+    """Invalidate this process's alias indexes after a ProductAlias write."""
+
+    global _alias_generation
+    with _alias_index_lock:
+        _alias_generation += 1
+
+
+@receiver(post_delete, sender=ProductAlias, dispatch_uid="quotations_alias_generation_delete")
+def _bump_alias_generation_on_alias_delete(sender, **kwargs):
+    bump_alias_generation()
+
+
+def _alias_watermarks(scopes):
+    """Return each scope's row-count/last-id/last-write watermark in one query."""
+
+    aggregates = {}
+    for position, scope in enumerate(scopes):
+        scope_filter = Q(company__isnull=True) if scope is None else Q(company_id=scope)
+        aggregates[f"rows_{position}"] = Count("id", filter=scope_filter)
+        aggregates[f"last_id_{position}"] = Max("id", filter=scope_filter)
+        aggregates[f"last_updated_{position}"] = Max("updated_at", filter=scope_filter)
+    summary = ProductAlias.objects.order_by().aggregate(**aggregates)
+    return {
+        scope: (
+            summary[f"rows_{position}"],
+            summary[f"last_id_{position}"],
+            summary[f"last_updated_{position}"],
+        )
+        for position, scope in enumerate(scopes)
+    }
+
+
+def current_alias_indexes(*companies):
+    """Return ``{company_id or None: AliasIndex}``, rebuilding stale scopes."""
+
+    scopes = list(dict.fromkeys(getattr(company, "pk", None) for company in companies))
+    generation = _alias_generation
+    watermarks = _alias_watermarks(scopes)
+    indexes = {}
+    for scope in scopes:
+        stamp = (generation, watermarks[scope])
+        index = _alias_indexes.get(scope)
+        if index is None or index.stamp != stamp:
+            index = AliasIndex(
+                stamp,
+                ProductAlias.objects.filter(company_id=scope, is_active=True)
+                .only("id", "company_id", "product_id", "alias", "normalized_alias")
+                .order_by("id"),
+            )
+            with _alias_index_lock:
+                if _alias_generation == generation:
+                    if scope not in _alias_indexes and len(_alias_indexes) >= ALIAS_INDEX_CACHE_SIZE:
+                        _alias_indexes.pop(next(iter(_alias_indexes)))
+                    _alias_indexes[scope] = index
+        indexes[scope] = index
+    return indexes
+
+
+_trigram_extension_installed = None
+
+
+def trigram_search_enabled():
+    """Whether catalog retrieval may use the optional pg_trgm GIN indexes."""
+
+    global _trigram_extension_installed
+    if connection.vendor != "postgresql" or not getattr(settings, "QUOTATION_PRODUCT_TRIGRAM_SEARCH_ENABLED", False):
+        return False
+    if _trigram_extension_installed is None:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram_extension_installed = cursor.fetchone() is not None
+    return _trigram_extension_installed
+
+
+def _trigram_catalog_ids(requested, raw_text, limit=CATALOG_POOL_LIMIT):
+    """Most word-similar catalog Product ids, served by the pg_trgm GIN indexes."""
+
+    search_text = requested.core_name or str(raw_text or "").strip().lower()
+    if not search_text:
+        return []
+    text = Value(search_text)
+    return list(
+        product_catalog_queryset()
+        .filter(TrigramWordSimilar(F("name"), text) | TrigramWordSimilar(F("active_ingredient"), text))
+        .annotate(
+            similarity=Greatest(
+                TrigramWordSimilarity(search_text, "name"),
+                TrigramWordSimilarity(search_text, "active_ingredient"),
+            )
+        )
+        .order_by("-similarity", "name", "id")
+        .values_list("id", flat=True)[:limit]
+    )
+
+
+def _catalog_pool_entries(catalog, requested, raw_text):
+    if trigram_search_enabled():
+        return catalog.ranked_pool(raw_text, _trigram_catalog_ids(requested, raw_text))
+    return catalog.pool(requested, raw_text)
+
+
 def _candidate(product, score, method, reason):
     return ProductCandidate(product=product, score=score, method=method, reason=reason)
 
@@ -414,6 +860,7 @@ def _assert_managed_alias_available(*, alias_text, product, company, exclude_ali
 def create_managed_product_alias(*, company, product, alias_text, notes="", is_active=True, actor=None):
     """Create an explicitly managed alias after an under-lock equivalence check."""
     _lock_product_alias_scopes(company)
+    transaction.on_commit(bump_alias_generation)
     cleaned_alias = _assert_managed_alias_available(
         alias_text=alias_text,
         product=product,
@@ -436,6 +883,7 @@ def update_managed_product_alias(*, alias_id, changes):
     snapshot = ProductAlias.objects.select_related("company", "product").get(pk=alias_id)
     requested_company = changes.get("company", snapshot.company)
     _lock_product_alias_scopes(snapshot.company, requested_company)
+    transaction.on_commit(bump_alias_generation)
     alias = (
         ProductAlias.objects.select_for_update()
         .select_related("company", "product")
@@ -480,8 +928,7 @@ def update_managed_product_alias(*, alias_id, changes):
     return alias
 
 
-def _alias_match(raw_text, company, scope_label):
-    aliases = _aliases_for_text(raw_text, company)
+def _alias_match(aliases, company, scope_label):
     if not aliases:
         return None
     products = {}
@@ -526,10 +973,7 @@ def preload_company_history_match_context(company):
 
     if not company:
         return CompanyHistoryMatchContext(company_id=None)
-    return CompanyHistoryMatchContext(
-        company_id=company.pk,
-        entries=tuple(_company_history_queryset(company)),
-    )
+    return CompanyHistoryMatchContext.from_entries(company.pk, _company_history_queryset(company))
 
 
 def _company_history_product_match(
@@ -544,21 +988,16 @@ def _company_history_product_match(
     if not company:
         return None
     identifiers = {str(value).strip().lower() for value in [raw_text, sku, barcode] if str(value or "").strip()}
+    if isinstance(history_context, CompanyHistoryMatchContext) and history_context.company_id == company.pk:
+        return history_context.match(requested, identifiers)
+    # A single line stops at the first hit instead of indexing the window.
     seen = set()
-    history_entries = (
-        history_context.entries
-        if (
-            isinstance(history_context, CompanyHistoryMatchContext)
-            and history_context.company_id == company.pk
-        )
-        else _company_history_queryset(company)
-    )
-    for history in history_entries:
+    for history in _company_history_queryset(company).iterator(chunk_size=100):
         product = history.product
         if not product or product.id in seen or product.status == "archived":
             continue
         seen.add(product.id)
-        if identifiers.intersection({(product.sku or "").strip().lower(), (product.barcode or "").strip().lower()}) - {""}:
+        if identifiers & {(product.sku or "").strip().lower(), (product.barcode or "").strip().lower()}:
             return product
         identity = product_identity(product)
         if requested.core_name and requested.core_name == identity.core_name and identities_compatible(requested, identity):
@@ -566,12 +1005,17 @@ def _company_history_product_match(
     return None
 
 
-def _identifier_match(raw_text, *, sku="", barcode=""):
+def _identifier_values(raw_text, *, sku="", barcode=""):
     values = []
     for value in [barcode, sku, raw_text]:
         cleaned = str(value or "").strip()
         if cleaned and cleaned.lower() not in {item.lower() for item in values}:
             values.append(cleaned)
+    return values
+
+
+def _identifier_match(raw_text, *, sku="", barcode=""):
+    values = _identifier_values(raw_text, sku=sku, barcode=barcode)
     if not values:
         return [], ""
     query = Q()
@@ -582,30 +1026,20 @@ def _identifier_match(raw_text, *, sku="", barcode=""):
     return products, method
 
 
-def _catalog_pool(requested, raw_text):
-    query = Q(name__iexact=str(raw_text or "").strip())
-    significant = [token for token in requested.core_tokens if len(token) >= 3][:4]
-    for token in significant:
-        prefix = token[:4]
-        query |= (
-            Q(name__icontains=token)
-            | Q(active_ingredient__icontains=token)
-            | Q(name__icontains=prefix)
-            | Q(active_ingredient__icontains=prefix)
-        )
-    if not significant and not str(raw_text or "").strip():
-        return []
-    return list(product_catalog_queryset().filter(query).distinct().order_by("name", "id")[:300])
+def _catalog_pool(requested, raw_text, catalog=None):
+    catalog = catalog or current_catalog_index()
+    return [entry.product for entry in _catalog_pool_entries(catalog, requested, raw_text)]
 
 
-def _fuzzy_score(requested, candidate):
+def _fuzzy_score(requested, candidate, sequence_score=None):
     if not requested.core_name or not candidate.core_name:
         return 0.0
     requested_tokens = set(requested.core_tokens)
     candidate_tokens = set(candidate.core_tokens)
     union = requested_tokens | candidate_tokens
     token_score = len(requested_tokens & candidate_tokens) / len(union) if union else 0.0
-    sequence_score = SequenceMatcher(None, requested.core_name, candidate.core_name).ratio()
+    if sequence_score is None:
+        sequence_score = SequenceMatcher(None, requested.core_name, candidate.core_name).ratio()
     score = (sequence_score * 0.62) + (token_score * 0.38)
     if requested.core_name in candidate.core_name or candidate.core_name in requested.core_name:
         score = max(score, 0.76 if min(len(requested.core_name), len(candidate.core_name)) >= 5 else score)
@@ -616,21 +1050,96 @@ def _fuzzy_score(requested, candidate):
     return min(score, 0.89)
 
 
-def _rank_catalog_candidates(raw_text, requested, limit=MAX_MATCH_CANDIDATES):
-    exact = []
-    fuzzy = []
-    for product in _catalog_pool(requested, raw_text):
-        identity = product_identity(product)
-        if not identities_compatible(requested, identity):
-            continue
-        if requested.core_name and requested.core_name == identity.core_name:
-            exact.append(_candidate(product, 0.92, "canonical_name", "Matched canonical product identity."))
+def _fuzzy_scores(requested, candidates, threshold=FUZZY_CANDIDATE_THRESHOLD):
+    """Return ``_fuzzy_score`` for each candidate identity, or 0.0 below ``threshold``.
+
+    RapidFuzz's Indel ratio is a longest-common-subsequence ratio, so it never
+    falls below difflib's matching-block ratio. One batched RapidFuzz pass
+    bounds every score, and ``SequenceMatcher`` only runs for candidates whose
+    bound can still reach the threshold, keeping scores and ties unchanged.
+    """
+
+    scores = [0.0] * len(candidates)
+    if not requested.core_name or not candidates:
+        return scores
+    bounds = process.extract(
+        requested.core_name,
+        [candidate.core_name for candidate in candidates],
+        scorer=fuzz.ratio,
+        processor=None,
+        limit=None,
+    )
+    for _choice, bound, index in bounds:
+        candidate = candidates[index]
+        # The epsilon absorbs float rounding between the two ratio formulas.
+        if _fuzzy_score(requested, candidate, sequence_score=min(1.0, bound / 100 + 1e-9)) < threshold:
             continue
-        score = _fuzzy_score(requested, identity)
+        score = _fuzzy_score(requested, candidate)
+        if score >= threshold:
+            scores[index] = score
+    return scores
+
+
+def _canonical_products(core_names):
+    """Products whose stored core name is one of ``core_names``, by core name.
+
+    Each chunk is one indexed ``identity_core_name`` equality/IN lookup.
+    """
+
+    products = {}
+    for chunk in _chunks(sorted({core_name for core_name in core_names if core_name})):
+        queryset = product_catalog_queryset().filter(identity_version=PRODUCT_IDENTITY_VERSION).order_by("id")
+        if len(chunk) == 1:
+            queryset = queryset.filter(identity_core_name=chunk[0])
+        else:
+            queryset = queryset.filter(identity_core_name__in=chunk)
+        for product in queryset:
+            products.setdefault(product.identity_core_name, []).append(product)
+    return products
+
+
+def _exact_canonical_entries(catalog, requested, products):
+    """Catalog entries sharing ``requested``'s core name.
+
+    ``products`` come from the indexed column; rows it cannot answer for
+    (never backfilled, or edited without ``save()``) come from the catalog.
+    """
+
+    if not requested.core_name:
+        return []
+    entries = {}
+    for product in products:
+        entry = catalog.entry(product)
+        if entry.identity.core_name == requested.core_name:
+            entries[product.id] = entry
+    for entry in catalog.unstored_core_name(requested.core_name):
+        entries.setdefault(entry.product.id, entry)
+    return list(entries.values())
+
+
+def _rank_catalog_candidates(raw_text, requested, limit=MAX_MATCH_CANDIDATES, catalog=None, exact_entries=None):
+    catalog = catalog or current_catalog_index()
+    if exact_entries is None:
+        canonical = _canonical_products([requested.core_name]).get(requested.core_name, [])
+        exact_entries = _exact_canonical_entries(catalog, requested, canonical)
+    exact = [
+        _candidate(entry.product, 0.92, "canonical_name", "Matched canonical product identity.")
+        for entry in exact_entries
+        if identities_compatible(requested, entry.identity)
+    ]
+    fuzzy = []
+    fuzzy_entries = [
+        entry
+        for entry in _catalog_pool_entries(catalog, requested, raw_text)
+        if not (requested.core_name and requested.core_name == entry.identity.core_name)
+        and identities_compatible(requested, entry.identity)
+    ]
+    scores = _fuzzy_scores(requested, [entry.identity for entry in fuzzy_entries])
+    for entry, score in zip(fuzzy_entries, scores):
         if score >= FUZZY_CANDIDATE_THRESHOLD:
             fuzzy.append(
                 _candidate(
-                    product,
+                    entry.product,
                     score,
                     "fuzzy_name",
                     "Similar product name with compatible strength, dosage form, and pack details.",
@@ -641,19 +1150,21 @@ def _rank_catalog_candidates(raw_text, requested, limit=MAX_MATCH_CANDIDATES):
     return exact[:limit], fuzzy[:limit]
 
 
-def _select_canonical_match(exact_candidates, requested):
+def _select_canonical_match(exact_candidates, requested, catalog=None):
     if not exact_candidates:
         return None
     if len(exact_candidates) == 1:
         return exact_candidates[0]
+    identity_of = catalog.identity if catalog else product_identity
+    identities = {candidate.product.id: identity_of(candidate.product) for candidate in exact_candidates}
     exact_fingerprint_matches = [
         candidate
         for candidate in exact_candidates
-        if product_identity(candidate.product).fingerprint == requested.fingerprint
+        if identities[candidate.product.id].fingerprint == requested.fingerprint
     ]
     if exact_fingerprint_matches:
         return min(exact_fingerprint_matches, key=lambda candidate: candidate.product.id)
-    fingerprints = {product_identity(candidate.product).fingerprint for candidate in exact_candidates}
+    fingerprints = {identity.fingerprint for identity in identities.values()}
     if len(fingerprints) == 1:
         return min(exact_candidates, key=lambda candidate: candidate.product.id)
     fully_specified = bool(requested.strengths or requested.pack_counts or requested.dosage_forms or requested.pack_forms)
@@ -663,10 +1174,10 @@ def _select_canonical_match(exact_candidates, requested):
             for candidate in exact_candidates
             if all(
                 [
-                    not requested.strengths or requested.strengths == product_identity(candidate.product).strengths,
-                    not requested.pack_counts or requested.pack_counts == product_identity(candidate.product).pack_counts,
-                    not requested.dosage_forms or bool(set(requested.dosage_forms) & set(product_identity(candidate.product).dosage_forms)),
-                    not requested.pack_forms or bool(set(requested.pack_forms) & set(product_identity(candidate.product).pack_forms)),
+                    not requested.strengths or requested.strengths == identities[candidate.product.id].strengths,
+                    not requested.pack_counts or requested.pack_counts == identities[candidate.product.id].pack_counts,
+                    not requested.dosage_forms or bool(set(requested.dosage_forms) & set(identities[candidate.product.id].dosage_forms)),
+                    not requested.pack_forms or bool(set(requested.pack_forms) & set(identities[candidate.product.id].pack_forms)),
                 ]
             )
         ]
@@ -675,6 +1186,97 @@ def _select_canonical_match(exact_candidates, requested):
     return None
 
 
+class _LiveMatchLookups:
+    """Per-line database lookups behind ``suggest_product_for_text``."""
+
+    def __init__(self, history_context=None):
+        self.history_context = history_context
+        self._catalog = None
+        self._alias_indexes = {}
+
+    @property
+    def catalog(self):
+        if self._catalog is None:
+            self._catalog = current_catalog_index()
+        return self._catalog
+
+    def aliases(self, raw_text, company):
+        scope = getattr(company, "pk", None)
+        if scope not in self._alias_indexes:
+            # The company lookup is always followed by the global one, so
+            # both scopes share one watermark query.
+            self._alias_indexes.update(current_alias_indexes(company, None))
+        return self._alias_indexes[scope].aliases_for_text(raw_text, self.catalog)
+
+    def identifier_products(self, raw_text, *, sku="", barcode=""):
+        return _identifier_match(raw_text, sku=sku, barcode=barcode)[0]
+
+    def canonical_entries(self, requested):
+        products = _canonical_products([requested.core_name]).get(requested.core_name, []) if requested.core_name else []
+        return _exact_canonical_entries(self.catalog, requested, products)
+
+
+class _BatchMatchLookups(_LiveMatchLookups):
+    """Preloaded identifier and canonical-name lookups shared by one batch of lines.
+
+    Aliases already resolve from the cached alias indexes. Identifiers keep the
+    twenty-row, id-ordered window of ``_identifier_match``.
+    """
+
+    def __init__(self, requests, company, history_context=None):
+        super().__init__(history_context)
+        self._identifier_products = {}
+        self._preload_identifiers(requests)
+        self._canonical_products = _canonical_products(request["identity"].core_name for request in requests)
+
+    def _preload_identifiers(self, requests):
+        keys = set()
+        for request in requests:
+            keys.update(
+                value.lower()
+                for value in _identifier_values(
+                    request["raw_text"],
+                    sku=request["sku"],
+                    barcode=request["barcode"],
+                )
+            )
+        for chunk in _chunks(sorted(keys)):
+            chunk_keys = set(chunk)
+            products = (
+                product_catalog_queryset()
+                .annotate(sku_key=Lower("sku"), barcode_key=Lower("barcode"))
+                .filter(Q(sku_key__in=chunk) | Q(barcode_key__in=chunk))
+                .order_by("id")
+            )
+            for product in products:
+                for key in {(product.sku or "").lower(), (product.barcode or "").lower()} & chunk_keys:
+                    self._identifier_products.setdefault(key, {})[product.id] = product
+
+    def identifier_products(self, raw_text, *, sku="", barcode=""):
+        products = {}
+        for value in _identifier_values(raw_text, sku=sku, barcode=barcode):
+            products.update(self._identifier_products.get(value.lower(), {}))
+        return [products[product_id] for product_id in sorted(products)][:20]
+
+    def canonical_entries(self, requested):
+        return _exact_canonical_entries(self.catalog, requested, self._canonical_products.get(requested.core_name, []))
+
+
+def _alias_first_term_variants(domain):
+    first_term = domain.split()[0] if domain.split() else ""
+    if not first_term:
+        return set()
+    return {
+        first_term,
+        *(raw_token for raw_token, normalized_token in _TOKEN_ALIASES.items() if normalized_token == first_term),
+    }
+
+
+def _chunks(values, size=BATCH_LOOKUP_CHUNK_SIZE):
+    values = list(values)
+    return [values[index:index + size] for index in range(0, len(values), size)]
+
+
 def suggest_product_for_text(
     raw_text,
     company=None,
@@ -691,13 +1293,95 @@ def suggest_product_for_text(
     # company_only is retained as a compatibility keyword, but deliberately no
     # longer short-circuits global aliases and the master catalog.
     del company_only
+    lookups = _LiveMatchLookups(history_context)
+    match = _suggest_product(
+        _match_request(raw_text, sku=sku, barcode=barcode, dosage=dosage, pack_size=pack_size, unit=unit),
+        company,
+        lookups=lookups,
+        limit=limit,
+    )
+    return _refetch_catalog_products([match], lookups._catalog)[0]
+
+
+def suggest_products_for_lines(lines, company=None, *, history_context=None, limit=MAX_MATCH_CANDIDATES):
+    """Match many lines for one company with set-based alias and identifier lookups.
+
+    ``lines`` holds mappings with ``raw_text`` and the optional ``sku``,
+    ``barcode``, ``dosage``, ``pack_size`` and ``unit`` keywords accepted by
+    ``suggest_product_for_text``. The returned matches are in line order and
+    identical to matching each line on its own.
+    """
+
+    requests = [_match_request(**line) for line in lines]
+    if not requests:
+        return []
+    if company and not isinstance(history_context, CompanyHistoryMatchContext):
+        history_context = preload_company_history_match_context(company)
+    lookups = _BatchMatchLookups(requests, company, history_context)
+    matches = [_suggest_product(request, company, lookups=lookups, limit=limit) for request in requests]
+    return _refetch_catalog_products(matches, lookups._catalog)
+
+
+def _refetch_catalog_products(matches, catalog):
+    """Swap the catalog index's shared Products in ``matches`` for fresh rows.
+
+    The index snapshot is shared by every request in the process, and its
+    watermark cannot see writes that skip ``updated_at`` (stock saves, bulk
+    brand/category merges, Brand renames), so its instances never leave this
+    module. One query reloads every shared Product the matches reference; a
+    Product archived or deleted since the snapshot is dropped.
+    """
+
+    if catalog is None:
+        return matches
+    shared_ids = {
+        product.id
+        for match in matches
+        for product in [match.product, *(candidate.product for candidate in match.candidates)]
+        if product is not None and catalog.shares(product)
+    }
+    if not shared_ids:
+        return matches
+    fresh = product_catalog_queryset().in_bulk(shared_ids)
+
+    def current(product):
+        return fresh.get(product.id) if catalog.shares(product) else product
+
+    refetched = []
+    for match in matches:
+        candidates = [
+            replace(candidate, product=current(candidate.product))
+            for candidate in match.candidates
+            if current(candidate.product) is not None
+        ]
+        if match.product is not None and current(match.product) is None:
+            refetched.append(ProductMatch(None, 0.0, "unmatched", "No compatible Product candidate found.", candidates))
+            continue
+        product = current(match.product) if match.product is not None else None
+        refetched.append(replace(match, product=product, candidates=candidates))
+    return refetched
+
+
+def _match_request(raw_text, *, sku="", barcode="", dosage="", pack_size="", unit=""):
     raw_text = str(raw_text or "").strip()
-    requested = item_identity(raw_text, dosage=dosage, pack_size=pack_size, unit=unit)
+    return {
+        "raw_text": raw_text,
+        "sku": sku,
+        "barcode": barcode,
+        "identity": item_identity(raw_text, dosage=dosage, pack_size=pack_size, unit=unit),
+    }
+
+
+def _suggest_product(request, company, *, lookups, limit):
+    raw_text = request["raw_text"]
+    sku = request["sku"]
+    barcode = request["barcode"]
+    requested = request["identity"]
     if not requested.normalized_text and not str(sku or "").strip() and not str(barcode or "").strip():
         return ProductMatch(None, 0.0, "empty", "No item text or identifier to match.")
 
     if company:
-        alias_match = _alias_match(raw_text, company, "company")
+        alias_match = _alias_match(lookups.aliases(raw_text, company), company, "company")
         if alias_match:
             return alias_match
 
@@ -707,19 +1391,20 @@ def suggest_product_for_text(
             company,
             sku=sku,
             barcode=barcode,
-            history_context=history_context,
+            history_context=lookups.history_context,
         )
         if history_product:
             reason = f"Matched Product previously quoted to {company.name}."
             candidate = _candidate(history_product, 0.96, "company_price_history", reason)
             return ProductMatch(history_product, candidate.score, candidate.method, reason, [candidate])
 
-    alias_match = _alias_match(raw_text, None, "global")
+    alias_match = _alias_match(lookups.aliases(raw_text, None), None, "global")
     if alias_match:
         return alias_match
 
-    identifier_products, identifier_method = _identifier_match(raw_text, sku=sku, barcode=barcode)
+    identifier_products = lookups.identifier_products(raw_text, sku=sku, barcode=barcode)
     if identifier_products:
+        identifier_method = "exact_sku_or_barcode"
         candidates = [
             _candidate(product, 0.99, identifier_method, "Matched exact SKU or barcode.")
             for product in identifier_products[:limit]
@@ -735,8 +1420,15 @@ def suggest_product_for_text(
             True,
         )
 
-    exact_candidates, fuzzy_candidates = _rank_catalog_candidates(raw_text, requested, limit=limit)
-    selected = _select_canonical_match(exact_candidates, requested)
+    catalog = lookups.catalog
+    exact_candidates, fuzzy_candidates = _rank_catalog_candidates(
+        raw_text,
+        requested,
+        limit=limit,
+        catalog=catalog,
+        exact_entries=lookups.canonical_entries(requested),
+    )
+    selected = _select_canonical_match(exact_candidates, requested, catalog)
     if selected:
         return ProductMatch(
             selected.product,
@@ -767,17 +1459,18 @@ def suggest_product_for_text(
     return ProductMatch(None, 0.0, "unmatched", "No compatible Product candidate found.")
 
 
-def apply_match_to_preview_line(line, company=None, *, history_context=None):
-    match = suggest_product_for_text(
-        line.get("raw_name") or line.get("item_name") or line.get("raw_line") or "",
-        company,
-        sku=line.get("sku") or "",
-        barcode=line.get("barcode") or "",
-        dosage=line.get("dosage") or line.get("strength") or "",
-        pack_size=line.get("pack_size") or line.get("pack_info") or "",
-        unit=line.get("unit") or "",
-        history_context=history_context,
-    )
+def _preview_match_request(line):
+    return {
+        "raw_text": line.get("raw_name") or line.get("item_name") or line.get("raw_line") or "",
+        "sku": line.get("sku") or "",
+        "barcode": line.get("barcode") or "",
+        "dosage": line.get("dosage") or line.get("strength") or "",
+        "pack_size": line.get("pack_size") or line.get("pack_info") or "",
+        "unit": line.get("unit") or "",
+    }
+
+
+def _apply_preview_match(line, match):
     line.update(match.as_preview())
     if match.product and match.confidence >= AUTO_MATCH_CONFIDENCE:
         line["matched_product"] = match.product.id
@@ -789,12 +1482,33 @@ def apply_match_to_preview_line(line, company=None, *, history_context=None):
     return line
 
 
+def apply_match_to_preview_line(line, company=None, *, history_context=None):
+    request = _preview_match_request(line)
+    match = suggest_product_for_text(request.pop("raw_text"), company, history_context=history_context, **request)
+    return _apply_preview_match(line, match)
+
+
+def apply_matches_to_preview_lines(lines, company=None, *, history_context=None):
+    """Batch form of ``apply_match_to_preview_line`` for a whole preview."""
+
+    lines = list(lines)
+    matches = suggest_products_for_lines(
+        [_preview_match_request(line) for line in lines],
+        company,
+        history_context=history_context,
+    )
+    for line, match in zip(lines, matches):
+        _apply_preview_match(line, match)
+    return lines
+
+
 @transaction.atomic
 def create_product_alias(*, alias_text, product, company=None, actor=None, notes=""):
     normalized = normalize_label(alias_text)
     if not normalized:
         raise ValidationError("Alias text is required.")
     _lock_product_alias_scope(company)
+    transaction.on_commit(bump_alias_generation)
     exact_existing = list(
         ProductAlias.objects.select_for_update()
         .select_related("product")
@@ -874,6 +1588,7 @@ def learn_confirmed_product_alias(
     if not cleaned_source or not product or not company:
         return None, False
     _lock_product_alias_scope(company)
+    transaction.on_commit(bump_alias_generation)
 
     normalized = normalize_label(cleaned_source)
     exact_existing = list(
@@ -0,0 +1,342 @@
+"""Synthetic-catalog latency and query benchmark for quotation product matching.
+
+Every run builds its catalog, aliases and price history inside one transaction
+that is always rolled back, so the benchmark is safe against a shared database
+but still measures real SQL against the configured backend.
+"""
+
+import json
+import random
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Product
+
+from .matching import (
+    apply_match_to_preview_line,
+    create_or_reuse_product,
+    current_alias_indexes,
+    current_catalog_index,
+    product_identity_columns,
+    suggest_product_for_text,
+)
+from .models import (
+    Company,
+    CompanyPriceHistory,
+    ProductAlias,
+    Quotation,
+    QuotationLine,
+    normalize_label,
+)
+
+
+DEFAULT_CATALOG_SIZES = (1_000, 10_000, 50_000)
+DEFAULT_LINE_COUNT = 200
+DEFAULT_SEED = 20261017
+BENCHMARK_OPERATIONS = (
+    "suggest_product_for_text",
+    "apply_match_to_preview_line",
+    "create_or_reuse_product",
+)
+
+_STEMS = [
+    "paracetamol", "ibuprofen", "amoxicillin", "azithromycin", "cetirizine", "loratadine",
+    "omeprazole", "pantoprazole", "metformin", "amlodipine", "atorvastatin", "salbutamol",
+    "diclofenac", "mefenamic acid", "vitamin c", "vitamin d3", "zinc sulphate", "ferrous sulphate",
+    "chlorhexidine", "povidone iodine", "hydrogen peroxide", "isopropyl alcohol", "normal saline",
+    "gauze swab", "crepe bandage", "cotton wool", "adhesive plaster", "surgical mask", "nitrile gloves",
+    "latex gloves", "syringe", "cannula", "urine bag", "pulse oximeter", "thermometer", "lancet",
+    "glucose strips", "oral rehydration salts", "calamine lotion", "zinc oxide",
+]
+_MODIFIERS = [
+    "", "extra", "forte", "plus", "kids", "junior", "sterile", "non sterile", "adult",
+    "paediatric", "sugar free", "advance", "max", "sr", "duo",
+]
+_STRENGTHS = ["", "5mg", "10mg", "20mg", "250mg", "500mg", "1g", "5%", "10cm", "7.5cm", "1000iu", "0.9%"]
+_FORMS = ["", "tablets", "capsules", "syrup", "cream", "drops", "injection", "ointment", "roll", "pcs"]
+_PACKS = ["", "box of 10", "x 20", "100 pcs", "30 tabs", "1 bottle", "2 x 12 tabs"]
+_TYPOS = {"a": "e", "o": "0", "i": "y", "e": "a", "s": "z"}
+_UNKNOWN_WORDS = ["widget", "gasket", "bracket", "toner", "stapler", "marker", "valve", "cable"]
+
+
+@dataclass(frozen=True)
+class MatchingBudget:
+    """Upper bounds for one benchmark operation; ``None`` disables a bound."""
+
+    p95_ms: float | None = None
+    queries_per_line: float | None = None
+
+
+DEFAULT_BUDGETS = {
+    "suggest_product_for_text": MatchingBudget(p95_ms=500.0, queries_per_line=6.0),
+    "apply_match_to_preview_line": MatchingBudget(p95_ms=500.0, queries_per_line=6.0),
+    # Each created Product rebuilds the catalog index, so its latency tracks
+    # catalog size rather than per-line work and carries no default bound.
+    "create_or_reuse_product": MatchingBudget(p95_ms=None, queries_per_line=20.0),
+}
+
+
+def load_budgets(path=None, *, max_p95_ms=None, max_queries_per_line=None):
+    """Return the default budgets updated from a JSON file and global overrides.
+
+    The file maps operation names to ``{"p95_ms": ..., "queries_per_line": ...}``.
+    """
+
+    budgets = dict(DEFAULT_BUDGETS)
+    if path:
+        overrides = json.loads(Path(path).read_text(encoding="utf-8"))
+        if not isinstance(overrides, dict):
+            raise ValueError("Budget JSON must map operation names to budgets.")
+        for operation, values in overrides.items():
+            if operation not in BENCHMARK_OPERATIONS:
+                raise ValueError(f"Unknown benchmark operation '{operation}'.")
+            current = budgets[operation]
+            budgets[operation] = MatchingBudget(
+                p95_ms=values.get("p95_ms", current.p95_ms),
+                queries_per_line=values.get("queries_per_line", current.queries_per_line),
+            )
+    for operation, budget in budgets.items():
+        budgets[operation] = MatchingBudget(
+            p95_ms=budget.p95_ms if max_p95_ms is None else max_p95_ms,
+            queries_per_line=budget.queries_per_line if max_queries_per_line is None else max_queries_per_line,
+        )
+    return budgets
+
+
+def _product_name(rng):
+    parts = [rng.choice(_STEMS), rng.choice(_MODIFIERS), rng.choice(_STRENGTHS), rng.choice(_FORMS)]
+    return " ".join(part for part in parts if part).title()
+
+
+def _misspell(rng, text):
+    position = rng.randrange(len(text))
+    return text[:position] + _TYPOS.get(text[position].lower(), text[position]) + text[position + 1:]
+
+
+def build_synthetic_catalog(size, *, seed=DEFAULT_SEED, company=None):
+    """Bulk-create ``size`` matchable Products with aliases and price history.
+
+    About one Product in ten gets a company alias and one in twenty a global
+    alias; the company's latest 1000 price-history rows cover recent Products.
+    Returns ``(company, products, aliases)``.
+    """
+
+    rng = random.Random(seed)
+    company = company or Company.objects.create(name=f"Benchmark Clinic {seed}")
+    names = set()
+    while len(names) < size:
+        name = _product_name(rng)
+        if name in names:
+            name = f"{name} {len(names)}"
+        names.add(name)
+    products = []
+    for index, name in enumerate(sorted(names)):
+        product = Product(
+            name=name,
+            price=Decimal("1.00"),
+            status="draft",
+            sku=f"BM-{seed % 1000:03d}-{index:06d}" if index % 3 == 0 else "",
+            barcode=f"629{seed % 1000:03d}{index:07d}" if index % 5 == 0 else "",
+            pack_size=rng.choice(_PACKS),
+        )
+        for field_name, value in product_identity_columns(product).items():
+            setattr(product, field_name, value)
+        products.append(product)
+    products = Product.objects.bulk_create(products, batch_size=1000)
+
+    aliases = []
+    for index, product in enumerate(products):
+        if index % 10 == 0:
+            aliases.append(ProductAlias(company=company, product=product, alias=f"{_misspell(rng, product.name)} ward"))
+        if index % 20 == 5:
+            aliases.append(ProductAlias(company=None, product=product, alias=f"{product.name} generic {index}"))
+    for alias in aliases:
+        alias.normalized_alias = normalize_label(alias.alias)
+    aliases = ProductAlias.objects.bulk_create(aliases, batch_size=1000)
+
+    history_products = rng.sample(products, min(len(products), 1000))
+    quotation = Quotation.objects.create(company=company)
+    lines = QuotationLine.objects.bulk_create(
+        [
+            QuotationLine(
+                quotation=quotation,
+                product=product,
+                item_name_snapshot=product.name,
+                quantity=Decimal("1.000"),
+                unit_price=Decimal("2.00"),
+                match_status=QuotationLine.MATCH_CONFIRMED,
+                sort_order=index,
+            )
+            for index, product in enumerate(history_products)
+        ],
+        batch_size=1000,
+    )
+    CompanyPriceHistory.objects.bulk_create(
+        [
+            CompanyPriceHistory(
+                company=company,
+                product=line.product,
+                quotation=quotation,
+                quotation_line=line,
+                unit_price=Decimal("2.00"),
+            )
+            for line in lines
+        ],
+        batch_size=1000,
+    )
+    return company, products, aliases
+
+
+def benchmark_lines(products, aliases, count, *, seed=DEFAULT_SEED):
+    """Return realistic pharmacy request lines drawn from the synthetic catalog.
+
+    The mix is exact names, alias wording, misspelt or re-packed names, SKU
+    lookups, and items that are not in the catalog at all.
+    """
+
+    rng = random.Random(seed + 1)
+    with_sku = [product for product in products if product.sku]
+    lines = []
+    for index in range(count):
+        kind = index % 10
+        product = rng.choice(products)
+        if kind in {0, 1}:
+            lines.append({"raw_text": product.name})
+        elif kind == 2 and aliases:
+            lines.append({"raw_text": rng.choice(aliases).alias})
+        elif kind in {3, 4, 5}:
+            lines.append({"raw_text": f"{_misspell(rng, product.name.lower())} {rng.choice(_PACKS)}".strip()})
+        elif kind == 6 and with_sku:
+            sku_product = rng.choice(with_sku)
+            lines.append({"raw_text": sku_product.name.split()[0], "sku": sku_product.sku})
+        elif kind == 7:
+            lines.append({"raw_text": f"{product.name.split()[0]} {rng.choice(_STRENGTHS)} {rng.choice(_FORMS)}".strip()})
+        else:
+            lines.append({"raw_text": f"{rng.choice(_UNKNOWN_WORDS)} {rng.choice(_UNKNOWN_WORDS)} {index}"})
+    return lines
+
+
+def _percentile(values, percent):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(percent / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def _measure(operation, lines, call):
+    latencies = []
+    queries = []
+    for line in lines:
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            call(line)
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(captured.captured_queries))
+    return {
+        "operation": operation,
+        "lines": len(lines),
+        "p50_ms": round(_percentile(latencies, 50), 3),
+        "p95_ms": round(_percentile(latencies, 95), 3),
+        "max_ms": round(max(latencies, default=0.0), 3),
+        "queries_per_line": round(sum(queries) / len(queries), 3) if queries else 0.0,
+        "max_queries": max(queries, default=0),
+    }
+
+
+def _benchmark_catalog(size, line_count, seed):
+    company, products, aliases = build_synthetic_catalog(size, seed=seed)
+    lines = benchmark_lines(products, aliases, line_count, seed=seed)
+
+    started = time.perf_counter()
+    current_catalog_index()
+    current_alias_indexes(company, None)
+    index_build_ms = (time.perf_counter() - started) * 1000
+
+    operations = [
+        _measure(
+            "suggest_product_for_text",
+            lines,
+            lambda line: suggest_product_for_text(line["raw_text"], company, sku=line.get("sku", "")),
+        ),
+        _measure(
+            "apply_match_to_preview_line",
+            lines,
+            lambda line: apply_match_to_preview_line({"raw_name": line["raw_text"], "sku": line.get("sku", "")}, company),
+        ),
+        # Runs last: every created Product invalidates the catalog index.
+        _measure(
+            "create_or_reuse_product",
+            lines,
+            lambda line: create_or_reuse_product(
+                name=line["raw_text"],
+                company=company,
+                sku=line.get("sku", ""),
+                confirm_create=True,
+            ),
+        ),
+    ]
+    return {
+        "catalog_size": size,
+        "aliases": len(aliases),
+        "history_rows": min(size, 1000),
+        "index_build_ms": round(index_build_ms, 3),
+        "operations": operations,
+    }
+
+
+def check_budgets(report, budgets):
+    """Return human-readable budget violations for a benchmark report."""
+
+    violations = []
+    for catalog in report["catalogs"]:
+        for result in catalog["operations"]:
+            budget = budgets.get(result["operation"])
+            if not budget:
+                continue
+            label = f"{result['operation']} at {catalog['catalog_size']} Products"
+            if budget.p95_ms is not None and result["p95_ms"] > budget.p95_ms:
+                violations.append(f"{label}: p95 {result['p95_ms']}ms exceeds {budget.p95_ms}ms.")
+            if budget.queries_per_line is not None and result["queries_per_line"] > budget.queries_per_line:
+                violations.append(
+                    f"{label}: {result['queries_per_line']} queries per line exceeds {budget.queries_per_line}."
+                )
+    return violations
+
+
+def run_matching_benchmark(
+    sizes=DEFAULT_CATALOG_SIZES,
+    *,
+    line_count=DEFAULT_LINE_COUNT,
+    seed=DEFAULT_SEED,
+    budgets=None,
+):
+    """Benchmark matching against each synthetic catalog size and check budgets.
+
+    Each size runs in its own rolled-back transaction, so nothing persists.
+    """
+
+    budgets = DEFAULT_BUDGETS if budgets is None else budgets
+    catalogs = []
+    for size in sizes:
+        with transaction.atomic():
+            catalogs.append(_benchmark_catalog(size, line_count, seed))
+            transaction.set_rollback(True)
+    report = {
+        "vendor": connection.vendor,
+        "seed": seed,
+        "line_count": line_count,
+        "catalogs": catalogs,
+        "budgets": {
+            operation: {"p95_ms": budget.p95_ms, "queries_per_line": budget.queries_per_line}
+            for operation, budget in budgets.items()
+        },
+    }
+    report["violations"] = check_budgets(report, budgets)
+    report["passed"] = not report["violations"]
+    return report
@@ -0,0 +1,83 @@
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+
+logger = logging.getLogger(__name__)
+
+
+TRIGRAM_INDEXES = {
+    "api_product_name_trgm": ("api_product", '"name" gin_trgm_ops'),
+    "api_product_active_ingredient_trgm": ("api_product", '"active_ingredient" gin_trgm_ops'),
+    # Matches the UPPER(alias::text) LIKE expression Django emits for icontains.
+    "quotations_productalias_alias_upper_trgm": (
+        "quotations_productalias",
+        'UPPER("alias"::text) gin_trgm_ops',
+    ),
+}
+
+
+def _ensure_trigram_extension(schema_editor):
+    """Return whether pg_trgm is installed, creating it when this role may.
+
+    Managed PostgreSQL roles often lack the privilege to create extensions.
+    The indexes are optional, so that case logs a note and skips them rather
+    than failing ``migrate``; see DEPLOYMENT.md for the manual step.
+    """
+
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+        if cursor.fetchone() is not None:
+            return True
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning("pg_trgm is not available on this server; skipping product trigram indexes.")
+            return False
+        cursor.execute("SELECT has_database_privilege(current_database(), 'CREATE')")
+        if not cursor.fetchone()[0]:
+            logger.warning(
+                "This database role cannot CREATE EXTENSION pg_trgm; skipping product trigram indexes. "
+                "Create the extension and indexes manually as described in DEPLOYMENT.md."
+            )
+            return False
+    try:
+        # A savepoint keeps a refused CREATE EXTENSION from aborting the migration.
+        with transaction.atomic(using=connection.alias):
+            schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    except DatabaseError as exc:
+        logger.warning("CREATE EXTENSION pg_trgm failed (%s); skipping product trigram indexes.", exc)
+        return False
+    return True
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """Add optional pg_trgm indexes; SQLite and servers without pg_trgm skip."""
+
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    if not _ensure_trigram_extension(schema_editor):
+        return
+    for name, (table, expression) in TRIGRAM_INDEXES.items():
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {schema_editor.quote_name(name)} "
+            f"ON {schema_editor.quote_name(table)} USING gin ({expression})"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for name in TRIGRAM_INDEXES:
+        schema_editor.execute(f"DROP INDEX IF EXISTS {schema_editor.quote_name(name)}")
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("api", "0004_product_identity_columns"),
+        ("quotations", "0042_preserve_gmail_progress_db_defaults"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, reverse_code=drop_trigram_indexes),
+    ]
@@ -0,0 +1,62 @@
+# Generated by Django 5.2.6 on 2026-10-17 03:27
+
+import re
+
+from django.db import migrations, models
+
+
+# Frozen copy of quotations.company_matching.company_match_key as of this
+# migration, so later matcher changes cannot alter how existing rows backfill.
+LEGAL_SUFFIXES = {
+    "co",
+    "company",
+    "corp",
+    "corporation",
+    "inc",
+    "incorporated",
+    "llc",
+    "llp",
+    "ltd",
+    "limited",
+    "pvt",
+    "private",
+    "plc",
+    "fz",
+    "fzco",
+    "fze",
+}
+
+
+def company_match_key(value):
+    text = " ".join((value or "").strip().lower().split())
+    text = re.sub(r"\bl\.?\s*l\.?\s*c\.?\b", " llc ", text)
+    text = re.sub(r"\b\d{6,8}[a-z]?\b", " ", text)
+    text = re.sub(r"[^a-z0-9]+", " ", text)
+    tokens = [token for token in text.split() if token]
+    while tokens and tokens[-1] in LEGAL_SUFFIXES:
+        tokens.pop()
+    return " ".join(tokens)
+
+
+def backfill_company_match_keys(apps, schema_editor):
+    Company = apps.get_model("quotations", "Company")
+    companies = list(Company.objects.only("id", "name"))
+    for company in companies:
+        company.company_match_key = company_match_key(company.name)
+    Company.objects.bulk_update(companies, ["company_match_key"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0043_product_match_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='company',
+            name='company_match_key',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.RunPython(backfill_company_match_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:12
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0044_company_match_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='mailboxpomatchrun',
+            name='baseline_run',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='delta_runs', to='quotations.mailboxpomatchrun'),
+        ),
+        migrations.AddField(
+            model_name='mailboxpomatchrun',
+            name='mode',
+            field=models.CharField(choices=[('full', 'Full'), ('delta', 'Delta')], default='full', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='mailboxpomatchrun',
+            name='quote_fingerprints',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+        migrations.CreateModel(
+            name='MailboxPOMatchRunMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_sha256', models.CharField(max_length=64)),
+                ('candidate_quote_ids', models.JSONField(blank=True, default=list)),
+                ('variant_count', models.PositiveIntegerField(default=0)),
+                ('outcome', models.CharField(choices=[('decisive', 'Decisive'), ('ambiguous', 'Ambiguous'), ('unmatched', 'Unmatched')], max_length=20)),
+                ('carried', models.BooleanField(default=False)),
+                ('match_run', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='message_results', to='quotations.mailboxpomatchrun')),
+                ('message', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='match_results', to='quotations.mailboxpomessage')),
+            ],
+            options={
+                'ordering': ['match_run_id', 'message_id'],
+                'constraints': [models.UniqueConstraint(fields=('match_run', 'message'), name='unique_mailbox_po_match_run_message')],
+            },
+        ),
+    ]
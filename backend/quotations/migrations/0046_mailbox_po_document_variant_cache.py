@@ -0,0 +1,29 @@
+# Generated by Django 5.2.6 on 2026-10-17 04:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quotations', '0045_mailbox_po_delta_matching'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MailboxPODocumentVariantCache',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('input_sha256', models.CharField(max_length=64)),
+                ('parser_version', models.CharField(max_length=64)),
+                ('variants', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('message', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='document_variant_cache', to='quotations.mailboxpomessage')),
+            ],
+            options={
+                'ordering': ['message_id'],
+            },
+        ),
+    ]
@@ -54,6 +54,8 @@ def quotation_delivery_message_id():
 class Company(models.Model):
     name = models.CharField(max_length=255, unique=True)
     normalized_name = models.CharField(max_length=255, unique=True, editable=False)
+    # Legal-suffix-free name key used to block and score similar companies.
+    company_match_key = models.CharField(max_length=255, blank=True, editable=False)
     email = models.EmailField(blank=True)
     phone = models.CharField(max_length=50, blank=True)
     billing_address = models.TextField(blank=True)
@@ -74,7 +76,14 @@ class Company(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
+        # Imported lazily: company matching imports this module.
+        from .company_matching import company_match_key
+
         self.normalized_name = normalize_label(self.name)
+        self.company_match_key = company_match_key(self.name)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "name" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "company_match_key"}
         super().save(*args, **kwargs)
 
 
@@ -1057,6 +1066,32 @@ class MailboxPOAuditFailure(models.Model):
         return f"Mailbox PO audit #{self.audit_run_id}: {self.gmail_message_id} ({self.status})"
 
 
+class MailboxPODocumentVariantCache(models.Model):
+    """Parsed document variants of one inventory message, reused across match runs.
+
+    A row is valid only for the exact matching inputs (``input_sha256``) and
+    the parser build (``parser_version``) that produced it; anything else is
+    re-parsed and replaced.
+    """
+
+    message = models.OneToOneField(
+        MailboxPOMessage,
+        on_delete=models.CASCADE,
+        related_name="document_variant_cache",
+    )
+    input_sha256 = models.CharField(max_length=64)
+    parser_version = models.CharField(max_length=64)
+    variants = models.JSONField(default=list, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["message_id"]
+
+    def __str__(self):
+        return f"Mailbox PO message #{self.message_id} variants ({self.parser_version[:12]})"
+
+
 class MailboxPOMatchRun(models.Model):
     """Immutable reconciliation record for one completed mailbox inventory."""
 
@@ -1068,6 +1103,12 @@ class MailboxPOMatchRun(models.Model):
         (STATUS_COMPLETED, "Completed"),
         (STATUS_FAILED, "Failed"),
     ]
+    MODE_FULL = "full"
+    MODE_DELTA = "delta"
+    MODE_CHOICES = [
+        (MODE_FULL, "Full"),
+        (MODE_DELTA, "Delta"),
+    ]
 
     audit_run = models.ForeignKey(
         MailboxPOAuditRun,
@@ -1083,6 +1124,15 @@ class MailboxPOMatchRun(models.Model):
     )
     algorithm_version = models.CharField(max_length=50, default="mailbox_match_v2")
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_RUNNING, db_index=True)
+    mode = models.CharField(max_length=10, choices=MODE_CHOICES, default=MODE_FULL)
+    baseline_run = models.ForeignKey(
+        "self",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="delta_runs",
+    )
+    quote_fingerprints = models.JSONField(default=dict, blank=True)
     summary = models.JSONField(default=dict, blank=True)
     errors = models.JSONField(default=list, blank=True)
     cursor_message_id = models.PositiveBigIntegerField(default=0)
@@ -1106,6 +1156,52 @@ class MailboxPOMatchRun(models.Model):
         return f"Mailbox PO match #{self.pk or 'new'} ({self.status})"
 
 
+class MailboxPOMatchRunMessage(models.Model):
+    """Ranking outcome of one canonical message in one match run.
+
+    A delta run reuses the row of an unchanged message instead of re-ranking
+    it, so each row records the matching-input digest and every quotation that
+    produced a candidate, not only the stored evidence.
+    """
+
+    OUTCOME_DECISIVE = "decisive"
+    OUTCOME_AMBIGUOUS = "ambiguous"
+    OUTCOME_UNMATCHED = "unmatched"
+    OUTCOME_CHOICES = [
+        (OUTCOME_DECISIVE, "Decisive"),
+        (OUTCOME_AMBIGUOUS, "Ambiguous"),
+        (OUTCOME_UNMATCHED, "Unmatched"),
+    ]
+
+    match_run = models.ForeignKey(
+        MailboxPOMatchRun,
+        on_delete=models.CASCADE,
+        related_name="message_results",
+    )
+    message = models.ForeignKey(
+        MailboxPOMessage,
+        on_delete=models.CASCADE,
+        related_name="match_results",
+    )
+    input_sha256 = models.CharField(max_length=64)
+    candidate_quote_ids = models.JSONField(default=list, blank=True)
+    variant_count = models.PositiveIntegerField(default=0)
+    outcome = models.CharField(max_length=20, choices=OUTCOME_CHOICES)
+    carried = models.BooleanField(default=False)
+
+    class Meta:
+        ordering = ["match_run_id", "message_id"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["match_run", "message"],
+                name="unique_mailbox_po_match_run_message",
+            )
+        ]
+
+    def __str__(self):
+        return f"Mailbox PO match #{self.match_run_id} message #{self.message_id} ({self.outcome})"
+
+
 class ContractIntelligenceRun(models.Model):
     STATUS_DRAFT = "draft"
     STATUS_DISCOVERING = "discovering"
@@ -12,7 +12,7 @@ import logging
 from decimal import Decimal, InvalidOperation
 
 from .import_parsers import parse_text_preview
-from .mailbox_po_reconciliation import document_variants
+from .mailbox_po_reconciliation import cached_document_variants
 from .models import QuotationLine, QuotationOutcomePOImport, normalize_label
 from .services import build_po_outcome_suggestions
 
@@ -248,7 +248,7 @@ def _selected_variant(evidence):
     inventory = evidence.mailbox_message
     if not inventory:
         return None
-    variants = list(document_variants(inventory))
+    variants = list(cached_document_variants(inventory, store=False))
     if not variants:
         return None
 
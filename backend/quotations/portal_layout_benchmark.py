@@ -0,0 +1,157 @@
+"""Per-layout benchmark of signature-dispatched mailbox PO portal parsing.
+
+The corpus is the extracted text of the portal documents exercised by the
+portal layout tests.  Each document is parsed twice: sequentially, trying every
+registered layout's row parser and document-total reader in priority order as
+the reconciler did before signature dispatch, and through the dispatcher that
+only runs layouts whose header markers occur in the text.  Both paths must
+return identical rows, warnings and totals.
+"""
+
+import json
+import statistics
+import time
+from collections import defaultdict
+from pathlib import Path
+
+from .mailbox_po_reconciliation import (
+    PORTAL_LAYOUTS,
+    _document_total,
+    _portal_order_rows,
+    portal_layouts_for,
+)
+
+
+PORTAL_LAYOUT_CORPUS_SCHEMA_VERSION = "mailbox_po_portal_layouts_v1"
+DEFAULT_PORTAL_LAYOUT_CORPUS_PATH = (
+    Path(__file__).resolve().parent
+    / "evaluation_corpus"
+    / "mailbox_po_portal_layouts_v1.json"
+)
+DEFAULT_REPEATS = 200
+NO_PORTAL_LAYOUT = "none"
+
+
+def load_portal_layout_corpus(path=None):
+    """Return ``{document_id: {"layout": ..., "text": ...}}`` from the corpus file."""
+
+    corpus = json.loads(Path(path or DEFAULT_PORTAL_LAYOUT_CORPUS_PATH).read_text(encoding="utf-8"))
+    if corpus.get("schema_version") != PORTAL_LAYOUT_CORPUS_SCHEMA_VERSION:
+        raise ValueError(
+            f"Portal layout corpus schema must be {PORTAL_LAYOUT_CORPUS_SCHEMA_VERSION!r}."
+        )
+    documents = {}
+    for document in corpus.get("documents") or []:
+        documents[document["id"]] = {
+            "layout": document["layout"],
+            "text": "\n".join(document["lines"]),
+        }
+    return documents
+
+
+def _sequential_parse(text, *, source):
+    """Parse ``text`` without signature dispatch; return the result and parser calls."""
+
+    calls = 0
+    parsed = (False, (), ())
+    for layout in PORTAL_LAYOUTS:
+        calls += 1
+        recognized, rows, warnings = layout.parse_rows(text, source=source)
+        if recognized:
+            parsed = (True, rows, warnings)
+            break
+    total = None
+    for layout in PORTAL_LAYOUTS:
+        if layout.document_total is None:
+            continue
+        calls += 1
+        recognized, layout_total = layout.document_total(text)
+        if recognized:
+            total = layout_total
+            break
+    else:
+        total = _document_total({}, text)
+    return (*parsed, total), calls
+
+
+def _dispatched_parse(text, *, source):
+    # Clearing the memo charges every repetition for signature detection.
+    portal_layouts_for.cache_clear()
+    return (*_portal_order_rows(text, source=source), _document_total({}, text))
+
+
+def _dispatched_calls(text):
+    layouts = portal_layouts_for(text)
+    recognized = next(
+        (index for index, layout in enumerate(layouts) if layout.parse_rows(text, source="benchmark")[0]),
+        None,
+    )
+    row_calls = len(layouts) if recognized is None else recognized + 1
+    return row_calls + sum(1 for layout in layouts if layout.document_total is not None)
+
+
+def _median_ms(call, repeats):
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        call()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+
+def run_portal_layout_benchmark(*, repeats=DEFAULT_REPEATS, path=None):
+    """Time sequential and signature-dispatched parsing per portal layout."""
+
+    documents = load_portal_layout_corpus(path)
+    by_layout = defaultdict(list)
+    mismatches = []
+    for document_id, document in documents.items():
+        text = document["text"]
+        source = f"{document_id}.pdf"
+        sequential, sequential_calls = _sequential_parse(text, source=source)
+        dispatched = _dispatched_parse(text, source=source)
+        if sequential != dispatched:
+            mismatches.append(f"{document_id}: dispatched parsing differs from sequential parsing.")
+        detected = [layout.name for layout in portal_layouts_for(text)]
+        if document["layout"] == NO_PORTAL_LAYOUT:
+            if dispatched[0]:
+                mismatches.append(f"{document_id}: recognized as a portal layout but expected none.")
+        elif document["layout"] not in detected:
+            mismatches.append(f"{document_id}: signatures did not select layout {document['layout']!r}.")
+        by_layout[document["layout"]].append(
+            {
+                "sequential_ms": _median_ms(lambda: _sequential_parse(text, source=source), repeats),
+                "dispatched_ms": _median_ms(lambda: _dispatched_parse(text, source=source), repeats),
+                "sequential_parser_calls": sequential_calls,
+                "dispatched_parser_calls": _dispatched_calls(text),
+            }
+        )
+
+    layouts = []
+    for name, results in sorted(by_layout.items()):
+        sequential_ms = sum(result["sequential_ms"] for result in results)
+        dispatched_ms = sum(result["dispatched_ms"] for result in results)
+        layouts.append(
+            {
+                "layout": name,
+                "documents": len(results),
+                "sequential_ms": round(sequential_ms, 4),
+                "dispatched_ms": round(dispatched_ms, 4),
+                "speedup": round(sequential_ms / dispatched_ms, 2) if dispatched_ms else None,
+                "sequential_parser_calls": sum(result["sequential_parser_calls"] for result in results),
+                "dispatched_parser_calls": sum(result["dispatched_parser_calls"] for result in results),
+            }
+        )
+    sequential_total = sum(layout["sequential_ms"] for layout in layouts)
+    dispatched_total = sum(layout["dispatched_ms"] for layout in layouts)
+    return {
+        "documents": len(documents),
+        "repeats": repeats,
+        "registered_layouts": [layout.name for layout in PORTAL_LAYOUTS],
+        "layouts": layouts,
+        "sequential_ms": round(sequential_total, 4),
+        "dispatched_ms": round(dispatched_total, 4),
+        "speedup": round(sequential_total / dispatched_total, 2) if dispatched_total else None,
+        "mismatches": mismatches,
+        "passed": not mismatches,
+    }
@@ -1171,6 +1171,8 @@ class MailboxPOMatchRunSerializer(serializers.ModelSerializer):
             "requested_by",
             "requested_by_username",
             "algorithm_version",
+            "mode",
+            "baseline_run",
             "status",
             "summary",
             "errors",
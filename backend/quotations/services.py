@@ -15,6 +15,7 @@ from .matching import (
     create_product_alias,
     learn_confirmed_product_alias,
     suggest_product_for_text,
+    suggest_products_for_lines,
 )
 from .models import (
     Company,
@@ -1794,8 +1795,10 @@ def create_historical_price_import(preview_data, actor, batch=None):
         created_by=actor if getattr(actor, "is_authenticated", False) else None,
         **preview_data,
     )
-    for index, line_data in enumerate(lines_data):
-        match = suggest_product_for_text(line_data.get("item_name", ""))
+    matches = suggest_products_for_lines(
+        [{"raw_text": line_data.get("item_name", "")} for line_data in lines_data]
+    )
+    for index, (line_data, match) in enumerate(zip(lines_data, matches)):
         HistoricalPriceImportLine.objects.create(
             historical_import=historical_import,
             sort_order=index,
@@ -2048,9 +2051,13 @@ def apply_product_matches_to_historical_import(historical_import, actor=None):
             HistoricalPriceImportLine.STATUS_SKIPPED,
         ]
     ).order_by("sort_order", "id")
-    for line in candidate_lines:
+    candidate_lines = list(candidate_lines)
+    matches = suggest_products_for_lines(
+        [{"raw_text": line.item_name} for line in candidate_lines],
+        historical_import.company,
+    )
+    for line, match in zip(candidate_lines, matches):
         before_status = line.status
-        match = suggest_product_for_text(line.item_name, historical_import.company)
         if not match.product:
             continue
         can_override = (
@@ -0,0 +1,107 @@
+from unittest.mock import patch
+
+from django.test import TestCase
+
+from . import company_matching
+from .company_matching import (
+    company_match_key,
+    current_company_block_index,
+    find_similar_companies,
+    score_company_name,
+)
+from .models import Company
+
+
+NAMES = [
+    "Al Noor Trading LLC",
+    "Alnoor Trading Co",
+    "Al-Noor Trading L.L.C.",
+    "Emirates Facilities Management",
+    "Emirates Facility Management LLC",
+    "Dubai Holding 20240101",
+    "Dubai Holdings",
+    "Khansaheb Civil Engineering",
+    "Khan Saheb Engineering",
+    "Imdaad LLC",
+    "Intermass",
+    "Gulf Medical Supplies",
+    "Gulf Medicals",
+    "Mediclinic Middle East",
+    "Aster Pharmacy Group",
+]
+
+
+def _full_scan(name, threshold, limit=5):
+    suggestions = []
+    for company in Company.objects.all():
+        score, reason = score_company_name(name, company.name)
+        if score >= threshold:
+            suggestions.append((score, company.name))
+    return sorted(suggestions, key=lambda item: (-item[0], item[1].lower()))[:limit]
+
+
+class CompanyBlockingTests(TestCase):
+    def setUp(self):
+        for name in NAMES:
+            Company.objects.create(name=name)
+        # Exercise the blocking keys rather than the small-table full scan.
+        full_scan_patch = patch.object(company_matching, "COMPANY_BLOCK_FULL_SCAN_MAX_COMPANIES", 0)
+        full_scan_patch.start()
+        self.addCleanup(full_scan_patch.stop)
+
+    def test_save_persists_the_match_key(self):
+        company = Company.objects.get(name="Al Noor Trading LLC")
+        self.assertEqual(company.company_match_key, "al noor trading")
+
+        company.name = "Al Noor General Trading LLC"
+        company.save(update_fields=["name"])
+        company.refresh_from_db()
+
+        self.assertEqual(company.company_match_key, company_match_key(company.name))
+
+    def test_blocked_search_matches_the_full_table_scan(self):
+        queries = NAMES + ["Alnoor Trdg", "Emirates Facilities", "Khansaheb", "Gulf Medical", "Intermass Corp", "Aster"]
+        for name in queries:
+            for threshold in [70, 74, 84]:
+                with self.subTest(name=name, threshold=threshold):
+                    self.assertEqual(
+                        [(row["score"], row["name"]) for row in find_similar_companies(name, threshold=threshold)],
+                        _full_scan(name, threshold),
+                    )
+
+    def test_one_character_misspelling_still_reaches_the_duplicate_guard(self):
+        Company.objects.create(name="Medicare LLC")
+
+        for full_scan_max in [0, 2000]:
+            with self.subTest(full_scan_max=full_scan_max):
+                with patch.object(company_matching, "COMPANY_BLOCK_FULL_SCAN_MAX_COMPANIES", full_scan_max):
+                    suggestions = find_similar_companies("Medcare", threshold=84)
+
+                self.assertEqual(suggestions[0]["name"], "Medicare LLC")
+                self.assertGreaterEqual(suggestions[0]["score"], 92)
+
+    def test_empty_queryset_is_not_widened_to_all_companies(self):
+        self.assertEqual(find_similar_companies("Gulf Medical", queryset=Company.objects.none()), [])
+
+    def test_common_tokens_do_not_widen_the_block(self):
+        for index in range(12):
+            Company.objects.create(name=f"Zeta{index:02d} Trading LLC")
+
+        with patch.object(company_matching, "COMPANY_BLOCK_MAX_POSTINGS", 10):
+            candidate_ids = current_company_block_index().candidate_ids("Al Noor Trading")
+
+        names = set(Company.objects.filter(pk__in=candidate_ids).values_list("name", flat=True))
+        self.assertIn("Alnoor Trading Co", names)
+        self.assertFalse(any(name.startswith("Zeta") for name in names))
+
+    def test_warm_search_query_count_does_not_grow_with_companies(self):
+        current_company_block_index()
+        with self.assertNumQueries(2):
+            find_similar_companies("Gulf Medical")
+
+        Company.objects.bulk_create([Company(name=f"Unrelated {index}", normalized_name=f"unrelated {index}") for index in range(300)])
+        current_company_block_index()
+        with self.assertNumQueries(2):
+            suggestions = find_similar_companies("Gulf Medical")
+
+        self.assertEqual({row["name"] for row in suggestions}, {"Gulf Medical Supplies", "Gulf Medicals"})
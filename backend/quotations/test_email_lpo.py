@@ -1793,7 +1793,7 @@ class SharedMailboxCommandTests(TestCase):
         self.assertIn("Mailbox-wide LPO audit completed", stdout.getvalue())
         start_audit.assert_called_once_with(connection, requested_by=owner)
         scan_page.assert_not_called()
-        reconcile.assert_called_once_with(run, requested_by=owner)
+        reconcile.assert_called_once_with(run, requested_by=owner, workers=0, delta=False)
 
 
 class SharedMailboxOwnershipTests(TestCase):
@@ -0,0 +1,148 @@
+import random
+from difflib import SequenceMatcher
+from types import SimpleNamespace
+
+from django.test import SimpleTestCase
+from rapidfuzz import fuzz
+
+from .company_matching import score_company_name, score_company_names
+from .matching import (
+    FUZZY_CANDIDATE_THRESHOLD,
+    CatalogIndex,
+    _fuzzy_score,
+    _fuzzy_scores,
+    _rank_catalog_candidates,
+    identities_compatible,
+    item_identity,
+)
+
+
+STEMS = [
+    "paracetamol",
+    "panadol",
+    "panadol extra",
+    "pulse oximeter",
+    "pulse monitor",
+    "crepe bandage",
+    "cotton wool",
+    "gauze swab",
+    "sterile gauze",
+    "alcohol swab",
+    "surgical mask",
+    "nitrile gloves",
+    "ibuprofen",
+    "amoxicillin",
+    "vitamin c",
+    "vitamin d3",
+    "zinc oxide",
+    "saline",
+]
+NOISE = ["", " plus", " forte", " kids", " xl", " sterile", " adhesive", " roll", " 3ply", " pro"]
+STRENGTHS = ["", " 500mg", " 0.5 g", " 250 mg", " 10cm", " 1000 iu", " 5%"]
+PACKS = ["", " 24 tablets", " 20 tabs", " box", " 100 pcs", " x 10", " syrup", " cream"]
+TYPOS = {"a": "e", "o": "0", "i": "y", "e": "a"}
+
+
+def _variant(rng):
+    name = rng.choice(STEMS) + rng.choice(NOISE)
+    if rng.random() < 0.4:
+        position = rng.randrange(len(name))
+        name = name[:position] + TYPOS.get(name[position], name[position]) + name[position + 1:]
+    if rng.random() < 0.2:
+        name = name.replace(" ", "-", 1)
+    return (name + rng.choice(STRENGTHS) + rng.choice(PACKS)).strip()
+
+
+def _legacy_rank(requested, products, limit):
+    fuzzy = []
+    for product in products:
+        identity = item_identity(product.name, dosage=product.dosage, pack_size=product.pack_size)
+        if not identities_compatible(requested, identity):
+            continue
+        if requested.core_name and requested.core_name == identity.core_name:
+            continue
+        score = _fuzzy_score(requested, identity)
+        if score >= FUZZY_CANDIDATE_THRESHOLD:
+            fuzzy.append((score, product))
+    fuzzy.sort(key=lambda item: (-item[0], item[1].name.lower(), item[1].id))
+    return [(round(score, 12), product.id) for score, product in fuzzy[:limit]]
+
+
+class FuzzyScoringParityTests(SimpleTestCase):
+    def setUp(self):
+        self.rng = random.Random(20261017)
+
+    def test_rapidfuzz_ratio_never_undercuts_difflib(self):
+        for _ in range(2000):
+            left, right = _variant(self.rng), _variant(self.rng)
+            with self.subTest(left=left, right=right):
+                self.assertGreaterEqual(
+                    fuzz.ratio(left, right) / 100 + 1e-9,
+                    SequenceMatcher(None, left, right).ratio(),
+                )
+
+    def test_batched_scores_match_per_candidate_scores(self):
+        for _ in range(60):
+            requested = item_identity(_variant(self.rng))
+            candidates = [item_identity(_variant(self.rng)) for _ in range(300)]
+            expected = [
+                score if score >= FUZZY_CANDIDATE_THRESHOLD else 0.0
+                for score in (_fuzzy_score(requested, candidate) for candidate in candidates)
+            ]
+
+            self.assertEqual(_fuzzy_scores(requested, candidates), expected)
+
+    def test_ranked_catalog_candidates_keep_score_and_tie_break_order(self):
+        products = [
+            SimpleNamespace(
+                id=index,
+                name=_variant(self.rng),
+                active_ingredient="",
+                dosage="",
+                pack_size="",
+            )
+            for index in range(1, 301)
+        ]
+        catalog = CatalogIndex(stamp=None, products=sorted(products, key=lambda product: (product.name, product.id)))
+        for _ in range(80):
+            raw_text = _variant(self.rng)
+            requested = item_identity(raw_text)
+            pool = [entry.product for entry in catalog.pool(requested, raw_text)]
+
+            # These in-memory products carry no stored identity columns.
+            exact_entries = catalog.unstored_core_name(requested.core_name)
+
+            _exact, fuzzy = _rank_catalog_candidates(
+                raw_text, requested, limit=6, catalog=catalog, exact_entries=exact_entries
+            )
+
+            self.assertEqual(
+                [(round(candidate.score, 12), candidate.product.id) for candidate in fuzzy],
+                _legacy_rank(requested, pool, 6),
+            )
+
+    def test_batched_company_scores_match_single_scores_above_threshold(self):
+        names = [
+            "Al Noor Trading LLC",
+            "Al-Noor Trading L.L.C.",
+            "Alnoor Trading Co",
+            "Emirates Facilities Management",
+            "Emirates Facility Management LLC",
+            "Dubai Holding 20240101",
+            "Dubai Holdings",
+            "Khansaheb Civil Engineering",
+            "Khan Saheb Engineering",
+            "Imdaad LLC",
+            "",
+        ]
+        for source in names:
+            for threshold in [0, 70, 74, 84]:
+                with self.subTest(source=source, threshold=threshold):
+                    batched = score_company_names(source, names, min_score=threshold)
+                    single = [score_company_name(source, name) for name in names]
+
+                    for batched_result, single_result in zip(batched, single):
+                        if batched_result is None:
+                            self.assertLess(single_result[0], threshold)
+                        else:
+                            self.assertEqual(batched_result, single_result)
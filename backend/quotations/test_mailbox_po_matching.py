@@ -1,14 +1,21 @@
+import random
+from collections import Counter
 from datetime import datetime, timedelta, timezone
 from dataclasses import replace
 from decimal import Decimal
 from unittest import TestCase
+from unittest.mock import patch
 
+from rapidfuzz.fuzz import ratio as rapidfuzz_ratio
+
+from . import mailbox_po_matching
 from .mailbox_po_matching import (
     AMBIGUOUS,
     AUTOMATIC,
     UNMATCHED,
     CanonicalMailboxMessage,
     EligibleQuotation,
+    EligibleQuotationIndex,
     EligibleQuoteLine,
     MailboxPOLine,
     canonicalize_message,
@@ -2172,3 +2179,356 @@ class MailboxQuotationRankingTests(TestCase):
         self.assertTrue(
             any("coverage is below" in reason for reason, _count in result.rejection_summary)
         )
+
+
+class EligibleQuotationIndexTests(TestCase):
+    def quotes(self):
+        return [
+            quote(1, "QT-20260701-0001", [qline(11, "Nitrile Gloves", 10, 5), qline(12, "Face Mask 3 Ply", 50, 1)]),
+            quote(2, "QT-20260701-0002", [qline(21, "Nitrile Gloves Large", 10, 5)], emails=("other@clinic.example",)),
+            quote(3, "QT-20260701-0003", [qline(31, "Paracetamol 500mg Tablets", 20, 2)]),
+            quote(4, "QT-20260701-0004", [qline(41, "Surgical Gown", 5, 30)], company="Unrelated Trading"),
+            quote(5, "", [qline(51, "Nitrile Gloves", 10, 5)]),
+            quote(6, "QT-20260710-0006", [qline(61, "Nitrile Gloves", 10, 5)], sent_at=BASE + timedelta(days=9)),
+            quote(7, "QT-20260701-0007", [qline(71, "Alcohol Swab", 100, 0.1)], sent_at=None),
+            quote(8, "QT-20260701-0008", [qline(81, "Cotton Roll", 4, 8)], emails=(), company="Gulf Supplies"),
+        ]
+
+    def messages(self):
+        return [
+            message([pline(1, "Nitrile Gloves", 10, 5), pline(2, "Face Mask 3 Ply", 50, 1)], total=100),
+            message([pline(1, "Para cetamol 500mg Tablets", 20, 2)]),
+            message([pline(1, "Surgical Gown", 5, 30)], refs=("QT-20260701-0004",)),
+            message([pline(1, "Nitrile Gloves", 10, 5)], refs=("QT-20260701-0099",)),
+            message([pline(1, "Dental Bib", 3, 1)]),
+            message([]),
+            message([pline(1, "Nitrile Gloves", 10, 5)], received_at=BASE - timedelta(days=1)),
+        ]
+
+    def test_pruned_ranking_matches_the_full_evaluation(self):
+        index = EligibleQuotationIndex(self.quotes())
+        for position, po in enumerate(self.messages()):
+            with self.subTest(message=position):
+                pruned = rank_message_to_quotations(po, index)
+                with patch.object(EligibleQuotationIndex, "candidate_positions", return_value=None):
+                    full = rank_message_to_quotations(po, self.quotes())
+                self.assertEqual(pruned, full)
+                self.assertEqual(pruned.evaluated_count, len(index))
+
+    def test_time_window_ranking_matches_a_per_quote_scan(self):
+        index = EligibleQuotationIndex(self.quotes())
+
+        def every_position(_index, _received_at, _reference_keys):
+            return list(range(len(_index.quotes))), Counter()
+
+        for position, po in enumerate(self.messages()):
+            with self.subTest(message=position):
+                windowed = rank_message_to_quotations(po, index)
+                with patch.object(EligibleQuotationIndex, "reachable_positions", every_position):
+                    scanned = rank_message_to_quotations(po, index)
+                self.assertEqual(windowed, scanned)
+
+    def test_quotes_sent_after_the_message_are_counted_without_evaluation(self):
+        index = EligibleQuotationIndex(self.quotes())
+
+        positions, rejections = index.reachable_positions(BASE + timedelta(days=4), frozenset())
+
+        ids = {index.quotes[position].quote_id for position in positions}
+        # Quote 5 has no reference, quote 6 was sent later and quote 7 has no
+        # boundary, which ``_precheck`` names individually.
+        self.assertEqual(ids, {1, 2, 3, 4, 7, 8})
+        self.assertEqual(
+            rejections,
+            Counter(
+                {
+                    "quotation has no stable reference": 1,
+                    "message is not after the quotation send/finalize timestamp": 1,
+                }
+            ),
+        )
+
+    def test_line_rejections_keep_precedence_over_customer_identity(self):
+        stranger = quote(9, "QT-20260701-0009", [qline(91, "Nitrile Gloves", 10, 5)], company="Zenith Trading", emails=("orders@zenith.example",))
+        rows = [pline(1, "Nitrile Gloves", 10, 5)]
+        cases = {
+            "no quotation reference or customer identity signal": rows,
+            "PO item coverage is below the review threshold": rows
+            + [pline(index, f"Unrelated Project Supply {index:02d}", 1, 20) for index in range(2, 6)],
+            "no parsed PO item overlaps this quotation": [pline(1, "Dental Bib", 3, 1)],
+        }
+
+        for reason, po_rows in cases.items():
+            with self.subTest(reason=reason):
+                result = rank_message_to_quotations(message(po_rows), [stranger])
+                self.assertEqual(result.rejection_summary, ((reason, 1),))
+
+    def test_only_quotes_sharing_a_signal_are_candidates(self):
+        index = EligibleQuotationIndex(self.quotes())
+        gloves = canonicalize_message(message([pline(1, "Nitrile Gloves", 10, 5)]))
+        positions = index.candidate_positions(gloves, frozenset())
+        ids = {index.quotes[position].quote_id for position in positions}
+
+        # Gloves lines, plus every quote saved for the buyer's address.
+        self.assertTrue({1, 2, 5, 6}.issubset(ids))
+        self.assertNotIn(8, ids)
+        self.assertIsNone(index.candidate_positions(canonicalize_message(message([])), frozenset()))
+
+    def test_line_identities_are_computed_once_per_line(self):
+        quotes = self.quotes()
+        messages = self.messages()
+        line_count = sum(len(quotation.lines) for quotation in quotes) + sum(len(po.parsed_rows) for po in messages)
+
+        with patch.object(mailbox_po_matching, "_line_identity", wraps=mailbox_po_matching._line_identity) as identity:
+            index = EligibleQuotationIndex(quotes)
+            for _pass in range(2):
+                for po in messages:
+                    rank_message_to_quotations(po, index)
+
+        self.assertEqual(identity.call_count, line_count)
+
+
+# Frozen copy of the all-pairs scorer that ``_similarity_matrix`` replaced,
+# kept verbatim so later changes to the live helpers cannot move the reference.
+def _reference_text_similarity(left: str, right: str) -> float:
+    if not left or not right:
+        return 0.0
+    if left == right:
+        return 1.0
+    if left.replace(" ", "") == right.replace(" ", ""):
+        return 0.99
+    left_tokens = set(left.split())
+    right_tokens = set(right.split())
+    common = left_tokens & right_tokens
+    if not common:
+        return 0.0
+    union = left_tokens | right_tokens
+    jaccard = len(common) / len(union)
+    containment = len(common) / min(len(left_tokens), len(right_tokens))
+    if containment == 1:
+        if min(len(left_tokens), len(right_tokens)) >= 2:
+            containment_score = 0.88
+        elif max(len(left_tokens), len(right_tokens)) <= 2:
+            containment_score = 0.68
+        else:
+            containment_score = 0.55
+    else:
+        containment_score = containment * 0.82
+    sequence = (rapidfuzz_ratio(left, right) / 100.0) * 0.9
+    return min(1.0, max(jaccard, containment_score, sequence))
+
+
+def _reference_identity_similarity(left, right) -> float:
+    comparisons = [
+        (left.normalized_name, right.normalized_name),
+        (left.core_name, right.core_name),
+        (left.normalized_combined, right.normalized_combined),
+        (left.core_combined, right.core_combined),
+        (left.normalized_name, right.normalized_combined),
+        (left.normalized_combined, right.normalized_name),
+    ]
+    best = 0.0
+    for first, second in comparisons:
+        best = max(best, _reference_text_similarity(first, second))
+        if best >= 1.0:
+            return 1.0
+    return best
+
+
+def _pairwise_assign_lines(po_lines, quote_lines):
+    """The all-pairs assignment that ``_similarity_matrix`` replaced."""
+
+    po_identities = tuple(line.identity for line in po_lines)
+    quote_identities = tuple(line.identity for line in quote_lines)
+    edges = []
+    conflict_rows = set()
+    for po_index, (po_line, po_identity) in enumerate(zip(po_lines, po_identities)):
+        for quote_index, (quote_line, quote_identity) in enumerate(zip(quote_lines, quote_identities)):
+            similarity = _reference_identity_similarity(po_identity, quote_identity)
+            if similarity >= 0.56 and mailbox_po_matching._spec_conflict(po_identity, quote_identity):
+                conflict_rows.add(po_index)
+                continue
+            candidate = mailbox_po_matching._edge(
+                po_index,
+                quote_index,
+                po_line,
+                quote_line,
+                po_identity,
+                quote_identity,
+                similarity=similarity,
+            )
+            if candidate:
+                edges.append(candidate)
+    edges.sort(
+        key=lambda item: (
+            item.priority,
+            item.similarity,
+            -item.po_index,
+            -item.quote_index,
+        ),
+        reverse=True,
+    )
+    assigned_po = set()
+    assigned_quote = set()
+    selected = []
+    for candidate in edges:
+        if candidate.po_index in assigned_po or candidate.quote_index in assigned_quote:
+            continue
+        assigned_po.add(candidate.po_index)
+        assigned_quote.add(candidate.quote_index)
+        selected.append(candidate)
+    selected.sort(key=lambda item: item.po_index)
+    return tuple(selected), len(conflict_rows - assigned_po)
+
+
+FIXTURE_NAMES = [
+    "Nitrile Gloves",
+    "Sterile Gauze",
+    "Insulin Syringe",
+    "Elastic Bandage",
+    "Digital Thermometer",
+]
+
+# The PO/quote line sets used by the ranking fixtures above.
+LINE_ASSIGNMENT_FIXTURES = {
+    "single_exact_line": (
+        [pline(1, "Nitrile Gloves", 10, 5)],
+        [qline(11, "Nitrile Gloves", 10, 5)],
+    ),
+    "singular_name": (
+        [pline(1, "Nitrile Glove", 10, 5)],
+        [qline(11, "Nitrile Gloves", 10, 5)],
+    ),
+    "missing_quantity": (
+        [pline(1, "Nitrile Gloves", None, 5)],
+        [qline(11, "Nitrile Gloves", 10, 5)],
+    ),
+    "missing_price": (
+        [pline(1, "Nitrile Gloves", 10, None, total=False)],
+        [qline(11, "Nitrile Gloves", 10, 5)],
+    ),
+    "zero_quantity": (
+        [pline(1, "Nitrile Gloves", 0, 5)],
+        [qline(11, "Nitrile Gloves", 10, 5)],
+    ),
+    "reduced_quantity": (
+        [pline(1, "Nitrile Gloves", 10, 5)],
+        [qline(11, "Nitrile Gloves", 20, 5)],
+    ),
+    "rounded_price": (
+        [pline(1, "Nitrile Gloves", 10, "9.95")],
+        [qline(11, "Nitrile Gloves", 10, 10)],
+    ),
+    "unrelated_line": (
+        [pline(1, "Hand Sanitizer Pouch", 6, 47.53)],
+        [qline(11, "Nitrile Gloves", 10, 5)],
+    ),
+    "compact_volume": (
+        [pline(1, "Nitrile Gloves", 10, 5), pline(2, "Hand Sanitizer 500ml", 4, 20)],
+        [
+            qline(11, "Nitrile Gloves", 10, 5),
+            qline(12, "Hand Sanitizer 500 ml", 4, 20),
+            qline(13, "First Aid Box", 2, 30),
+        ],
+    ),
+    "repriced_pair": (
+        [pline(1, "Nitrile Gloves", 10, 6), pline(2, "Hand Sanitizer", 4, 6)],
+        [qline(11, "Nitrile Gloves", 10, 5), qline(12, "Hand Sanitizer", 4, 5)],
+    ),
+    "prefixed_unit_change": (
+        [pline(1, "Fire staircase evacuation chair", 2, 1450, unit="LS")],
+        [qline(11, "Staircase Evacuation Chair", 2, 1350)],
+    ),
+    "duplicate_quote_lines": (
+        [pline(1, "Pickup Forceps", 1, 15), pline(2, "Pickup Forceps", 1, 15)],
+        [qline(11, "Pickup Forceps", 1, 15), qline(12, "Pickup Forceps", 1, 15)],
+    ),
+    "two_line_order": (
+        [pline(1, "Fire Warden Jacket", 20, 15), pline(2, "Drinking Water 500ml", 30, 1)],
+        [qline(11, "Fire Warden Jacket", 20, 15), qline(12, "Drinking Water 500ml", 30, 1)],
+    ),
+    "numbered_components": (
+        [pline(index, f"First Aid Component {index}", 3 if index < 5 else 1, 5) for index in range(1, 6)],
+        [qline(index, f"First Aid Component {index}", 1, 5) for index in range(1, 6)],
+    ),
+    "metadata_rows": (
+        [pline(index, f"Medical Supply Item {index:02d}", 1, 5, unit="BOT") for index in range(1, 7)]
+        + [pline(100 + index, f"Metadata label {index:02d}", None, None, total=False) for index in range(1, 17)],
+        [qline(index, f"Medical Supply Item {index:02d}", 1, 5) for index in range(1, 30)],
+    ),
+    "names_without_prices": (
+        [pline(1, FIXTURE_NAMES[0], 1, 10)]
+        + [pline(index, name, 1, None, total=False) for index, name in enumerate(FIXTURE_NAMES[1:], start=2)],
+        [qline(index, name, 1, 10) for index, name in enumerate(FIXTURE_NAMES, start=1)],
+    ),
+    "four_of_five_priced": (
+        [
+            pline(index, name, 1, 10 if index <= 4 else None, total=index <= 4)
+            for index, name in enumerate(FIXTURE_NAMES, start=1)
+        ],
+        [qline(index, name, 1, 10) for index, name in enumerate(FIXTURE_NAMES, start=1)],
+    ),
+    "partial_order": (
+        [pline(1, "Nitrile Gloves", 10, 10)],
+        [qline(11, "Nitrile Gloves", 10, 10), qline(12, "Sterile Gauze", 5, 20)],
+    ),
+    "strength_conflict": (
+        [pline(1, "Paracetamol 250 mg Tablet", 10, 5)],
+        [qline(11, "Paracetamol 500 mg Tablet", 10, 5)],
+    ),
+    "common_and_unrelated_items": (
+        [pline(index, f"Common Pharmacy Item {index:02d}", 1, 5) for index in range(1, 13)]
+        + [pline(index, f"Unrelated Project Supply {index:02d}", 1, 20) for index in range(13, 51)],
+        [qline(index, f"Common Pharmacy Item {index:02d}", 1, 5) for index in range(1, 13)]
+        + [qline(index, f"Quote Only Item {index:02d}", 1, 5) for index in range(13, 27)],
+    ),
+    "index_gloves_and_masks": (
+        [pline(1, "Nitrile Gloves", 10, 5), pline(2, "Face Mask 3 Ply", 50, 1)],
+        [
+            qline(11, "Nitrile Gloves", 10, 5),
+            qline(12, "Face Mask 3 Ply", 50, 1),
+            qline(21, "Nitrile Gloves Large", 10, 5),
+        ],
+    ),
+    "split_word": (
+        [pline(1, "Para cetamol 500mg Tablets", 20, 2)],
+        [qline(31, "Paracetamol 500mg Tablets", 20, 2)],
+    ),
+    "unquoted_item": (
+        [pline(1, "Dental Bib", 3, 1)],
+        [qline(41, "Surgical Gown", 5, 30), qline(71, "Alcohol Swab", 100, 0.1), qline(81, "Cotton Roll", 4, 8)],
+    ),
+}
+
+
+ITEM_WORDS = [
+    "nitrile gloves", "glove", "face mask 3 ply", "surgical mask", "paracetamol 500mg tablets",
+    "para cetamol", "alcohol swab", "cotton roll", "gauze swab 10cm x 10cm", "crepe bandage 7.5cm",
+    "syringe 5ml", "syringe 10 ml", "size m", "box 100", "sterile", "blue", "large", "aed device pads",
+]
+
+
+def _random_line(rng, index, factory):
+    name = " ".join(rng.sample(ITEM_WORDS, rng.randint(1, 3)))
+    description = rng.choice(["", "", rng.choice(ITEM_WORDS)])
+    return factory(index, name.title(), rng.choice([None, 1, 5, 10]), rng.choice([None, 2, 5]), description=description)
+
+
+class LineAssignmentParityTests(TestCase):
+    def test_matrix_assignment_matches_pairwise_assignment_on_every_fixture(self):
+        for name, (po_lines, quote_lines) in LINE_ASSIGNMENT_FIXTURES.items():
+            with self.subTest(fixture=name):
+                self.assertEqual(
+                    mailbox_po_matching._assign_lines(tuple(po_lines), tuple(quote_lines)),
+                    _pairwise_assign_lines(tuple(po_lines), tuple(quote_lines)),
+                )
+
+    def test_matrix_assignment_matches_pairwise_assignment_on_random_lines(self):
+        rng = random.Random(19)
+        for case in range(200):
+            po_lines = tuple(_random_line(rng, index, pline) for index in range(rng.randint(0, 8)))
+            quote_lines = tuple(_random_line(rng, index, qline) for index in range(rng.randint(0, 8)))
+            with self.subTest(case=case):
+                self.assertEqual(
+                    mailbox_po_matching._assign_lines(po_lines, quote_lines),
+                    _pairwise_assign_lines(po_lines, quote_lines),
+                )
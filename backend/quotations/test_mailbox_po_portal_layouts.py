@@ -1,8 +1,14 @@
+import json
 from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
 
+from django.core.management import call_command
 from django.test import SimpleTestCase
 
+from quotations import mailbox_po_reconciliation
 from quotations.mailbox_po_reconciliation import (
+    PORTAL_LAYOUTS,
     _al_sahel_order_rows,
     _dubai_holding_order_rows,
     _document_total,
@@ -11,7 +17,10 @@ from quotations.mailbox_po_reconciliation import (
     _hotel_procurement_order_rows,
     _khansaheb_order_rows,
     _raq_order_rows,
+    detect_portal_layouts,
+    register_portal_layout,
 )
+from quotations.portal_layout_benchmark import load_portal_layout_corpus, run_portal_layout_benchmark
 
 
 class MailboxPOPortalLayoutTests(SimpleTestCase):
@@ -448,3 +457,49 @@ class MailboxPOPortalLayoutTests(SimpleTestCase):
         self.assertEqual(rows[0].name, "Fire staircase evacuation chair")
         self.assertEqual(rows[0].description, "QTN NO: 260513")
         self.assertEqual(rows[0].quantity, Decimal("2.00"))
+
+    def test_signatures_select_only_the_documents_layout(self):
+        for document_id, document in load_portal_layout_corpus().items():
+            with self.subTest(document=document_id):
+                detected = [layout.name for layout in detect_portal_layouts(document["text"])]
+                expected = [] if document["layout"] == "none" else [document["layout"]]
+                self.assertEqual(detected, expected)
+
+    def test_signatures_tolerate_case_and_whitespace_runs(self):
+        detected = detect_portal_layouts("ENGINEERING\u00a0 Contracting\nCO. LLC")
+        self.assertEqual([layout.name for layout in detected], ["ecc"])
+
+    def test_registered_layout_is_dispatched_after_existing_layouts(self):
+        def parse_rows(text, *, source):
+            return True, (), ("Acme portal recognized.",)
+
+        with patch.object(mailbox_po_reconciliation, "PORTAL_LAYOUTS", list(PORTAL_LAYOUTS)):
+            register_portal_layout("acme", signatures=("Acme Portal",), parse_rows=parse_rows)
+            with self.assertRaisesMessage(ValueError, "already registered"):
+                register_portal_layout("acme", signatures=("Acme",), parse_rows=parse_rows)
+            self.assertEqual(
+                mailbox_po_reconciliation._portal_order_rows("acme   portal\nPO 7", source="acme.pdf"),
+                (True, (), ("Acme portal recognized.",)),
+            )
+        mailbox_po_reconciliation._portal_signature_pattern.cache_clear()
+        mailbox_po_reconciliation.portal_layouts_for.cache_clear()
+        self.assertEqual(detect_portal_layouts("Acme Portal"), ())
+
+    def test_benchmark_matches_sequential_parsing_for_every_layout(self):
+        report = run_portal_layout_benchmark(repeats=1)
+
+        self.assertTrue(report["passed"], report["mismatches"])
+        layouts = {row["layout"]: row for row in report["layouts"]}
+        self.assertEqual(
+            set(layouts),
+            {"hotel", "raq", "khansaheb", "dubai_holding", "ecc", "al_sahel", "emrill", "none"},
+        )
+        self.assertEqual(layouts["none"]["dispatched_parser_calls"], 0)
+        for row in layouts.values():
+            self.assertLess(row["dispatched_parser_calls"], row["sequential_parser_calls"])
+
+    def test_benchmark_command_prints_a_json_report(self):
+        stdout = StringIO()
+        call_command("benchmark_portal_layouts", "--repeats", "1", stdout=stdout)
+
+        self.assertTrue(json.loads(stdout.getvalue())["passed"])
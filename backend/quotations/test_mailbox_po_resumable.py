@@ -1,14 +1,22 @@
+import multiprocessing
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from datetime import timedelta
 from decimal import Decimal
+from types import SimpleNamespace
 from unittest.mock import patch
 
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import TestCase, override_settings
 from django.utils import timezone
 
 from . import mailbox_po_reconciliation
 from .mailbox_po_reconciliation import (
     MailboxPOMatchBusy,
+    current_eligible_quotation_snapshot,
+    document_variants,
+    eligible_quotations,
+    reconcile_mailbox_po_audit,
     reconcile_mailbox_po_audit_page,
 )
 from .models import (
@@ -16,7 +24,9 @@ from .models import (
     GmailOAuthConnection,
     MailboxPOAuditRun,
     MailboxPOAuditRunMessage,
+    MailboxPODocumentVariantCache,
     MailboxPOMatchRun,
+    MailboxPOMatchRunMessage,
     MailboxPOMessage,
     Quotation,
     QuotationLPO,
@@ -62,7 +72,8 @@ class ResumableMailboxPOMatchingTests(TestCase):
             completed_at=timezone.now(),
         )
 
-    def add_message(self, suffix, *, warnings=None):
+    def add_message(self, suffix, *, warnings=None, item="Nitrile Gloves Blue Size M Box 100", quote=None):
+        quote = quote or self.quote
         message = MailboxPOMessage.objects.create(
             gmail_connection=self.connection,
             gmail_message_id=f"resume-{suffix}",
@@ -80,14 +91,14 @@ class ResumableMailboxPOMatchingTests(TestCase):
                     "status": "parsed",
                     "source_sha256": f"{int(suffix):064x}",
                     "original_text": (
-                        f"Purchase Order for {self.quote.quotation_number}\n"
-                        "Nitrile Gloves Blue Size M Box 100\nGrand Total: AED 100.00"
+                        f"Purchase Order for {quote.quotation_number}\n"
+                        f"{item}\nGrand Total: AED 100.00"
                     ),
                     "totals": {"grand_total": "100.00"},
                     "warnings": list(warnings or []),
                     "lines": [
                         {
-                            "raw_name": "Nitrile Gloves Blue Size M Box 100",
+                            "raw_name": item,
                             "quantity": "10",
                             "unit_price": "10",
                             "line_total": "100",
@@ -187,7 +198,7 @@ class ResumableMailboxPOMatchingTests(TestCase):
                 lease_token="replacement-worker",
                 lease_expires_at=timezone.now() + timedelta(seconds=60),
             )
-            return (), False, 1
+            return (), False, 1, ()
 
         with patch(
             "quotations.mailbox_po_reconciliation._proposals_for_message",
@@ -207,6 +218,301 @@ class ResumableMailboxPOMatchingTests(TestCase):
         self.assertEqual(match_run.summary["relevant_messages"], 0)
         self.assertEqual(QuotationPOEvidence.objects.count(), 0)
 
+    def test_draining_pages_builds_the_quotation_snapshot_once(self):
+        self.add_message(1)
+        self.add_message(2)
+        self.add_message(3)
+
+        with patch.object(
+            mailbox_po_reconciliation,
+            "eligible_quotations",
+            wraps=eligible_quotations,
+        ) as build:
+            match_run = None
+            for _page in range(3):
+                match_run = reconcile_mailbox_po_audit_page(
+                    self.audit,
+                    requested_by=self.staff,
+                    match_run=match_run,
+                    page_size=1,
+                )
+            self.assertEqual(match_run.status, MailboxPOMatchRun.STATUS_COMPLETED)
+            self.assertEqual(build.call_count, 1)
+
+            line = self.quote.lines.get()
+            line.quantity = Decimal("12")
+            line.save()
+            snapshot = current_eligible_quotation_snapshot()
+
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(snapshot.quotes[0].lines[0].quantity, Decimal("12"))
+        self.assertIs(current_eligible_quotation_snapshot(), snapshot)
+
+    def test_quotation_snapshot_is_reused_from_disk_by_a_new_process(self):
+        with tempfile.TemporaryDirectory() as directory, override_settings(
+            QUOTATION_MAILBOX_QUOTE_SNAPSHOT_DIR=directory
+        ):
+            built = current_eligible_quotation_snapshot()
+            with patch.object(mailbox_po_reconciliation, "_eligible_quotation_snapshot", None), patch.object(
+                mailbox_po_reconciliation,
+                "eligible_quotations",
+                side_effect=AssertionError("snapshot should load from disk"),
+            ):
+                loaded = current_eligible_quotation_snapshot()
+
+        self.assertIsNot(loaded, built)
+        self.assertEqual(loaded.quotes, built.quotes)
+        self.assertEqual(len(loaded.index), 1)
+
+    def _evidence_rows(self):
+        return sorted(
+            QuotationPOEvidence.objects.values_list(
+                "quotation_id",
+                "source_key",
+                "status",
+                "confidence",
+                "matching_reason",
+                "match_signals",
+            )
+        )
+
+    def test_parallel_drain_stores_the_same_evidence_as_serial(self):
+        for index in range(1, 5):
+            self.add_message(index)
+        self.add_message(5, warnings=("OCR confidence was low on the quantity column.",))
+
+        serial = reconcile_mailbox_po_audit(self.audit, requested_by=self.staff, page_size=2)
+        serial_rows = self._evidence_rows()
+        QuotationPOEvidence.objects.all().delete()
+        MailboxPOMatchRun.objects.all().delete()
+
+        with patch.object(
+            mailbox_po_reconciliation,
+            "ProcessPoolExecutor",
+            wraps=ProcessPoolExecutor,
+        ) as executor:
+            parallel = reconcile_mailbox_po_audit(
+                self.audit,
+                requested_by=self.staff,
+                page_size=2,
+                workers=2,
+            )
+
+        # A daemonic test runner process cannot start the pool and ranks inline.
+        self.assertEqual(executor.call_count, 0 if multiprocessing.current_process().daemon else 1)
+        self.assertEqual(parallel.status, MailboxPOMatchRun.STATUS_COMPLETED)
+        self.assertEqual(parallel.summary, serial.summary)
+        self.assertEqual(parallel.errors, serial.errors)
+        self.assertEqual(len(serial_rows), 5)
+        self.assertEqual(self._evidence_rows(), serial_rows)
+
+    def test_parallel_drain_ranks_inline_when_the_pool_cannot_run(self):
+        for index in range(1, 4):
+            self.add_message(index)
+        serial = reconcile_mailbox_po_audit(self.audit, requested_by=self.staff, page_size=2)
+        serial_rows = self._evidence_rows()
+
+        blockers = {
+            "daemonic parent": patch.object(
+                mailbox_po_reconciliation.multiprocessing,
+                "current_process",
+                return_value=SimpleNamespace(daemon=True),
+            ),
+            "startup failure": patch.object(
+                mailbox_po_reconciliation.ProcessPoolExecutor,
+                "submit",
+                side_effect=OSError("cannot fork"),
+            ),
+        }
+        for label, blocker in blockers.items():
+            with self.subTest(label):
+                QuotationPOEvidence.objects.all().delete()
+                MailboxPOMatchRun.objects.all().delete()
+                with blocker:
+                    parallel = reconcile_mailbox_po_audit(
+                        self.audit,
+                        requested_by=self.staff,
+                        page_size=2,
+                        workers=2,
+                    )
+
+                self.assertEqual(parallel.status, MailboxPOMatchRun.STATUS_COMPLETED)
+                self.assertEqual(parallel.summary, serial.summary)
+                self.assertEqual(parallel.errors, [])
+                self.assertEqual(self._evidence_rows(), serial_rows)
+
+    def _active_evidence(self):
+        return sorted(
+            QuotationPOEvidence.objects.exclude(status=QuotationPOEvidence.STATUS_SUPERSEDED).values_list(
+                "mailbox_match_run_id",
+                "quotation_id",
+                "source_key",
+                "status",
+                "confidence",
+                "match_signals",
+            )
+        )
+
+    def test_delta_run_reranks_only_new_messages_and_matches_a_full_run(self):
+        for index in range(1, 4):
+            self.add_message(index)
+        baseline = reconcile_mailbox_po_audit(self.audit, requested_by=self.staff, page_size=2)
+        self.assertEqual(baseline.mode, MailboxPOMatchRun.MODE_FULL)
+        self.assertEqual(baseline.message_results.count(), 3)
+
+        masks = Quotation.objects.create(
+            company=self.quote.company,
+            quotation_number="QT-20260712-0002",
+            status=Quotation.STATUS_SENT,
+            sent_at=self.sent_at,
+            subtotal=Decimal("100.00"),
+            total=Decimal("100.00"),
+            created_by=self.staff,
+        )
+        QuotationLine.objects.create(
+            quotation=masks,
+            item_name_snapshot="Surgical Face Masks 3 Ply Box 50",
+            quantity=Decimal("10"),
+            unit_price=Decimal("10"),
+        )
+        self.add_message(4)
+        self.add_message(5, item="Surgical Face Masks 3 Ply Box 50", quote=masks)
+
+        with patch.object(
+            mailbox_po_reconciliation,
+            "_proposals_for_message",
+            wraps=mailbox_po_reconciliation._proposals_for_message,
+        ) as rank:
+            delta = reconcile_mailbox_po_audit(
+                self.audit,
+                requested_by=self.staff,
+                page_size=2,
+                delta=True,
+            )
+
+        self.assertEqual(delta.mode, MailboxPOMatchRun.MODE_DELTA)
+        self.assertEqual(delta.baseline_run, baseline)
+        self.assertEqual(
+            sorted(call.args[0].gmail_message_id for call in rank.call_args_list),
+            ["resume-4", "resume-5"],
+        )
+        self.assertEqual(delta.summary["delta_carried_messages"], 3)
+        self.assertEqual(delta.summary["delta_reranked_messages"], 2)
+        delta_evidence = self._active_evidence()
+        self.assertEqual({row[0] for row in delta_evidence}, {delta.id})
+        self.assertEqual({row[1] for row in delta_evidence}, {self.quote.id, masks.id})
+
+        full = reconcile_mailbox_po_audit(self.audit, requested_by=self.staff, page_size=2)
+
+        def comparable(summary):
+            return {
+                key: value
+                for key, value in summary.items()
+                if not key.startswith("delta_") and key not in {"evidence_created", "evidence_updated"}
+            }
+
+        self.assertEqual(comparable(full.summary), comparable(delta.summary))
+        self.assertEqual(
+            [row[1:] for row in self._active_evidence()],
+            [row[1:] for row in delta_evidence],
+        )
+
+    def test_delta_run_reranks_old_messages_against_a_changed_quotation(self):
+        self.add_message(1)
+        message = self.add_message(2)
+        reconcile_mailbox_po_audit(self.audit, requested_by=self.staff)
+
+        line = self.quote.lines.get()
+        line.quantity = Decimal("12")
+        line.save()
+        message.subject = "Revised purchase order attached"
+        message.save(update_fields=["subject", "updated_at"])
+
+        with patch.object(
+            mailbox_po_reconciliation,
+            "_proposals_for_message",
+            wraps=mailbox_po_reconciliation._proposals_for_message,
+        ) as rank:
+            delta = reconcile_mailbox_po_audit(self.audit, requested_by=self.staff, delta=True)
+
+        self.assertEqual(rank.call_count, 2)
+        self.assertEqual(delta.summary["delta_carried_messages"], 0)
+        self.assertFalse(delta.message_results.filter(carried=True).exists())
+        self.assertEqual(
+            MailboxPOMatchRunMessage.objects.get(match_run=delta, message=message).input_sha256,
+            mailbox_po_reconciliation.mailbox_message_fingerprint(message),
+        )
+
+    def test_delta_without_a_reusable_baseline_runs_in_full(self):
+        self.add_message(1)
+
+        match_run = reconcile_mailbox_po_audit(self.audit, requested_by=self.staff, delta=True)
+
+        self.assertEqual(match_run.mode, MailboxPOMatchRun.MODE_FULL)
+        self.assertIsNone(match_run.baseline_run)
+        self.assertEqual(match_run.message_results.get().outcome, MailboxPOMatchRunMessage.OUTCOME_AMBIGUOUS)
+        self.assertEqual(set(match_run.quote_fingerprints), {str(self.quote.id)})
+
+    def test_cached_document_variants_round_trip_exactly(self):
+        messages = [
+            self.add_message(1),
+            self.add_message(2, warnings=("OCR confidence was low on the quantity column.",)),
+        ]
+        messages[1].newest_body_text = "Please proceed with LPO-778\nNitrile Gloves Blue Size M Box 100 - 10 box"
+        messages[1].save(update_fields=["newest_body_text", "updated_at"])
+
+        for message in messages:
+            variants = document_variants(message)
+            with self.subTest(message=message.gmail_message_id):
+                self.assertTrue(variants)
+                self.assertEqual(
+                    tuple(
+                        mailbox_po_reconciliation._variant_from_cache(mailbox_po_reconciliation._variant_to_cache(variant))
+                        for variant in variants
+                    ),
+                    variants,
+                )
+
+    def test_repeat_match_runs_reuse_parsed_document_variants(self):
+        message = self.add_message(1)
+        self.add_message(2)
+        first = reconcile_mailbox_po_audit(self.audit, requested_by=self.staff)
+        self.assertEqual(MailboxPODocumentVariantCache.objects.count(), 2)
+        first_evidence = self._evidence_rows()
+
+        with patch.object(
+            mailbox_po_reconciliation,
+            "document_variants",
+            side_effect=AssertionError("cached variants should be reused"),
+        ):
+            second = reconcile_mailbox_po_audit(self.audit, requested_by=self.staff)
+
+        self.assertEqual(second.summary["document_variants"], first.summary["document_variants"])
+        self.assertEqual(self._evidence_rows(), first_evidence)
+
+        message.subject = "Revised purchase order attached"
+        message.save(update_fields=["subject", "updated_at"])
+        with patch.object(
+            mailbox_po_reconciliation,
+            "document_variants",
+            wraps=document_variants,
+        ) as parse:
+            reconcile_mailbox_po_audit(self.audit, requested_by=self.staff)
+            self.assertEqual([call.args[0].id for call in parse.call_args_list], [message.id])
+
+            with patch.object(
+                mailbox_po_reconciliation,
+                "document_variant_parser_version",
+                return_value="0" * 64,
+            ):
+                reconcile_mailbox_po_audit(self.audit, requested_by=self.staff)
+            self.assertEqual(parse.call_count, 3)
+
+        self.assertEqual(
+            set(MailboxPODocumentVariantCache.objects.values_list("parser_version", flat=True)),
+            {"0" * 64},
+        )
+
     def test_stale_worker_cannot_mark_replacement_lease_failed(self):
         self.add_message(1)
 
@@ -0,0 +1,57 @@
+import json
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from .mailbox_po_reconciliation import document_variants
+from .mailbox_reconciliation_benchmark import build_synthetic_mailbox, run_mailbox_reconciliation_benchmark
+from .models import MailboxPOMessage, Quotation, QuotationPOEvidence
+
+
+class MailboxReconciliationBenchmarkTests(TestCase):
+    def test_synthetic_mailbox_covers_every_message_style(self):
+        audit_run, _user, style_counts = build_synthetic_mailbox(40, 24, seed=5)
+
+        self.assertEqual(sum(style_counts.values()), 40)
+        self.assertTrue(all(style_counts.values()), style_counts)
+        self.assertEqual(Quotation.objects.filter(status=Quotation.STATUS_SENT).count(), 24)
+        messages = MailboxPOMessage.objects.filter(last_seen_run=audit_run)
+        self.assertEqual(messages.count(), 40)
+        self.assertTrue(all(document_variants(message) for message in messages))
+
+    def test_report_measures_a_completed_run_and_rolls_back(self):
+        report = run_mailbox_reconciliation_benchmark(message_count=30, quotation_count=20, seed=3, page_size=7)
+
+        self.assertTrue(report["passed"], report["violations"])
+        self.assertEqual(report["status"], "completed")
+        self.assertEqual(report["summary"]["relevant_messages"], 30)
+        self.assertEqual(report["pages"], 5)
+        self.assertGreater(report["summary"]["decisive_messages"], 0)
+        self.assertEqual(
+            report["comparisons"],
+            report["summary"]["document_variants"] * report["summary"]["eligible_quotations"],
+        )
+        self.assertLessEqual(report["page_p50_ms"], report["page_max_ms"])
+        self.assertFalse(MailboxPOMessage.objects.exists())
+        self.assertFalse(QuotationPOEvidence.objects.exists())
+
+    def test_command_prints_json_and_fails_over_the_page_budget(self):
+        stdout = StringIO()
+        call_command("benchmark_mailbox_reconciliation", "--messages", "10", "--quotations", "10", stdout=stdout)
+        self.assertTrue(json.loads(stdout.getvalue())["passed"])
+
+        with self.assertRaisesMessage(CommandError, "page budget"):
+            call_command(
+                "benchmark_mailbox_reconciliation",
+                "--messages",
+                "10",
+                "--quotations",
+                "10",
+                "--max-page-seconds",
+                "0",
+                stdout=StringIO(),
+            )
+        with self.assertRaisesMessage(CommandError, "--page-size"):
+            call_command("benchmark_mailbox_reconciliation", "--page-size", "0", stdout=StringIO())
@@ -0,0 +1,104 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from api.models import Product
+
+from .matching_benchmark import (
+    DEFAULT_BUDGETS,
+    MatchingBudget,
+    benchmark_lines,
+    build_synthetic_catalog,
+    check_budgets,
+    load_budgets,
+    run_matching_benchmark,
+)
+from .models import CompanyPriceHistory, ProductAlias
+
+
+class ProductMatchingBenchmarkTests(TestCase):
+    def test_synthetic_catalog_has_aliases_history_and_current_identities(self):
+        company, products, aliases = build_synthetic_catalog(120, seed=7)
+
+        self.assertEqual(Product.objects.count(), 120)
+        self.assertFalse(Product.objects.filter(identity_version=0).exists())
+        self.assertEqual(len(aliases), ProductAlias.objects.count())
+        self.assertTrue(ProductAlias.objects.filter(company=company).exists())
+        self.assertTrue(ProductAlias.objects.filter(company__isnull=True).exists())
+        self.assertEqual(CompanyPriceHistory.objects.filter(company=company).count(), 120)
+        lines = benchmark_lines(products, aliases, 30, seed=7)
+        self.assertEqual(len(lines), 30)
+        self.assertTrue(any(line.get("sku") for line in lines))
+
+    def test_report_covers_every_operation_and_rolls_back(self):
+        report = run_matching_benchmark([60], line_count=10, seed=3)
+
+        self.assertTrue(report["passed"], report["violations"])
+        self.assertFalse(Product.objects.exists())
+        operations = report["catalogs"][0]["operations"]
+        self.assertEqual([result["operation"] for result in operations], list(DEFAULT_BUDGETS))
+        for result in operations:
+            self.assertEqual(result["lines"], 10)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"])
+            self.assertGreater(result["queries_per_line"], 0)
+
+    def test_warm_matching_stays_within_the_default_query_budget(self):
+        report = run_matching_benchmark([200], line_count=40, seed=11)
+        suggest = report["catalogs"][0]["operations"][0]
+
+        self.assertLessEqual(suggest["queries_per_line"], DEFAULT_BUDGETS["suggest_product_for_text"].queries_per_line)
+
+    def test_budget_violations_are_reported(self):
+        report = {
+            "catalogs": [
+                {
+                    "catalog_size": 1000,
+                    "operations": [
+                        {"operation": "suggest_product_for_text", "p95_ms": 12.0, "queries_per_line": 4.5},
+                    ],
+                }
+            ]
+        }
+
+        violations = check_budgets(report, {"suggest_product_for_text": MatchingBudget(p95_ms=10, queries_per_line=4)})
+
+        self.assertEqual(len(violations), 2)
+        self.assertIn("suggest_product_for_text at 1000 Products", violations[0])
+
+    def test_budget_file_and_overrides(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "budgets.json"
+            path.write_text(json.dumps({"create_or_reuse_product": {"p95_ms": 900}}), encoding="utf-8")
+
+            budgets = load_budgets(path, max_queries_per_line=3)
+
+            self.assertEqual(budgets["create_or_reuse_product"].p95_ms, 900)
+            self.assertEqual({budget.queries_per_line for budget in budgets.values()}, {3})
+
+            path.write_text(json.dumps({"unknown": {}}), encoding="utf-8")
+            with self.assertRaisesMessage(ValueError, "Unknown benchmark operation"):
+                load_budgets(path)
+
+    def test_command_prints_json_and_fails_over_budget(self):
+        stdout = StringIO()
+        call_command("benchmark_product_matching", "--sizes", "40", "--lines", "5", stdout=stdout)
+        self.assertTrue(json.loads(stdout.getvalue())["passed"])
+
+        with self.assertRaisesMessage(CommandError, "budget exceeded"):
+            call_command(
+                "benchmark_product_matching",
+                "--sizes",
+                "40",
+                "--lines",
+                "5",
+                "--max-queries-per-line",
+                "0",
+                stdout=StringIO(),
+            )
+        with self.assertRaisesMessage(CommandError, "--sizes"):
+            call_command("benchmark_product_matching", "--sizes", "ten", stdout=StringIO())
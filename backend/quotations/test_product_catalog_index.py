@@ -0,0 +1,462 @@
+import importlib
+import random
+from contextlib import nullcontext
+from decimal import Decimal
+from io import StringIO
+from types import SimpleNamespace
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from api.models import Brand, Product
+
+from . import matching
+from .matching import (
+    CATALOG_POOL_LIMIT,
+    _LiveMatchLookups,
+    PRODUCT_IDENTITY_VERSION,
+    CompanyHistoryMatchContext,
+    _catalog_pool,
+    _trigram_catalog_ids,
+    create_managed_product_alias,
+    create_product_alias,
+    current_alias_indexes,
+    current_catalog_index,
+    identities_compatible,
+    identity_fingerprint_key,
+    item_identity,
+    product_identity,
+    suggest_product_for_text,
+    suggest_products_for_lines,
+    trigram_search_enabled,
+)
+from .models import Company, ProductAlias
+
+
+class ProductCatalogIndexTests(TestCase):
+    def product(self, name, **kwargs):
+        return Product.objects.create(
+            name=name,
+            price=Decimal("1.00"),
+            status=kwargs.pop("status", "draft"),
+            **kwargs,
+        )
+
+    def test_warm_index_resolves_the_pool_with_only_the_version_check(self):
+        product = self.product("Index Gauze Swab", active_ingredient="Cotton")
+        requested = item_identity("gauze swab")
+        current_catalog_index()
+
+        with self.assertNumQueries(1):
+            pool = _catalog_pool(requested, "gauze swab")
+
+        self.assertEqual(pool, [product])
+
+    def test_pool_keeps_icontains_infix_and_ingredient_semantics(self):
+        by_infix = self.product("Paracetamol Syrup")
+        by_ingredient = self.product("Fever Relief", active_ingredient="Paracetamol")
+        self.product("Unrelated Bandage")
+
+        pool = _catalog_pool(item_identity("cetamol"), "cetamol")
+
+        self.assertEqual(pool, [by_ingredient, by_infix])
+
+    def test_product_writes_invalidate_the_index(self):
+        requested = item_identity("index oximeter")
+        self.assertEqual(_catalog_pool(requested, "index oximeter"), [])
+
+        product = self.product("Index Oximeter")
+        self.assertEqual(_catalog_pool(requested, "index oximeter"), [product])
+
+        product.status = "archived"
+        product.save(update_fields=["status"])
+        self.assertEqual(_catalog_pool(requested, "index oximeter"), [])
+
+    def test_bulk_writes_are_seen_through_the_database_watermark(self):
+        current_catalog_index()
+        Product.objects.bulk_create([Product(name="Bulk Index Lancet", price=Decimal("1.00"), status="draft")])
+
+        pool = _catalog_pool(item_identity("bulk index lancet"), "Bulk Index Lancet")
+
+        self.assertEqual([product.name for product in pool], ["Bulk Index Lancet"])
+
+    def test_canonical_match_is_not_lost_beyond_the_bounded_pool(self):
+        Product.objects.bulk_create(
+            [
+                Product(name=f"Azinc Filler {index:03d}", price=Decimal("1.00"), status="draft")
+                for index in range(CATALOG_POOL_LIMIT)
+            ]
+        )
+        target = self.product("Zinc")
+
+        self.assertNotIn(target, _catalog_pool(item_identity("zinc"), "zinc"))
+
+        match = suggest_product_for_text("ZINC")
+
+        self.assertEqual(match.product, target)
+        self.assertEqual(match.method, "canonical_name")
+
+
+    def test_matches_return_fresh_rows_instead_of_the_shared_snapshot(self):
+        brand = Brand.objects.create(name="Index Brand")
+        product = self.product("Index Thermometer", brand=brand)
+        other = self.product("Index Thermometer Digital")
+        catalog = current_catalog_index()
+        # Stock saves, bulk merges and Brand renames leave the watermark alone.
+        Product.objects.filter(pk=product.pk).update(stock_quantity=7, price=Decimal("2.50"))
+        Brand.objects.filter(pk=brand.pk).update(name="Renamed Brand")
+        self.assertIs(current_catalog_index(), catalog)
+
+        live = suggest_product_for_text("Index Thermometer")
+        with self.assertNumQueries(1):
+            matching._refetch_catalog_products([matching.ProductMatch(catalog.product(other.pk), 0.9, "fuzzy_name", "")], catalog)
+        batch = suggest_products_for_lines([{"raw_text": "Index Thermometer"}, {"raw_text": "index thermometer"}])
+
+        for match in [live, *batch]:
+            with self.subTest(match=match):
+                self.assertEqual(match.product, product)
+                self.assertIsNot(match.product, catalog.product(product.pk))
+                self.assertEqual(match.product.stock_quantity, 7)
+                self.assertEqual(match.product.price, Decimal("2.50"))
+                self.assertEqual(match.product.brand.name, "Renamed Brand")
+                self.assertFalse(any(catalog.shares(candidate.product) for candidate in match.candidates))
+        self.assertIs(batch[0].product, batch[1].product)
+
+class ProductAliasIndexTests(TestCase):
+    def setUp(self):
+        self.company = Company.objects.create(name="Alias Index Clinic")
+
+    def product(self, name, **kwargs):
+        return Product.objects.create(name=name, price=Decimal("1.00"), status=kwargs.pop("status", "draft"), **kwargs)
+
+    def test_warm_indexes_answer_both_scopes_with_one_alias_query(self):
+        product = self.product("Alias Index Dressing")
+        ProductAlias.objects.create(company=self.company, product=product, alias="ward dressing")
+        ProductAlias.objects.create(company=None, product=product, alias="pcs dressing")
+        current_alias_indexes(self.company, None)
+        current_catalog_index()
+        lookups = _LiveMatchLookups()
+
+        with self.assertNumQueries(2):
+            company_aliases = lookups.aliases("ward dressing", self.company)
+            global_aliases = lookups.aliases("piece dressing", None)
+
+        self.assertEqual([alias.product for alias in company_aliases], [product])
+        self.assertEqual([alias.alias for alias in global_aliases], ["pcs dressing"])
+
+    def test_writers_invalidate_the_scope_index(self):
+        product = self.product("Alias Index Syringe")
+        self.assertNotEqual(matching.suggest_product_for_text("ward syringe", self.company).method, "company_alias")
+        generation = matching._alias_generation
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_managed_product_alias(company=self.company, product=product, alias_text="ward syringe")
+
+        self.assertGreater(matching._alias_generation, generation)
+        self.assertEqual(matching.suggest_product_for_text("ward syringe", self.company).method, "company_alias")
+
+    def test_archived_products_and_retired_aliases_are_skipped_without_rebuild(self):
+        product = self.product("Alias Index Lancet")
+        retired = self.product("Alias Index Retired")
+        ProductAlias.objects.create(company=self.company, product=product, alias="finger lancet")
+        ProductAlias.objects.create(company=self.company, product=retired, alias="old lancet", is_active=False)
+        self.assertEqual(matching.suggest_product_for_text("finger lancet", self.company).product, product)
+        self.assertNotEqual(matching.suggest_product_for_text("old lancet", self.company).method, "company_alias")
+
+        Product.objects.filter(pk=product.pk).update(status="archived")
+
+        self.assertNotEqual(matching.suggest_product_for_text("finger lancet", self.company).method, "company_alias")
+
+    def test_cached_conflicts_and_writer_conflict_checks_are_unchanged(self):
+        first = self.product("Alias Index Gauze A")
+        second = self.product("Alias Index Gauze B")
+        ProductAlias.objects.create(company=self.company, product=first, alias="gauze-roll")
+        ProductAlias.objects.create(company=self.company, product=second, alias="gauze roll!")
+
+        match = matching.suggest_product_for_text("Gauze Roll", self.company)
+
+        self.assertEqual(match.method, "alias_conflict")
+        self.assertEqual({candidate.product for candidate in match.candidates}, {first, second})
+        with self.assertRaises(ValidationError):
+            create_product_alias(alias_text="gauze  roll", product=second, company=self.company)
+
+
+class TrigramCandidateRetrievalTests(TestCase):
+    def product(self, name, **kwargs):
+        return Product.objects.create(name=name, price=Decimal("1.00"), status=kwargs.pop("status", "draft"), **kwargs)
+
+    @override_settings(QUOTATION_PRODUCT_TRIGRAM_SEARCH_ENABLED=True)
+    def test_sqlite_keeps_the_substring_pool(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("SQLite fallback only.")
+        product = self.product("Trigram Gauze Roll")
+
+        self.assertFalse(trigram_search_enabled())
+        self.assertEqual(_catalog_pool(item_identity("gauze"), "gauze"), [product])
+
+    def test_ranked_ids_follow_exact_names_and_skip_unmatchable_rows(self):
+        exact = self.product("Gauze")
+        first = self.product("Sterile Gauze Swab")
+        second = self.product("Gauze Roll")
+        archived = self.product("Gauze Pad", status="archived")
+
+        with (
+            patch.object(matching, "trigram_search_enabled", return_value=True),
+            patch.object(matching, "_trigram_catalog_ids", return_value=[first.id, archived.id, 0, second.id, exact.id]),
+        ):
+            pool = _catalog_pool(item_identity("gauze"), "Gauze")
+
+        self.assertEqual(pool, [exact, first, second])
+
+    @skipUnless(connection.vendor == "postgresql", "pg_trgm requires PostgreSQL.")
+    def test_postgres_orders_candidates_by_word_similarity(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            if cursor.fetchone() is None:
+                self.skipTest("pg_trgm is not installed.")
+        close = self.product("Crepe Bandage 10cm")
+        closer = self.product("Crepe Bandage")
+        self.product("Cotton Wool")
+
+        ids = _trigram_catalog_ids(item_identity("crepe bandage"), "crepe bandage")
+
+        self.assertEqual(ids[:2], [closer.id, close.id])
+
+
+class _FakeCursor:
+    def __init__(self, results):
+        self.results = list(results)
+        self.statements = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def execute(self, sql):
+        self.statements.append(sql)
+
+    def fetchone(self):
+        return self.results.pop(0)
+
+
+class TrigramMigrationTests(SimpleTestCase):
+    migration = importlib.import_module("quotations.migrations.0043_product_match_trigram_indexes")
+
+    def schema_editor(self, cursor_results, execute=None):
+        cursor = _FakeCursor(cursor_results)
+        editor = SimpleNamespace(
+            connection=SimpleNamespace(vendor="postgresql", alias="default", cursor=lambda: cursor),
+            executed=[],
+            quote_name=lambda name: f'"{name}"',
+        )
+        editor.execute = execute or editor.executed.append
+        return editor
+
+    def test_installed_extension_only_adds_the_indexes(self):
+        editor = self.schema_editor([(1,)])
+
+        self.migration.create_trigram_indexes(None, editor)
+
+        self.assertEqual(len(editor.executed), len(self.migration.TRIGRAM_INDEXES))
+        self.assertFalse(any("CREATE EXTENSION" in sql for sql in editor.executed))
+
+    def test_role_without_create_privilege_skips_with_a_note(self):
+        editor = self.schema_editor([None, (1,), (False,)])
+
+        with self.assertLogs(self.migration.logger, "WARNING") as logs:
+            self.migration.create_trigram_indexes(None, editor)
+
+        self.assertEqual(editor.executed, [])
+        self.assertIn("cannot CREATE EXTENSION", logs.output[0])
+
+    def test_refused_create_extension_skips_the_indexes(self):
+        def refuse(sql):
+            raise DatabaseError("permission denied to create extension")
+
+        editor = self.schema_editor([None, (1,), (True,)], execute=refuse)
+
+        with patch.object(self.migration.transaction, "atomic", return_value=nullcontext()):
+            with self.assertLogs(self.migration.logger, "WARNING") as logs:
+                self.migration.create_trigram_indexes(None, editor)
+
+        self.assertIn("permission denied", logs.output[0])
+
+
+class ProductIdentityColumnTests(TestCase):
+    def product(self, name, **kwargs):
+        return Product.objects.create(name=name, price=Decimal("1.00"), status="draft", **kwargs)
+
+    def test_save_persists_the_parsed_identity(self):
+        product = self.product("Panadol Extra", dosage="0.5 g", pack_size="2 x 12 tabs")
+        parsed = item_identity("Panadol Extra", dosage="0.5 g", pack_size="2 x 12 tabs")
+
+        product.refresh_from_db()
+
+        self.assertEqual(product.identity_version, PRODUCT_IDENTITY_VERSION)
+        self.assertEqual(product.identity_core_name, "panadol extra")
+        self.assertEqual(product.identity_fingerprint, identity_fingerprint_key(parsed))
+        with patch.object(matching, "item_identity", side_effect=AssertionError("re-parsed")):
+            self.assertEqual(product_identity(product), parsed)
+
+    def test_update_fields_on_identity_sources_refresh_the_columns(self):
+        product = self.product("Identity Gauze", dosage="10cm")
+
+        product.name = "Renamed Gauze"
+        product.dosage = "5 cm"
+        product.save(update_fields=["name", "dosage"])
+        product.refresh_from_db()
+
+        self.assertEqual(product.identity_core_name, "renamed gauze")
+        self.assertEqual(
+            Product.objects.filter(identity_core_name="renamed gauze", identity_version=PRODUCT_IDENTITY_VERSION).get(),
+            product,
+        )
+
+    def test_backfill_command_fills_rows_written_without_save(self):
+        Product.objects.bulk_create(
+            [
+                Product(name="Backfill Syrup", dosage="120 ml", price=Decimal("1.00"), status="draft"),
+                Product(name="Backfill Cream", pack_size="30 g", price=Decimal("1.00"), status="draft"),
+            ]
+        )
+        current = self.product("Already Current Swab")
+        stdout = StringIO()
+
+        call_command("backfill_product_identity", "--dry-run", stdout=stdout)
+        self.assertIn("would update 2", stdout.getvalue())
+        self.assertEqual(Product.objects.filter(identity_version=0).count(), 2)
+
+        call_command("backfill_product_identity", "--batch-size", "1", stdout=stdout)
+
+        self.assertFalse(Product.objects.filter(identity_version=0).exists())
+        syrup = Product.objects.get(name="Backfill Syrup")
+        self.assertEqual(syrup.identity_core_name, "backfill")
+        self.assertEqual(syrup.identity_strengths, "120ml")
+        self.assertEqual(syrup.identity_dosage_forms, "syrup")
+        self.assertEqual(product_identity(syrup), item_identity("Backfill Syrup", dosage="120 ml"))
+        current.refresh_from_db()
+        self.assertEqual(current.identity_version, PRODUCT_IDENTITY_VERSION)
+
+    def test_exact_canonical_match_is_one_indexed_core_name_lookup(self):
+        target = self.product("Canonical Panadol", dosage="500 mg")
+        self.product("Canonical Panadol", dosage="1 g")
+        current_catalog_index()
+        current_alias_indexes(None)
+
+        with CaptureQueriesContext(connection) as queries:
+            match = suggest_product_for_text("canonical panadol 500mg")
+
+        self.assertEqual(match.product, target)
+        self.assertEqual(match.method, "canonical_name")
+        core_name_lookups = [query["sql"] for query in queries.captured_queries if 'WHERE' in query["sql"] and '"identity_core_name" =' in query["sql"]]
+        self.assertEqual(len(core_name_lookups), 1)
+
+    def test_batch_resolves_canonical_names_with_one_lookup(self):
+        swab = self.product("Batch Canonical Swab")
+        roll = self.product("Batch Canonical Roll")
+        current_catalog_index()
+        current_alias_indexes(None)
+
+        with CaptureQueriesContext(connection) as queries:
+            matches = suggest_products_for_lines(
+                [{"raw_text": "BATCH CANONICAL SWAB"}, {"raw_text": "batch canonical roll"}, {"raw_text": "Batch Canonical Swab"}]
+            )
+
+        self.assertEqual([match.product for match in matches], [swab, roll, swab])
+        core_name_lookups = [query["sql"] for query in queries.captured_queries if '"identity_core_name" IN' in query["sql"]]
+        self.assertEqual(len(core_name_lookups), 1)
+
+    def test_stored_identity_is_recomputed_when_its_sources_change(self):
+        product = self.product("Stale Identity Gauze")
+
+        product.name = "Fresh Identity Bandage"
+        self.assertEqual(product_identity(product).core_name, "fresh identity bandage")
+
+        Product.objects.filter(pk=product.pk).update(name="Updated Identity Lancet")
+        product.refresh_from_db()
+        self.assertEqual(product.identity_core_name, "stale identity gauze")
+        self.assertEqual(product_identity(product).core_name, "updated identity lancet")
+
+        matching.bump_catalog_generation()
+        self.assertEqual(suggest_product_for_text("updated identity lancet").product, product)
+        self.assertIsNone(suggest_product_for_text("stale identity gauze").product)
+
+    def test_oversized_identity_is_left_to_runtime_parsing(self):
+        product = self.product(
+            " ".join(f"{index}.5mg" for index in range(10, 38)),
+            dosage=" ".join(f"{index}.5g" for index in range(10, 26)),
+        )
+
+        product.refresh_from_db()
+
+        self.assertEqual(product.identity_version, 0)
+        self.assertEqual(product_identity(product).strengths, item_identity(product.name, dosage=product.dosage).strengths)
+
+
+def _scan_history(entries, requested, identifiers):
+    seen = set()
+    for history in entries:
+        product = history.product
+        if not product or product.id in seen or product.status == "archived":
+            continue
+        seen.add(product.id)
+        if identifiers & {value.lower() for value in [product.sku, product.barcode] if value}:
+            return product
+        identity = product_identity(product)
+        if requested.core_name and requested.core_name == identity.core_name and identities_compatible(requested, identity):
+            return product
+    return None
+
+
+class CompanyHistoryIndexTests(SimpleTestCase):
+    NAMES = ["History Gauze", "History Gauze 10cm", "History Gauze 5cm", "Panadol 500mg", "Panadol", "Zinc"]
+
+    def _entries(self):
+        rng = random.Random(20261017)
+        products = [
+            SimpleNamespace(
+                id=index,
+                name=rng.choice(self.NAMES),
+                sku=rng.choice(["", f"SKU-{index % 7}"]),
+                barcode=rng.choice(["", f"62{index % 5}"]),
+                status=rng.choice(["draft", "draft", "archived"]),
+                dosage="",
+                pack_size="",
+            )
+            for index in range(1, 41)
+        ]
+        return [SimpleNamespace(product=rng.choice(products + [None])) for _ in range(200)]
+
+    def test_indexed_lookup_matches_the_newest_first_scan(self):
+        entries = self._entries()
+        context = CompanyHistoryMatchContext.from_entries(1, entries)
+
+        for raw_text in self.NAMES + ["sku-3", "620", "Gauze"]:
+            for sku in ["", "SKU-1", "sku-5"]:
+                requested = item_identity(raw_text)
+                identifiers = {value.lower() for value in [raw_text, sku] if value}
+                with self.subTest(raw_text=raw_text, sku=sku):
+                    self.assertIs(context.match(requested, identifiers), _scan_history(entries, requested, identifiers))
+
+    def test_single_line_lookup_streams_the_window_without_indexing_it(self):
+        entries = self._entries()
+        company = SimpleNamespace(pk=1)
+        window = SimpleNamespace(iterator=lambda chunk_size: iter(entries))
+
+        with patch.object(matching, "_company_history_queryset", return_value=window), patch.object(
+            CompanyHistoryMatchContext, "from_entries", side_effect=AssertionError("indexed a single line")
+        ):
+            for raw_text in self.NAMES + ["sku-3", "620", "Gauze"]:
+                requested = item_identity(raw_text)
+                with self.subTest(raw_text=raw_text):
+                    self.assertIs(
+                        matching._company_history_product_match(raw_text, requested, company, sku="SKU-1"),
+                        _scan_history(entries, requested, {raw_text.lower(), "sku-1"}),
+                    )
@@ -10,7 +10,8 @@ from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
 from django.db import close_old_connections, connection, connections
 from django.db.backends.postgresql.base import DatabaseWrapper
-from django.test import SimpleTestCase, TransactionTestCase
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework import status
@@ -25,6 +26,7 @@ from .matching import (
     learn_confirmed_product_alias,
     preload_company_history_match_context,
     suggest_product_for_text,
+    suggest_products_for_lines,
 )
 from .models import (
     Company,
@@ -2597,3 +2599,97 @@ class ProductMatchingReworkTests(APITestCase):
         self.assertTrue(learned_alias.is_active)
         inactive_line.refresh_from_db()
         self.assertEqual(inactive_line.item_name_snapshot, "Legacy-Gauze Wording")
+
+
+class BatchedProductMatchingTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(username="batched-matching-staff", password="pass", is_staff=True)
+        self.company = Company.objects.create(name="Batched Matching Customer")
+
+    def product(self, name, **kwargs):
+        kwargs.setdefault("status", "draft")
+        return Product.objects.create(name=name, price=Decimal("1.00"), **kwargs)
+
+    def add_history(self, product):
+        quotation = Quotation.objects.create(company=self.company, created_by=self.staff)
+        line = QuotationLine.objects.create(
+            quotation=quotation,
+            product=product,
+            item_name_snapshot=product.name,
+            quantity=Decimal("1.000"),
+            unit_price=Decimal("2.00"),
+            match_status=QuotationLine.MATCH_CONFIRMED,
+        )
+        CompanyPriceHistory.objects.create(
+            company=self.company,
+            product=product,
+            quotation=quotation,
+            quotation_line=line,
+            unit_price=Decimal("2.00"),
+            created_by=self.staff,
+        )
+
+    def test_batch_results_are_identical_to_per_line_matching(self):
+        company_product = self.product("Customer Piece Dressing")
+        ProductAlias.objects.create(company=self.company, product=company_product, alias="pcs sterile dressing")
+        global_product = self.product("Global Crepe Bandage")
+        ProductAlias.objects.create(product=global_product, alias="crepe roll")
+        archived = self.product("Archived Alias Target", status="archived")
+        ProductAlias.objects.create(product=archived, alias="retired roll")
+        historical = self.product("Historical Cotton Wool 100g")
+        self.add_history(historical)
+        self.product("Completely Different Product", sku="BATCH-500", barcode="629000000777")
+        self.product("Duplicate Barcode A", barcode="629000000888")
+        self.product("Duplicate Barcode B", barcode="629000000888")
+        self.product("Panadol", dosage="500mg", pack_size="24 tablets")
+        self.product("Panadol", dosage="1g", pack_size="24 tablets")
+        self.product("Pulse Oximeter")
+        self.product("Pulse Monitor")
+        lines = [
+            {"raw_text": "piece sterile dressing"},
+            {"raw_text": "CREPE ROLL"},
+            {"raw_text": "retired roll"},
+            {"raw_text": "historical cotton wool 100 gm"},
+            {"raw_text": "batch-500"},
+            {"raw_text": "irrelevant", "barcode": "629000000777"},
+            {"raw_text": "duplicate", "barcode": "629000000888"},
+            {"raw_text": "PANADOL 0.5 g 24 tabs"},
+            {"raw_text": "Panadol"},
+            {"raw_text": "Pulse Oximtre"},
+            {"raw_text": "Panadol", "dosage": "500mg", "pack_size": "24 tablets", "unit": "box"},
+            {"raw_text": "nothing similar at all"},
+            {"raw_text": ""},
+        ]
+
+        for company in [self.company, None]:
+            with self.subTest(company=company):
+                batch = suggest_products_for_lines(lines, company)
+                per_line = [
+                    suggest_product_for_text(line.pop("raw_text"), company, **line)
+                    for line in [dict(line) for line in lines]
+                ]
+
+                self.assertEqual(
+                    [match.as_preview() for match in batch],
+                    [match.as_preview() for match in per_line],
+                )
+        self.assertEqual(suggest_products_for_lines(lines, self.company)[0].method, "company_alias")
+        self.assertEqual(suggest_products_for_lines(lines, self.company)[3].method, "company_price_history")
+
+    def test_batch_lookup_queries_do_not_grow_with_line_count(self):
+        for index in range(12):
+            product = self.product(f"Batch Query Gauze {index}", sku=f"BQ-{index}")
+            ProductAlias.objects.create(company=self.company, product=product, alias=f"customer gauze {index}")
+        self.add_history(product)
+
+        def query_count(line_count):
+            lines = [
+                {"raw_text": f"customer gauze {index}"} if index % 2 else {"raw_text": f"BQ-{index}"}
+                for index in range(line_count)
+            ]
+            with CaptureQueriesContext(connection) as captured:
+                suggest_products_for_lines(lines, self.company)
+            return len(captured.captured_queries)
+
+        query_count(1)  # Warm the process-local catalog and alias indexes.
+        self.assertEqual(query_count(3), query_count(12))
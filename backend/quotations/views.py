@@ -122,7 +122,7 @@ from .mailbox_po_reconciliation import (
     reconcile_mailbox_po_audit_page,
 )
 from .matching import (
-    apply_match_to_preview_line,
+    apply_matches_to_preview_lines,
     create_managed_product_alias,
     create_or_reuse_product,
     update_managed_product_alias,
@@ -2628,8 +2628,7 @@ class InquiryViewSet(QuotationBaseViewSet, viewsets.ModelViewSet):
         company = None
         if company_id:
             company = Company.objects.filter(pk=company_id).first()
-        for line in preview.get("lines", []):
-            apply_match_to_preview_line(line, company)
+        apply_matches_to_preview_lines(preview.get("lines", []), company)
 
     @action(detail=False, methods=["post"])
     def create_imported(self, request):